@@ -0,0 +1,110 @@
+"""
+In-process loading of config_db JSON files into CONFIG_DB.
+
+'config load' and 'config reload' used to run 'sonic-cfggen -j <file> --write-to-db' for every
+namespace, paying for a new interpreter and the sonic-cfggen imports each time. The functions
+here parse and merge the files once, check their layout, and write every table with a single
+pipeline, keeping the time spent on each table for a timing report.
+"""
+
+import json
+import time
+
+from swsscommon.swsscommon import ConfigDBPipeConnector
+from tabulate import tabulate
+
+
+class ConfigLoadError(Exception):
+    """Raised when a config file cannot be loaded into CONFIG_DB"""
+    pass
+
+
+def _deep_update(dst, src):
+    """Merge 'src' into 'dst' the same way sonic-cfggen merges the files given by -j"""
+    for key, value in src.items():
+        if isinstance(value, dict) and isinstance(dst.get(key), dict):
+            _deep_update(dst[key], value)
+        else:
+            dst[key] = value
+    return dst
+
+
+def _validate_config(config, filename):
+    if not isinstance(config, dict):
+        raise ConfigLoadError("{}: the config must be a JSON object of tables".format(filename))
+
+    for table, entries in config.items():
+        if not is_config_db_table(table):
+            continue
+        if not isinstance(entries, dict):
+            raise ConfigLoadError("{}: table {} must be a JSON object of entries".format(filename, table))
+        for key, fields in entries.items():
+            if not isinstance(fields, dict):
+                raise ConfigLoadError("{}: entry {}|{} must be a JSON object of fields".format(filename, table, key))
+            for field, value in fields.items():
+                # Scalars are written as str(value), but the items of a list are joined as they are
+                if isinstance(value, list):
+                    valid = all(isinstance(item, str) for item in value)
+                else:
+                    valid = not isinstance(value, dict) and value is not None
+                if not valid:
+                    raise ConfigLoadError("{}: field {} of entry {}|{} must be a string or a list of strings"
+                                          .format(filename, field, table, key))
+
+
+def is_config_db_table(name):
+    """Only the keys starting with an upper case letter are CONFIG_DB tables, as in sonic-cfggen"""
+    return name[:1].isupper()
+
+
+def read_config_files(filenames):
+    """Read the given config_db JSON files and merge them in order into a single config.
+
+    Raises ConfigLoadError if a file cannot be read or does not have the layout of CONFIG_DB.
+    """
+    config = {}
+    for filename in filenames:
+        try:
+            with open(filename) as f:
+                file_config = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ConfigLoadError("{}: {}".format(filename, e))
+        _validate_config(file_config, filename)
+        _deep_update(config, file_config)
+
+    return {table: entries for table, entries in config.items() if is_config_db_table(table)}
+
+
+def get_hwsku(filename):
+    """Return DEVICE_METADATA|localhost hwsku of the given config_db JSON file, None if not set"""
+    config = read_config_files([filename])
+    return config.get('DEVICE_METADATA', {}).get('localhost', {}).get('hwsku')
+
+
+def connect_config_db(namespace=None):
+    if namespace is None:
+        config_db = ConfigDBPipeConnector()
+    else:
+        config_db = ConfigDBPipeConnector(use_unix_socket_path=True, namespace=namespace)
+    config_db.connect(False)
+    return config_db
+
+
+def write_config(config_db, config):
+    """Write 'config' into CONFIG_DB, one pipeline per table.
+
+    Returns the timing of each table as a list of (table, number of keys, seconds).
+    """
+    timings = []
+    for table, entries in config.items():
+        start = time.time()
+        config_db.mod_config({table: entries})
+        timings.append((table, len(entries), time.time() - start))
+    return timings
+
+
+def format_timing_report(timings):
+    """Format the timings returned by write_config, slowest tables first"""
+    rows = sorted(timings, key=lambda timing: timing[2], reverse=True)
+    rows.append(("Total", sum(timing[1] for timing in timings), sum(timing[2] for timing in timings)))
+    return tabulate(rows, headers=["Table", "Keys", "Time (s)"], tablefmt="simple", floatfmt=".3f")
@@ -1,6 +1,7 @@
 #!/usr/sbin/env python
 
 import click
+import concurrent.futures
 import ipaddress
 import json
 import jsonpatch
@@ -10,6 +11,7 @@ import os
 import re
 import subprocess
 import sys
+import threading
 import time
 import itertools
 
@@ -28,11 +30,13 @@ from utilities_common.intf_filter import parse_interface_in_filter
 from utilities_common import bgp_util
 import utilities_common.cli as clicommon
 from utilities_common.general import load_db_config
+from utilities_common.systemd_state import SystemdState
 
 from .utils import log
 
 from . import aaa
 from . import chassis_modules
+from . import config_loader
 from . import console
 from . import feature
 from . import kdump
@@ -42,6 +46,7 @@ from . import nat
 from . import vlan
 from . import vxlan
 from . import plugins
+from .config_loader import ConfigLoadError
 from .config_mgmt import ConfigMgmtDPB
 from . import mclag
 
@@ -726,31 +731,29 @@ def _stop_services():
     clicommon.run_command("sudo systemctl stop sonic.target --job-mode replace-irreversibly")
 
 
-def _get_sonic_services():
-    out = clicommon.run_command("systemctl list-dependencies --plain sonic.target | sed '1d'", return_cmd=True)
-    return (unit.strip() for unit in out.splitlines())
+def _get_sonic_services(systemd):
+    return systemd.list_dependencies("sonic.target")
 
 
-def _get_delayed_sonic_services():
-    rc1 = clicommon.run_command("systemctl list-dependencies --plain sonic-delayed.target | sed '1d'", return_cmd=True)
-    rc2 = clicommon.run_command("systemctl is-enabled {}".format(rc1.replace("\n", " ")), return_cmd=True)
-    timer = [line.strip() for line in rc1.splitlines()]
-    state = [line.strip() for line in rc2.splitlines()]
+def _get_delayed_sonic_services(systemd):
+    timers = systemd.list_dependencies("sonic-delayed.target")
+    state = systemd.show(timers, ["UnitFileState"])
     services = []
-    for unit in timer:
-        if state[timer.index(unit)] == "enabled":
+    for unit in timers:
+        if state[unit]["UnitFileState"] == "enabled":
             services.append(unit.rstrip(".timer"))
     return services
 
 
-def _reset_failed_services():
-    for service in itertools.chain(_get_sonic_services(), _get_delayed_sonic_services()):
-        clicommon.run_command("systemctl reset-failed {}".format(service))
+def _reset_failed_services(systemd=None):
+    systemd = systemd or SystemdState()
+    systemd.reset_failed(itertools.chain(_get_sonic_services(systemd), _get_delayed_sonic_services(systemd)))
 
 
-def _restart_services():
+def _restart_services(systemd=None):
+    systemd = systemd or SystemdState()
     click.echo("Restarting SONiC target ...")
-    clicommon.run_command("sudo systemctl restart sonic.target")
+    systemd.restart(["sonic.target"], sudo=True)
 
     try:
         subprocess.check_call("sudo monit status", shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
@@ -763,48 +766,48 @@ def _restart_services():
     click.echo("Reloading Monit configuration ...")
     clicommon.run_command("sudo monit reload")
 
-def _get_delay_timers():
-    out = clicommon.run_command("systemctl list-dependencies sonic-delayed.target --plain |sed '1d'", return_cmd=True)
-    return [timer.strip() for timer in out.splitlines()]
+def _get_delay_timers(systemd):
+    return systemd.list_dependencies("sonic-delayed.target")
 
-def _delay_timers_elapsed():
-    for timer in _get_delay_timers():
-        out = clicommon.run_command("systemctl show {} --property=LastTriggerUSecMonotonic --value".format(timer), return_cmd=True)
-        if out.strip() == "0":
+def _get_swss_services():
+    num_asics = multi_asic.get_num_asics()
+    if num_asics == 1:
+        return ["swss.service"]
+    return ["swss@{}.service".format(asic) for asic in range(num_asics)]
+
+def _prefetch_readiness_state(systemd):
+    """Read the state of all the units the readiness checks look at with one query"""
+    units = _get_delay_timers(systemd) + _get_swss_services()
+    systemd.show(units, ["LastTriggerUSecMonotonic", "ActiveState", "ActiveEnterTimestampMonotonic"])
+
+def _delay_timers_elapsed(systemd):
+    timers = _get_delay_timers(systemd)
+    state = systemd.show(timers, ["LastTriggerUSecMonotonic"])
+    for timer in timers:
+        if state[timer]["LastTriggerUSecMonotonic"].strip() == "0":
             return False
     return True
 
-def _per_namespace_swss_ready(service_name):
-    out = clicommon.run_command("systemctl show {} --property ActiveState --value".format(service_name), return_cmd=True)
-    if out.strip() != "active":
+def _per_namespace_swss_ready(systemd, service_name):
+    state = systemd.show([service_name], ["ActiveState", "ActiveEnterTimestampMonotonic"])[service_name]
+    if state["ActiveState"].strip() != "active":
         return False
-    out = clicommon.run_command("systemctl show {} --property ActiveEnterTimestampMonotonic --value".format(service_name), return_cmd=True)
-    swss_up_time = float(out.strip())/1000000
+    swss_up_time = float(state["ActiveEnterTimestampMonotonic"].strip())/1000000
     now =  time.monotonic()
     if (now - swss_up_time > 120):
         return True
     else:
         return False
 
-def _swss_ready():
-    list_of_swss = [] 
-    num_asics = multi_asic.get_num_asics()
-    if num_asics == 1:
-        list_of_swss.append("swss.service")
-    else:
-        for asic in range(num_asics):
-            service = "swss@{}.service".format(asic)
-            list_of_swss.append(service)
-
-    for service_name in list_of_swss:
-        if _per_namespace_swss_ready(service_name) == False:
+def _swss_ready(systemd):
+    for service_name in _get_swss_services():
+        if _per_namespace_swss_ready(systemd, service_name) == False:
             return False
 
     return True 
 
-def _is_system_starting():
-    out = clicommon.run_command("sudo systemctl is-system-running", return_cmd=True)
-    return out.strip() == "starting"
+def _is_system_starting(systemd):
+    return systemd.is_system_starting()
 
 def interface_is_in_vlan(vlan_member_table, interface_name):
     """ Check if an interface is in a vlan """
@@ -1128,8 +1131,9 @@ def save(filename):
 
 @config.command()
 @click.option('-y', '--yes', is_flag=True)
+@click.option('--timing', default=False, is_flag=True, help='Print the time taken to load each table')
 @click.argument('filename', required=False)
-def load(filename, yes):
+def load(filename, yes, timing):
     """Import a previous saved config DB dump file.
        <filename> : Names of configuration file(s) to load, separated by comma with no spaces in between
     """
@@ -1179,13 +1183,21 @@ def load(filename, yes):
             click.echo("The config_db file {} doesn't exist".format(file))
             return
 
-        if namespace is None:
-            command = "{} -j {} --write-to-db".format(SONIC_CFGGEN_PATH, file)
-        else:
-            command = "{} -n {} -j {} --write-to-db".format(SONIC_CFGGEN_PATH, namespace, file)
-
         log.log_info("'load' executing...")
-        clicommon.run_command(command, display_cmd=True)
+        try:
+            config_data = config_loader.read_config_files([file])
+            click.echo(_loading_message([file], namespace))
+            timings = config_loader.write_config(config_loader.connect_config_db(namespace), config_data)
+        except ConfigLoadError as e:
+            click.secho("Failed to load the config: {}".format(e), fg='red', err=True)
+            sys.exit(1)
+
+        if timing:
+            click.echo(config_loader.format_timing_report(timings))
+
+def _loading_message(files, namespace):
+    return "Loading {} into CONFIG_DB{}".format(
+        " ".join(files), "" if namespace is None else " of {}".format(namespace))
 
 def print_dry_run_message(dry_run):
     if dry_run:
@@ -1333,22 +1345,26 @@ def list_checkpoints(ctx, verbose):
 @click.option('-d', '--disable_arp_cache', default=False, is_flag=True, help='Do not cache ARP table before reloading (applies to dual ToR systems only)')
 @click.option('-f', '--force', default=False, is_flag=True, help='Force config reload without system checks')
 @click.option('-t', '--file_format', default='config_db',type=click.Choice(['config_yang', 'config_db']),show_default=True,help='specify the file format')
+@click.option('-p', '--parallel', default=False, is_flag=True, help='Load the config of all the namespaces in parallel (multi ASIC only)')
+@click.option('--timing', default=False, is_flag=True, help='Print the time taken to load each table')
 @click.argument('filename', required=False)
 @clicommon.pass_db
-def reload(db, filename, yes, load_sysinfo, no_service_restart, disable_arp_cache, force, file_format):
+def reload(db, filename, yes, load_sysinfo, no_service_restart, disable_arp_cache, force, file_format, parallel, timing):
     """Clear current configuration and import a previous saved config DB dump file.
        <filename> : Names of configuration file(s) to load, separated by comma with no spaces in between
     """
+    systemd = SystemdState()
     if not force and not no_service_restart:
-        if _is_system_starting():
+        if _is_system_starting(systemd):
             click.echo("System is not up. Retry later or use -f to avoid system checks")
             return
 
-        if not _delay_timers_elapsed():
+        _prefetch_readiness_state(systemd)
+        if not _delay_timers_elapsed(systemd):
             click.echo("Relevant services are not up. Retry later or use -f to avoid system checks")
             return
 
-        if not _swss_ready():
+        if not _swss_ready(systemd):
             click.echo("SwSS container is not ready. Retry later or use -f to avoid system checks")
             return
 
@@ -1399,6 +1415,7 @@ def reload(db, filename, yes, load_sysinfo, no_service_restart, disable_arp_cach
     # service running in the host + DB services running in each ASIC namespace created per ASIC.
     # In the below logic, we get all namespaces in this platform and add an empty namespace ''
     # denoting the current namespace which we are in ( the linux host )
+    reload_jobs = []
     for inst in range(-1, num_cfg_file-1):
         # Get the namespace name, for linux host it is None
         if inst == -1:
@@ -1424,7 +1441,20 @@ def reload(db, filename, yes, load_sysinfo, no_service_restart, disable_arp_cach
             click.echo("The config file {} doesn't exist".format(file))
             continue
 
-        if load_sysinfo:
+        cfg_hwsku = None
+        if load_sysinfo and file_format == 'config_db':
+            try:
+                output = config_loader.get_hwsku(file)
+            except ConfigLoadError as e:
+                click.echo("{}".format(str(e)), err=True)
+                raise click.Abort()
+
+            if not output:
+                click.secho("Could not get the HWSKU from config file,  Exiting!!!", fg='magenta')
+                sys.exit(1)
+
+            cfg_hwsku = output.strip()
+        elif load_sysinfo:
             try:
                 command = "{} -j {} -v DEVICE_METADATA.localhost.hwsku".format(SONIC_CFGGEN_PATH, file)
                 proc = subprocess.Popen(command, shell=True, text=True, stdout=subprocess.PIPE)
@@ -1443,36 +1473,65 @@ def reload(db, filename, yes, load_sysinfo, no_service_restart, disable_arp_cach
 
             cfg_hwsku = output.strip()
 
-        if namespace is None:
-            config_db = ConfigDBConnector()
-        else:
-            config_db = ConfigDBConnector(use_unix_socket_path=True, namespace=namespace)
+        reload_jobs.append((namespace, file, cfg_hwsku))
 
-        config_db.connect()
-        client = config_db.get_redis_client(config_db.CONFIG_DB)
-        client.flushdb()
+    if parallel and len(reload_jobs) > 1:
+        _reload_config_db_parallel(reload_jobs, file_format, timing)
+    else:
+        for namespace, file, cfg_hwsku in reload_jobs:
+            try:
+                timings = _reload_config_db(namespace, file, file_format, cfg_hwsku, clicommon.run_command, click.echo)
+            except ConfigLoadError as e:
+                click.secho("Failed to load the config: {}".format(e), fg='red', err=True)
+                sys.exit(1)
+            if timing and timings:
+                click.echo(config_loader.format_timing_report(timings))
 
-        if load_sysinfo:
-            if namespace is None:
-                command = "{} -H -k {} --write-to-db".format(SONIC_CFGGEN_PATH, cfg_hwsku)
-            else:
-                command = "{} -H -k {} -n {} --write-to-db".format(SONIC_CFGGEN_PATH, cfg_hwsku, namespace)
-            clicommon.run_command(command, display_cmd=True)
+    # Re-generate the environment variable in case config_db.json was edited
+    update_sonic_environment()
 
-        # For the database service running in linux host we use the file user gives as input
-        # or by default DEFAULT_CONFIG_DB_FILE. In the case of database service running in namespace,
-        # the default config_db<namespaceID>.json format is used.
+    # We first run "systemctl reset-failed" to remove the "failed"
+    # status from all services before we attempt to restart them
+    if not no_service_restart:
+        _reset_failed_services(systemd)
+        log.log_info("'reload' restarting services...")
+        _restart_services(systemd)
 
+def _reload_config_db(namespace, file, file_format, cfg_hwsku, run_command, echo):
+    """Flush CONFIG_DB of the namespace and load it from the file, then migrate it to the latest version.
+       'cfg_hwsku' is set to also load the system default information of the HWSKU.
+       Returns the timings of the tables loaded from a config_db file, see config_loader.write_config.
+    """
+    # For the database service running in linux host we use the file user gives as input
+    # or by default DEFAULT_CONFIG_DB_FILE. In the case of database service running in namespace,
+    # the default config_db<namespaceID>.json format is used.
+    if file_format == 'config_db':
+        # Parse the files before flushing, so that a bad file leaves CONFIG_DB as it is
+        cfg_files = [INIT_CFG_FILE, file] if os.path.isfile(INIT_CFG_FILE) else [file]
+        config_data = config_loader.read_config_files(cfg_files)
+
+    config_db = config_loader.connect_config_db(namespace)
+    client = config_db.get_redis_client(config_db.CONFIG_DB)
+    client.flushdb()
+
+    if cfg_hwsku is not None:
+        if namespace is None:
+            command = "{} -H -k {} --write-to-db".format(SONIC_CFGGEN_PATH, cfg_hwsku)
+        else:
+            command = "{} -H -k {} -n {} --write-to-db".format(SONIC_CFGGEN_PATH, cfg_hwsku, namespace)
+        run_command(command, display_cmd=True)
 
+    timings = []
+    if file_format == 'config_db':
+        echo(_loading_message(cfg_files, namespace))
+        timings = config_loader.write_config(config_db, config_data)
+    else:
         config_gen_opts = ""
-        
+
         if os.path.isfile(INIT_CFG_FILE):
             config_gen_opts += " -j {} ".format(INIT_CFG_FILE)
-        
-        if file_format == 'config_db':
-            config_gen_opts += ' -j {} '.format(file)
-        else:
-            config_gen_opts += ' -Y {} '.format(file)
+
+        config_gen_opts += ' -Y {} '.format(file)
 
         if namespace is not None:
             config_gen_opts += " -n {} ".format(namespace)
@@ -1482,27 +1541,69 @@ def reload(db, filename, yes, load_sysinfo, no_service_restart, disable_arp_cach
             sonic_cfggen=SONIC_CFGGEN_PATH,
             options=config_gen_opts)
 
-        clicommon.run_command(command, display_cmd=True)
-        client.set(config_db.INIT_INDICATOR, 1)
+        run_command(command, display_cmd=True)
 
-        # Migrate DB contents to latest version
-        db_migrator='/usr/local/bin/db_migrator.py'
-        if os.path.isfile(db_migrator) and os.access(db_migrator, os.X_OK):
-            if namespace is None:
-                command = "{} -o migrate".format(db_migrator)
-            else:
-                command = "{} -o migrate -n {}".format(db_migrator, namespace)
-            clicommon.run_command(command, display_cmd=True)
+    client.set(config_db.INIT_INDICATOR, 1)
 
-    # Re-generate the environment variable in case config_db.json was edited
-    update_sonic_environment()
+    # Migrate DB contents to latest version
+    db_migrator='/usr/local/bin/db_migrator.py'
+    if os.path.isfile(db_migrator) and os.access(db_migrator, os.X_OK):
+        if namespace is None:
+            command = "{} -o migrate".format(db_migrator)
+        else:
+            command = "{} -o migrate -n {}".format(db_migrator, namespace)
+        run_command(command, display_cmd=True)
+
+    return timings
+
+
+def _reload_config_db_parallel(reload_jobs, file_format, timing):
+    """Run _reload_config_db for all the namespaces concurrently, one thread per namespace.
+       The output of each namespace is prefixed by its name. Exits once all of them are done if any failed.
+    """
+    echo_lock = threading.Lock()
+
+    def echo(name, message):
+        with echo_lock:
+            for line in message.splitlines():
+                click.echo("[{}] {}".format(name, line))
+
+    def reload_namespace(namespace, file, cfg_hwsku):
+        name = namespace if namespace is not None else 'host'
+
+        def run_command(command, display_cmd=False):
+            if display_cmd:
+                echo(name, "Running command: {}".format(command))
+            proc = subprocess.Popen(command, shell=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+            out, _ = proc.communicate()
+            if out:
+                echo(name, out.rstrip('\n'))
+            if proc.returncode != 0:
+                raise RuntimeError("Command '{}' failed with exit code {}".format(command, proc.returncode))
+
+        start = time.time()
+        timings = _reload_config_db(namespace, file, file_format, cfg_hwsku, run_command,
+                                    lambda message: echo(name, message))
+        echo(name, "Loaded {} in {:.1f}s".format(file, time.time() - start))
+        if timing and timings:
+            echo(name, config_loader.format_timing_report(timings))
+
+    failed = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(reload_jobs)) as executor:
+        futures = [(job[0], executor.submit(reload_namespace, *job)) for job in reload_jobs]
+        for namespace, future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                name = namespace if namespace is not None else 'host'
+                log.log_error("'reload' failed to load the config of {}: {}".format(name, e))
+                click.secho("[{}] Failed: {}".format(name, e), fg='red', err=True)
+                failed.append(name)
+
+    if failed:
+        click.secho("Failed to load the config of: {}".format(", ".join(failed)), fg='red', err=True)
+        sys.exit(1)
 
-    # We first run "systemctl reset-failed" to remove the "failed"
-    # status from all services before we attempt to restart them
-    if not no_service_restart:
-        _reset_failed_services()
-        log.log_info("'reload' restarting services...")
-        _restart_services()
 
 @config.command("load_mgmt_config")
 @click.option('-y', '--yes', is_flag=True, callback=_abort_if_false,
@@ -1578,7 +1679,7 @@ def load_minigraph(db, no_service_restart):
 
     # Load port_config.json
     try:
-        load_port_config(db.cfgdb, '/etc/sonic/port_config.json')
+        load_port_config('/etc/sonic/port_config.json')
     except Exception as e:
         click.secho("Failed to load port_config.json, Error: {}".format(str(e)), fg='magenta')
 
@@ -1603,13 +1704,14 @@ def load_minigraph(db, no_service_restart):
     # We first run "systemctl reset-failed" to remove the "failed"
     # status from all services before we attempt to restart them
     if not no_service_restart:
-        _reset_failed_services()
+        systemd = SystemdState()
+        _reset_failed_services(systemd)
         #FIXME: After config DB daemon is implemented, we'll no longer need to restart every service.
         log.log_info("'load_minigraph' restarting services...")
-        _restart_services()
+        _restart_services(systemd)
     click.echo("Please note setting loaded from minigraph will be lost after system reboot. To preserve setting, run `config save`.")
 
-def load_port_config(config_db, port_config_path):
+def load_port_config(port_config_path):
     if not os.path.isfile(port_config_path):
         return
 
@@ -1628,24 +1730,41 @@ def load_port_config(config_db, port_config_path):
 
     port_config = port_config_input[0]['PORT']
 
+    # Read the PORT table of every namespace once, with pipelined connectors for the writes
+    if multi_asic.is_multi_asic():
+        port_dbs = {namespace: config_loader.connect_config_db(namespace)
+                    for namespace in multi_asic.get_namespace_list()}
+    else:
+        port_dbs = {DEFAULT_NAMESPACE: config_loader.connect_config_db()}
+    port_tables = {namespace: port_db.get_table('PORT') for namespace, port_db in port_dbs.items()}
+
     # Ensure all ports are exist
-    port_table = {}
+    port_namespaces = {}
     for port_name in port_config.keys():
-        port_entry = config_db.get_entry('PORT', port_name)
-        if not port_entry:
+        for namespace, port_table in port_tables.items():
+            if port_table.get(port_name):
+                port_namespaces[port_name] = namespace
+                break
+        else:
             raise Exception("Port {} is not defined in current device".format(port_name))
-        port_table[port_name] = port_entry
 
-    # Update port state
+    # Collect the port state changes of each namespace
+    port_updates = {}
     for port_name in port_config.keys():
         if 'admin_status' not in port_config[port_name]:
             continue
-        if 'admin_status' in port_table[port_name]:
-            if port_table[port_name]['admin_status'] == port_config[port_name]['admin_status']:
+        namespace = port_namespaces[port_name]
+        port_entry = port_tables[namespace][port_name]
+        if 'admin_status' in port_entry:
+            if port_entry['admin_status'] == port_config[port_name]['admin_status']:
                 continue
-            clicommon.run_command('config interface {} {}'.format(
-                'startup' if port_config[port_name]['admin_status'] == 'up' else 'shutdown',
-                port_name), display_cmd=True)
+            admin_status = 'up' if port_config[port_name]['admin_status'] == 'up' else 'down'
+            click.echo("Setting admin_status of {} to {}".format(port_name, admin_status))
+            port_updates.setdefault(namespace, {})[port_name] = {'admin_status': admin_status}
+
+    # Update port state, one write per namespace
+    for namespace, ports in port_updates.items():
+        port_dbs[namespace].mod_config({'PORT': ports})
     return
 
 #
@@ -1,5 +1,6 @@
 from dump.match_infra import MatchRequest
 from dump.helper import create_template_dict
+from utilities_common.fdb_reader import FdbReader
 from .executor import Executor
 
 
@@ -11,6 +12,7 @@ class Fdb(Executor):
 
     def __init__(self, match_engine=None):
         super().__init__(match_engine)
+        self.vlan_bvid_maps = {}
 
     def get_all_args(self, ns=""):
         req = MatchRequest(db="STATE_DB", table="FDB_TABLE", key_pattern="*", ns=ns)
@@ -27,6 +29,19 @@ class Fdb(Executor):
         self.init_state_fdb_info(fdb_entry)
         return self.ret_temp
 
+    def get_vlan_bvids(self, vlan_num):
+        """
+        Return the VLAN objects of ASIC_DB with SAI_VLAN_ATTR_VLAN_ID = vlan_num.
+        All the VLAN objects of the namespace are read once and reused for the next entries
+        """
+        if self.ns not in self.vlan_bvid_maps:
+            conn = self.match_engine.conn_pool.get("ASIC_DB", self.ns)
+            vlan_bvid_map = {}
+            for bvid, vlan_id in FdbReader(conn).get_bvid_vlan_map().items():
+                vlan_bvid_map.setdefault(vlan_id, []).append(bvid)
+            self.vlan_bvid_maps[self.ns] = vlan_bvid_map
+        return self.vlan_bvid_maps[self.ns].get(str(vlan_num), [])
+
     def init_state_fdb_info(self, fdb_name):
         req = MatchRequest(db="STATE_DB", table="FDB_TABLE", key_pattern=fdb_name, ns=self.ns)
         ret = self.match_engine.fetch(req)
@@ -60,11 +75,9 @@ class Fdb(Executor):
 
         vlan_num = int(vlan_name[4:])
         # Find the table named "ASIC_STATE:SAI_OBJECT_TYPE_VLAN:*" in which SAI_VLAN_AT'TR_VLAN_ID = vlan_num
-        req = MatchRequest(db="ASIC_DB", table="ASIC_STATE:SAI_OBJECT_TYPE_VLAN", key_pattern="*", field="SAI_VLAN_ATTR_VLAN_ID", 
-                           value=str(vlan_num), ns=self.ns)
-        ret = self.match_engine.fetch(req)
-        if not ret["error"] and len(ret["keys"]) == 1:
-            vlan_obj = ret["keys"][0].split(":",2)[-1]
+        vlan_bvids = self.get_vlan_bvids(vlan_num)
+        if len(vlan_bvids) == 1:
+            vlan_obj = vlan_bvids[0]
         else:
             self.ret_temp["ASIC_DB"]["tables_not_found"].append("ASIC_STATE:SAI_OBJECT_TYPE_FDB_ENTRY")
             self.ret_temp["ASIC_DB"]["tables_not_found"].append("ASIC_STATE:SAI_OBJECT_TYPE_BRIDGE_PORT")
@@ -3,10 +3,8 @@ import json
 import jsondiff
 import importlib
 import os
-import tempfile
 from collections import defaultdict
-from swsscommon.swsscommon import ConfigDBConnector
-from .gu_common import genericUpdaterLogging
+from .gu_common import genericUpdaterLogging, get_config_db, read_config_db_as_json
 
 SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
 UPDATER_CONF_FILE = f"{SCRIPT_DIR}/generic_config_updater.conf.json"
@@ -32,16 +30,14 @@ def log_error(m):
     logger.log(logger.LOG_PRIORITY_ERROR, m, print_to_console)
 
 
-def get_config_db():
-    config_db = ConfigDBConnector()
-    config_db.connect()
-    return config_db
-
-
 def set_config(config_db, tbl, key, data):
     config_db.set_entry(tbl, key, data)
 
 
+def mod_config(config_db, data):
+    config_db.mod_config(data)
+
+
 def prune_empty_table(data):
     # For JSON Patch empty entries are valid
     # With redis, when last key is removed, the table gets removed too.
@@ -65,12 +61,18 @@ class DryRunChangeApplier:
         self.config_wrapper.apply_change_to_config_db(change)
 
 
+    def verify(self):
+        return 0
+
+
 class ChangeApplier:
 
     updater_conf = None
 
     def __init__(self):
         self.config_db = get_config_db()
+        # Running config read once from CONFIG_DB, then kept up to date locally with the writes of every change
+        self.running_config = None
         if (not ChangeApplier.updater_conf) and os.path.exists(UPDATER_CONF_FILE):
             with open(UPDATER_CONF_FILE, "r") as s:
                 ChangeApplier.updater_conf = json.load(s)
@@ -114,13 +116,18 @@ class ChangeApplier:
         return 0
 
 
-    def _upd_data(self, tbl, run_tbl, upd_tbl, upd_keys):
+    def _upd_data(self, tbl, run_tbl, upd_tbl, upd_keys, upd_batch):
         for key in set(run_tbl.keys()).union(set(upd_tbl.keys())):
             run_data = run_tbl.get(key, None)
             upd_data = upd_tbl.get(key, None)
 
             if run_data != upd_data:
-                set_config(self.config_db, tbl, key, upd_data)
+                if run_data and upd_data is not None and not run_data.keys() <= upd_data.keys():
+                    # mod_config keeps the fields missing in the update,
+                    # so replace the entry with removed fields on its own
+                    set_config(self.config_db, tbl, key, upd_data)
+                else:
+                    upd_batch.setdefault(tbl, {})[key] = upd_data
                 upd_keys[tbl][key] = {}
                 log_debug("Patch affected tbl={} key={}".format(tbl, key))
 
@@ -131,31 +138,49 @@ class ChangeApplier:
 
 
     def apply(self, change):
-        run_data = self._get_running_config()
+        if self.running_config is None:
+            self.running_config = self._get_running_config()
+        run_data = self.running_config
         upd_data = prune_empty_table(change.apply(copy.deepcopy(run_data)))
         upd_keys = defaultdict(dict)
 
+        # Keys to add, update or delete (None), written in one batch
+        upd_batch = {}
+
         for tbl in sorted(set(run_data.keys()).union(set(upd_data.keys()))):
-            self._upd_data(tbl, run_data.get(tbl, {}),
-                    upd_data.get(tbl, {}), upd_keys)
+            run_tbl = run_data.get(tbl, {})
+            upd_tbl = upd_data.get(tbl, {})
+            if run_tbl == upd_tbl:
+                # Skip tables not changed, without visiting their keys
+                continue
+            self._upd_data(tbl, run_tbl, upd_tbl, upd_keys, upd_batch)
+
+        if upd_batch:
+            mod_config(self.config_db, upd_batch)
+        self.running_config = upd_data
 
         ret = self._services_validate(run_data, upd_data, upd_keys)
-        if not ret:
-            run_data = self._get_running_config()
-            if upd_data != run_data:
-                self._report_mismatch(run_data, upd_data)
-                ret = -1
         if ret:
             log_error("Failed to apply Json change")
         return ret
 
 
+    def verify(self):
+        # Compare the locally updated running config with CONFIG_DB, once all
+        # the changes are applied.
+        #
+        if self.running_config is None:
+            return 0
+
+        run_data = self._get_running_config()
+        upd_data = self.running_config
+        self.running_config = None
+        if upd_data != run_data:
+            self._report_mismatch(run_data, upd_data)
+            log_error("Running config does not match the applied Json changes")
+            return -1
+        return 0
+
+
     def _get_running_config(self):
-        (_, fname) = tempfile.mkstemp(suffix="_changeApplier")
-        os.system("sonic-cfggen -d --print-data > {}".format(fname))
-        run_data = {}
-        with open(fname, "r") as s:
-            run_data = json.load(s)
-        if os.path.isfile(fname):
-            os.remove(fname)
-        return run_data
+        return read_config_db_as_json(self.config_db)
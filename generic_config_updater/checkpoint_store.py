@@ -0,0 +1,228 @@
+import hashlib
+import json
+import os
+import tempfile
+
+CHECKPOINT_EXT = ".cp.json"
+OBJECTS_DIR_NAME = ".objects"
+CHECKPOINT_FORMAT = "table-objects-v1"
+
+class CheckpointStore:
+    """
+    Stores config checkpoints under 'checkpoints_dir'.
+
+    Every table of a checkpoint is saved once as a JSON object named after the SHA-256 of its content, under
+    '<checkpoints_dir>/.objects', so the tables which did not change are shared by all the checkpoints. The
+    checkpoint file '<name>.cp.json' only holds the hash of each table, and the list of the tables added, removed
+    and modified since the checkpoint taken before it.
+
+    Checkpoint files holding the whole config, as saved by older versions, are still read.
+    """
+    def __init__(self, checkpoints_dir):
+        self.checkpoints_dir = checkpoints_dir
+        self.objects_dir = os.path.join(checkpoints_dir, OBJECTS_DIR_NAME)
+
+    def save(self, name, config):
+        """
+        Save 'config' as checkpoint 'name', replacing any checkpoint with the same name.
+        """
+        os.makedirs(self.checkpoints_dir, exist_ok=True)
+        replaced = self.exists(name)
+        if replaced:
+            # The checkpoints taken after the replaced one no longer follow it
+            self._reparent_children(name)
+        parent = self._get_latest_checkpoint_name(exclude=name)
+
+        tables = {}
+        for table, content in config.items():
+            table_hash = self.hash_table(content)
+            self._save_object(table_hash, content)
+            tables[table] = table_hash
+
+        parent_tables = self.get_table_hashes(parent) if parent is not None else {}
+        manifest = {
+            "format": CHECKPOINT_FORMAT,
+            "tables": tables,
+            "parent": parent,
+            "diff": self.diff_table_hashes(parent_tables, tables)
+        }
+        self._write_json_atomic(self._get_checkpoint_full_path(name), manifest)
+        if replaced:
+            self._remove_unreferenced_objects()
+
+    def load(self, name, current_config=None):
+        """
+        Return the config saved in checkpoint 'name'.
+
+        If 'current_config' is given, the tables whose content did not change since the checkpoint are taken from
+        it instead of being read from the store.
+        """
+        content = self._read_json(self._get_checkpoint_full_path(name))
+        if not self._is_manifest(content):
+            return content
+        manifest = content
+
+        unchanged = set()
+        if current_config is not None:
+            current_tables = {table: self.hash_table(content) for table, content in current_config.items()}
+            unchanged = {table for table, table_hash in manifest["tables"].items()
+                         if current_tables.get(table) == table_hash}
+
+        config = {}
+        for table, table_hash in manifest["tables"].items():
+            if table in unchanged:
+                config[table] = current_config[table]
+            else:
+                config[table] = self._read_json(self._get_object_path(table_hash))
+        return config
+
+    def get_table_hashes(self, name):
+        """
+        Return a dict of table -> content hash of checkpoint 'name'.
+        """
+        content = self._read_json(self._get_checkpoint_full_path(name))
+        if not self._is_manifest(content):
+            return {table: self.hash_table(table_content) for table, table_content in content.items()}
+        return content["tables"]
+
+    def get_diff(self, name):
+        """
+        Return the parent of checkpoint 'name' and the tables changed since it, as saved with the checkpoint.
+        Returns (None, None) for checkpoints saved by older versions.
+        """
+        manifest = self._read_manifest(name)
+        if manifest is None:
+            return None, None
+        return manifest["parent"], manifest["diff"]
+
+    def get_changed_tables(self, name, config):
+        """
+        Return the names of the tables which differ between checkpoint 'name' and 'config'.
+        """
+        checkpoint_tables = self.get_table_hashes(name)
+        config_tables = {table: self.hash_table(content) for table, content in config.items()}
+        diff = self.diff_table_hashes(config_tables, checkpoint_tables)
+        return sorted(diff["added"] + diff["removed"] + diff["modified"])
+
+    def exists(self, name):
+        return os.path.isfile(self._get_checkpoint_full_path(name))
+
+    def list(self):
+        if not os.path.isdir(self.checkpoints_dir):
+            return []
+
+        names = []
+        for file_name in os.listdir(self.checkpoints_dir):
+            if file_name.endswith(CHECKPOINT_EXT):
+                # Remove extension from file name.
+                # Example assuming ext is '.cp.json', then 'checkpoint1.cp.json' becomes 'checkpoint1'
+                names.append(file_name[:-len(CHECKPOINT_EXT)])
+
+        return names
+
+    def delete(self, name):
+        """
+        Delete checkpoint 'name' and the table objects no other checkpoint refers to. The checkpoints whose parent
+        was 'name' are given its parent instead.
+        """
+        self._reparent_children(name)
+        os.remove(self._get_checkpoint_full_path(name))
+        self._remove_unreferenced_objects()
+
+    @staticmethod
+    def hash_table(content):
+        text = json.dumps(content, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    @staticmethod
+    def diff_table_hashes(old_tables, new_tables):
+        return {
+            "added": sorted(table for table in new_tables if table not in old_tables),
+            "removed": sorted(table for table in old_tables if table not in new_tables),
+            "modified": sorted(table for table in new_tables
+                               if table in old_tables and old_tables[table] != new_tables[table])
+        }
+
+    def _get_latest_checkpoint_name(self, exclude):
+        latest = None
+        latest_mtime = None
+        for name in self.list():
+            if name == exclude:
+                continue
+            mtime = os.path.getmtime(self._get_checkpoint_full_path(name))
+            if latest_mtime is None or mtime > latest_mtime:
+                latest, latest_mtime = name, mtime
+        return latest
+
+    def _reparent_children(self, name):
+        manifest = self._read_manifest(name)
+        new_parent = manifest["parent"] if manifest is not None else None
+        if new_parent is not None and not self.exists(new_parent):
+            new_parent = None
+        new_parent_tables = self.get_table_hashes(new_parent) if new_parent is not None else {}
+
+        for child in self.list():
+            child_manifest = self._read_manifest(child)
+            if child_manifest is None or child_manifest["parent"] != name:
+                continue
+            child_manifest["parent"] = new_parent
+            child_manifest["diff"] = self.diff_table_hashes(new_parent_tables, child_manifest["tables"])
+            # Keep the modification time, it orders the checkpoints
+            path = self._get_checkpoint_full_path(child)
+            stat = os.stat(path)
+            self._write_json_atomic(path, child_manifest)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    def _remove_unreferenced_objects(self):
+        if not os.path.isdir(self.objects_dir):
+            return
+
+        referenced = set()
+        for name in self.list():
+            manifest = self._read_manifest(name)
+            if manifest is not None:
+                referenced.update(manifest["tables"].values())
+
+        for prefix in os.listdir(self.objects_dir):
+            prefix_dir = os.path.join(self.objects_dir, prefix)
+            for file_name in os.listdir(prefix_dir):
+                if os.path.splitext(file_name)[0] not in referenced:
+                    os.remove(os.path.join(prefix_dir, file_name))
+            if not os.listdir(prefix_dir):
+                os.rmdir(prefix_dir)
+
+    def _read_manifest(self, name):
+        content = self._read_json(self._get_checkpoint_full_path(name))
+        return content if self._is_manifest(content) else None
+
+    def _is_manifest(self, content):
+        return isinstance(content, dict) and content.get("format") == CHECKPOINT_FORMAT
+
+    def _save_object(self, table_hash, content):
+        path = self._get_object_path(table_hash)
+        if os.path.isfile(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._write_json_atomic(path, content)
+
+    def _get_object_path(self, table_hash):
+        return os.path.join(self.objects_dir, table_hash[:2], f"{table_hash}.json")
+
+    def _get_checkpoint_full_path(self, name):
+        return os.path.join(self.checkpoints_dir, f"{name}{CHECKPOINT_EXT}")
+
+    def _read_json(self, path):
+        with open(path) as fh:
+            text = fh.read()
+            return json.loads(text)
+
+    def _write_json_atomic(self, path, content):
+        # Write to a temporary file first, so that a crash never leaves a partially written checkpoint behind
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as fh:
+                fh.write(json.dumps(content))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
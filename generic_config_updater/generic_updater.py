@@ -6,9 +6,16 @@ from .gu_common import GenericConfigUpdaterError, ConfigWrapper, \
 from .patch_sorter import StrictPatchSorter, NonStrictPatchSorter, ConfigSplitter, \
                           TablesWithoutYangConfigSplitter, IgnorePathsFromYangConfigSplitter
 from .change_applier import ChangeApplier, DryRunChangeApplier
+from .checkpoint_store import CheckpointStore, CHECKPOINT_EXT
 
 CHECKPOINTS_DIR = "/etc/sonic/checkpoints"
-CHECKPOINT_EXT = ".cp.json"
+
+def get_replace_validation_workers():
+    """
+    Replacing or rolling back the whole config generates many more moves to validate than a typical patch,
+    so those validate the moves on all the CPUs the process may run on when they start.
+    """
+    return len(os.sched_getaffinity(0))
 
 class ConfigLock:
     def acquire_lock(self):
@@ -76,6 +83,8 @@ class PatchApplier:
 
         # Validate config updated successfully
         self.logger.log_notice("Verifying patch updates are reflected on ConfigDB.")
+        if self.changeapplier.verify():
+            raise GenericConfigUpdaterError("After applying patch to config, ConfigDB does not match the applied changes")
         new_config = self.config_wrapper.get_config_db_as_json()
         if not(self.patch_wrapper.verify_same_json(target_config, new_config)):
             raise GenericConfigUpdaterError(f"After applying patch to config, there are still some parts not updated")
@@ -117,6 +126,7 @@ class FileSystemConfigRollbacker:
                  config_wrapper=None):
         self.logger = genericUpdaterLogging.get_logger(title="Config Rollbacker", print_all_to_console=True)
         self.checkpoints_dir = checkpoints_dir
+        self.checkpoint_store = CheckpointStore(checkpoints_dir)
         self.config_replacer = config_replacer if config_replacer is not None else ConfigReplacer()
         self.config_wrapper = config_wrapper if config_wrapper is not None else ConfigWrapper()
 
@@ -128,8 +138,18 @@ class FileSystemConfigRollbacker:
         if not self._check_checkpoint_exists(checkpoint_name):
             raise ValueError(f"Checkpoint '{checkpoint_name}' does not exist")
 
-        self.logger.log_notice(f"Loading checkpoint into memory.")
-        target_config = self._get_checkpoint_content(checkpoint_name)
+        self.logger.log_notice("Getting current config db.")
+        current_config = self.config_wrapper.get_config_db_as_json()
+
+        changed_tables = self.checkpoint_store.get_changed_tables(checkpoint_name, current_config)
+        changed_tables_len = len(changed_tables)
+        self.logger.log_notice(f"{changed_tables_len} table{'s' if changed_tables_len != 1 else ''} changed " \
+                               f"since the checkpoint{':' if changed_tables_len > 0 else '.'}")
+        for table in changed_tables:
+            self.logger.log_notice(f"  * {table}")
+
+        self.logger.log_notice(f"Loading checkpoint into memory, reusing the unchanged tables of the current config.")
+        target_config = self.checkpoint_store.load(checkpoint_name, current_config)
 
         self.logger.log_notice(f"Replacing config using 'Config Replacer'.")
         self.config_replacer.replace(target_config)
@@ -146,11 +166,8 @@ class FileSystemConfigRollbacker:
         self.logger.log_notice("Getting checkpoint full-path.")
         path = self._get_checkpoint_full_path(checkpoint_name)
 
-        self.logger.log_notice("Ensuring checkpoint directory exist.")
-        self._ensure_checkpoints_dir_exists()
-
-        self.logger.log_notice(f"Saving config db content to {path}.")
-        self._save_json_file(path, json_content)
+        self.logger.log_notice(f"Saving config db content to {path}, storing the tables not saved by other checkpoints.")
+        self.checkpoint_store.save(checkpoint_name, json_content)
 
         self.logger.log_notice("Config checkpoint completed.")
 
@@ -168,7 +185,7 @@ class FileSystemConfigRollbacker:
         checkpoints_len = len(checkpoint_names)
         self.logger.log_info(f"Found {checkpoints_len} checkpoint{'s' if checkpoints_len != 1 else ''}{':' if checkpoints_len > 0 else '.'}")
         for checkpoint_name in checkpoint_names:
-            self.logger.log_info(f"  * {checkpoint_name}")
+            self.logger.log_info(f"  * {checkpoint_name}{self._get_checkpoint_diff_summary(checkpoint_name)}")
 
         self.logger.log_info("Listing checkpoints completed.")
 
@@ -187,42 +204,29 @@ class FileSystemConfigRollbacker:
 
         self.logger.log_notice("Deleting checkpoint completed.")
 
-    def _ensure_checkpoints_dir_exists(self):
-        os.makedirs(self.checkpoints_dir, exist_ok=True)
-
-    def _save_json_file(self, path, json_content):
-        with open(path, "w") as fh:
-            fh.write(json.dumps(json_content))
-
-    def _get_checkpoint_content(self, checkpoint_name):
-        path = self._get_checkpoint_full_path(checkpoint_name)
-        with open(path) as fh:
-            text = fh.read()
-            return json.loads(text)
+    def _get_checkpoint_diff_summary(self, name):
+        parent, diff = self.checkpoint_store.get_diff(name)
+        if diff is None:
+            return ""
+        if parent is None:
+            return f" ({len(diff['added'])} tables)"
+        return f" ({len(diff['added'])} added, {len(diff['removed'])} removed, " \
+               f"{len(diff['modified'])} modified tables since '{parent}')"
 
     def _get_checkpoint_full_path(self, name):
         return os.path.join(self.checkpoints_dir, f"{name}{CHECKPOINT_EXT}")
 
     def _get_checkpoint_names(self):
-        file_names = []
-        for file_name in os.listdir(self.checkpoints_dir):
-            if file_name.endswith(CHECKPOINT_EXT):
-                # Remove extension from file name.
-                # Example assuming ext is '.cp.json', then 'checkpoint1.cp.json' becomes 'checkpoint1'
-                file_names.append(file_name[:-len(CHECKPOINT_EXT)])
-
-        return file_names
+        return self.checkpoint_store.list()
 
     def _checkpoints_dir_exist(self):
         return os.path.isdir(self.checkpoints_dir)
 
     def _check_checkpoint_exists(self, name):
-        path = self._get_checkpoint_full_path(name)
-        return os.path.isfile(path)
+        return self.checkpoint_store.exists(name)
 
     def _delete_checkpoint(self, name):
-        path = self._get_checkpoint_full_path(name)
-        return os.remove(path)
+        return self.checkpoint_store.delete(name)
 
 class Decorator(PatchApplier, ConfigReplacer, FileSystemConfigRollbacker):
     def __init__(self, decorated_patch_applier=None, decorated_config_replacer=None, decorated_config_rollbacker=None):
@@ -326,7 +330,8 @@ class GenericUpdateFactory:
         config_wrapper = self.get_config_wrapper(dry_run)
         change_applier = self.get_change_applier(dry_run, config_wrapper)
         patch_wrapper = PatchWrapper(config_wrapper)
-        patch_sorter = self.get_patch_sorter(ignore_non_yang_tables, ignore_paths, config_wrapper, patch_wrapper)
+        patch_sorter = self.get_patch_sorter(ignore_non_yang_tables, ignore_paths, config_wrapper, patch_wrapper,
+                                             get_replace_validation_workers())
         patch_applier = PatchApplier(config_wrapper=config_wrapper,
                                      patchsorter=patch_sorter,
                                      patch_wrapper=patch_wrapper,
@@ -352,7 +357,8 @@ class GenericUpdateFactory:
         config_wrapper = self.get_config_wrapper(dry_run)
         change_applier = self.get_change_applier(dry_run, config_wrapper)
         patch_wrapper = PatchWrapper(config_wrapper)
-        patch_sorter = self.get_patch_sorter(ignore_non_yang_tables, ignore_paths, config_wrapper, patch_wrapper)
+        patch_sorter = self.get_patch_sorter(ignore_non_yang_tables, ignore_paths, config_wrapper, patch_wrapper,
+                                             get_replace_validation_workers())
         patch_applier = PatchApplier(config_wrapper=config_wrapper,
                                      patchsorter=patch_sorter,
                                      patch_wrapper=patch_wrapper,
@@ -381,9 +387,9 @@ class GenericUpdateFactory:
         else:
             return ChangeApplier()
 
-    def get_patch_sorter(self, ignore_non_yang_tables, ignore_paths, config_wrapper, patch_wrapper):
+    def get_patch_sorter(self, ignore_non_yang_tables, ignore_paths, config_wrapper, patch_wrapper, validation_workers=0):
         if not ignore_non_yang_tables and not ignore_paths:
-            return StrictPatchSorter(config_wrapper, patch_wrapper)
+            return StrictPatchSorter(config_wrapper, patch_wrapper, validation_workers=validation_workers)
 
         inner_config_splitters = []
         if ignore_non_yang_tables:
@@ -394,7 +400,7 @@ class GenericUpdateFactory:
 
         config_splitter = ConfigSplitter(config_wrapper, inner_config_splitters)
 
-        return NonStrictPatchSorter(config_wrapper, patch_wrapper, config_splitter)
+        return NonStrictPatchSorter(config_wrapper, patch_wrapper, config_splitter, validation_workers=validation_workers)
 
 class GenericUpdater:
     def __init__(self, generic_update_factory=None):
@@ -2,19 +2,47 @@ import json
 import jsonpatch
 from jsonpointer import JsonPointer
 import sonic_yang
-import subprocess
 import yang as ly
 import copy
+import glob
+import hashlib
+import os
+import pickle
 import re
+import tempfile
 from sonic_py_common import logger
+from swsscommon.swsscommon import ConfigDBPipeConnector
 from enum import Enum
 
 YANG_DIR = "/usr/local/yang-models"
+YANG_MODELS_CACHE_DIR = "/var/cache/generic_config_updater"
 SYSLOG_IDENTIFIER = "GenericConfigUpdater"
 
 class GenericConfigUpdaterError(Exception):
     pass
 
+def get_config_db():
+    # The pipe connector reads the whole config and writes multiple entries in batches
+    config_db = ConfigDBPipeConnector()
+    config_db.connect()
+    return config_db
+
+def read_config_db_as_json(config_db):
+    """
+    Reads the whole CONFIG_DB in process, in the same format as 'sonic-cfggen -d --print-data' i.e. with the
+    keys made of multiple parts joined by '|'.
+    """
+    config = config_db.get_config()
+    config_db_as_json = {}
+    for table, entries in config.items():
+        table_as_json = {}
+        for key, value in entries.items():
+            if isinstance(key, tuple):
+                key = config_db.KEY_SEPARATOR.join(key)
+            table_as_json[key] = value
+        config_db_as_json[table] = table_as_json
+    return config_db_as_json
+
 class JsonChange:
     """
     A class that describes a partial change to a JSON object.
@@ -42,22 +70,14 @@ class JsonChange:
 
 class ConfigWrapper:
     def __init__(self, yang_dir = YANG_DIR):
-        self.yang_dir = YANG_DIR
+        self.yang_dir = yang_dir
         self.sonic_yang_with_loaded_models = None
+        self.config_db = None
 
     def get_config_db_as_json(self):
-        text = self._get_config_db_as_text()
-        return json.loads(text)
-
-    def _get_config_db_as_text(self):
-        # TODO: Getting configs from CLI is very slow, need to get it from sonic-cffgen directly
-        cmd = "show runningconfiguration all"
-        result = subprocess.Popen(cmd, shell=True, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        text, err = result.communicate()
-        return_code = result.returncode
-        if return_code: # non-zero means failure
-            raise GenericConfigUpdaterError(f"Failed to get running config, Return code: {return_code}, Error: {err}")
-        return text
+        if self.config_db is None:
+            self.config_db = get_config_db()
+        return read_config_db_as_json(self.config_db)
 
     def get_sonic_yang_as_json(self):
         config_db_json = self.get_config_db_as_json()
@@ -113,7 +133,9 @@ class ConfigWrapper:
         sy = self.create_sonic_yang_with_loaded_models()
 
         try:
-            tmp_config_db_as_json = copy.deepcopy(config_db_as_json)
+            # loadData only pops the tables without YANG models from the top level dict,
+            # the table contents are read only so there is no need for a deep copy
+            tmp_config_db_as_json = dict(config_db_as_json)
 
             sy.loadData(tmp_config_db_as_json)
 
@@ -151,10 +173,10 @@ class ConfigWrapper:
     def create_sonic_yang_with_loaded_models(self):
         # sonic_yang_with_loaded_models will only be initialized once the first time this method is called
         if self.sonic_yang_with_loaded_models is None:
-            loaded_models_sy = sonic_yang.SonicYang(self.yang_dir)
-            loaded_models_sy.loadYangModel() # This call takes a long time (100s of ms) because it reads files from disk
-            self.sonic_yang_with_loaded_models = loaded_models_sy
+            self.sonic_yang_with_loaded_models = yangModelsCache.get_sonic_yang(self.yang_dir)
 
+        # The copy shares the loaded models (libyang context, model json and table map) and
+        # only gets its own data tree, so creating it is cheap
         return copy.copy(self.sonic_yang_with_loaded_models)
 
 class DryRunConfigWrapper(ConfigWrapper):
@@ -265,6 +287,9 @@ class PathAddressing:
 
     def __init__(self, config_wrapper=None):
         self.config_wrapper = config_wrapper
+        self._table_refs = None
+        self._table_referrers = None
+        self._leafref_index = None
 
     def get_path_tokens(self, path):
         return JsonPointer(path).parts
@@ -360,6 +385,87 @@ class PathAddressing:
 
         return f"{PathAddressing.XPATH_SEPARATOR}{PathAddressing.XPATH_SEPARATOR.join(str(t) for t in tokens)}"
 
+    def get_table_refs(self):
+        """
+        Returns a dict from each table with a YANG model to the set of other tables its model can refer to.
+
+        A module refers to a table if the table name shows up in any of its statements, e.g. leafref paths,
+        must and when conditions. All tables of a module are assumed to refer to the same tables, so that
+        references in groupings shared by the tables are not missed. This over-approximates the references,
+        which is safe for picking what to validate.
+        Example:
+          sonic-vlan module has the leafref path '/port:sonic-port/port:PORT/port:PORT_LIST/port:name'
+          return:
+            {
+                "VLAN": {"PORT", ...},
+                "VLAN_MEMBER": {"PORT", ...},
+                ...
+            }
+        """
+        if self._table_refs is None:
+            sy = self.config_wrapper.create_sonic_yang_with_loaded_models()
+            tables = set(sy.confDbYangMap.keys())
+
+            module_tables = {}
+            module_models = {}
+            for table, table_info in sy.confDbYangMap.items():
+                module_tables.setdefault(table_info["module"], set()).add(table)
+                module_models[table_info["module"]] = table_info["yangModule"]
+
+            table_refs = {}
+            for module, model in module_models.items():
+                words = set()
+                self._collect_model_words(model, words)
+                refs = words & tables
+                for table in module_tables[module]:
+                    table_refs[table] = refs - {table}
+
+            self._table_refs = table_refs
+
+        return self._table_refs
+
+    def get_tables_to_validate(self, tables):
+        """
+        Returns the tables which need to be validated according to YANG models after the given 'tables'
+        are updated. These are the updated tables, the tables referring to them, and all the tables those
+        refer to directly or indirectly, so that each reference can be resolved.
+        Example:
+          tables: ["PORT"]
+          return: {"PORT", "VLAN_MEMBER", "VLAN", "ACL_TABLE", ...}
+        """
+        table_refs = self.get_table_refs()
+        if self._table_referrers is None:
+            referrers = {}
+            for table, refs in table_refs.items():
+                for ref in refs:
+                    referrers.setdefault(ref, set()).add(table)
+            self._table_referrers = referrers
+
+        result = set()
+        for table in tables:
+            result.add(table)
+            result.update(self._table_referrers.get(table, set()))
+
+        pending = list(result)
+        while pending:
+            table = pending.pop()
+            for ref in table_refs.get(table, set()):
+                if ref not in result:
+                    result.add(ref)
+                    pending.append(ref)
+
+        return result
+
+    def _collect_model_words(self, model, words):
+        if isinstance(model, dict):
+            for value in model.values():
+                self._collect_model_words(value, words)
+        elif isinstance(model, list):
+            for value in model:
+                self._collect_model_words(value, words)
+        elif isinstance(model, str):
+            words.update(re.findall(r"[\w-]+", model))
+
     def find_ref_paths(self, path, config):
         """
         Finds the paths referencing any line under the given 'path' within the given 'config'.
@@ -398,8 +504,22 @@ class PathAddressing:
             /ACL_TABLE/EVERFLOW6/ports/1
         """
         # TODO: Also fetch references by must statement (check similar statements)
+        ref_paths = self.get_leafref_index().find_ref_paths(self.get_path_tokens(path), config)
+        if ref_paths is not None:
+            return ref_paths
+
         return self._find_leafref_paths(path, config)
 
+    def get_leafref_index(self):
+        """
+        Returns the LeafrefIndex of the loaded YANG models, built on first use.
+        """
+        if self._leafref_index is None:
+            sy = self.config_wrapper.create_sonic_yang_with_loaded_models()
+            self._leafref_index = LeafrefIndex(self, sy.confDbYangMap, self.get_table_refs())
+
+        return self._leafref_index
+
     def _find_leafref_paths(self, path, config):
         sy = self.config_wrapper.create_sonic_yang_with_loaded_models()
 
@@ -745,6 +865,255 @@ class PathAddressing:
 
         return None
 
+class LeafrefIndex:
+    """
+    Reverse index of the leafref references within a ConfigDb config, mapping each referenced value to the
+    paths referring to it, so that PathAddressing.find_ref_paths does not need to load the config into
+    SonicYang on every call.
+
+    The leafrefs are read once from the YANG models. The referrers of a table are indexed the first time the
+    table is looked up, and the index is reused for as long as the config holds the same table object. Configs
+    are not modified in place while sorting, a simulated move copies only the path it changes (see
+    Diff.apply_move), so only the table changed by a move is indexed again.
+
+    Tables whose leafrefs cannot be indexed, e.g. relative leafref paths or leaves coming from groupings, are
+    reported as not covered and the caller falls back to SonicYang.
+    """
+    MAX_CACHED_TABLES = 1024
+
+    def __init__(self, path_addressing, conf_db_yang_map, table_refs):
+        self.path_addressing = path_addressing
+        self.conf_db_yang_map = conf_db_yang_map
+        self.table_refs = table_refs
+        # Referring leaves, each is (table, node, kind, name). 'node' is (name, is_list, key_count) of the list
+        # or container holding the leaf, the lists of a table with multiple lists are told apart by the number of
+        # keys as in PathAddressing._get_list_model. 'kind' is one of "key", "leaf" or "leaf-list", and 'name' is
+        # the index of the key or the name of the leaf.
+        self.referrers = []
+        # Table -> indices of its referrers in self.referrers
+        self.table_referrers = {}
+        # Referenced leaf -> indices of its referrers in self.referrers, in the order of the YANG models
+        self.backlinks = {}
+        # Table -> its referenced leaves, keys first
+        self.targets = {}
+        self.unsupported_tables = set()
+        self._table_index_cache = {}
+
+        for table, table_info in conf_db_yang_map.items():
+            try:
+                self._add_table_referrers(table, table_info["container"])
+            except (KeyError, TypeError, ValueError):
+                self.unsupported_tables.add(table)
+
+        for table, targets in self.targets.items():
+            targets.sort(key=lambda target: (target[2] != "key", target[3] if target[2] == "key" else 0))
+
+    def find_ref_paths(self, path_tokens, config):
+        """
+        Returns the paths referencing any leaf under the given 'path_tokens' within the given 'config', in the
+        same order as SonicYang reports them, or None if the references of the path are not covered by the index.
+        """
+        if path_tokens and path_tokens[0] not in self.conf_db_yang_map:
+            return None
+
+        if not self._is_covered(path_tokens, config):
+            return None
+
+        ref_paths = []
+        ref_paths_set = set()
+        for target, value in self._get_targets(path_tokens, config):
+            for referrer_id in self.backlinks[target]:
+                table = self.referrers[referrer_id][0]
+                if table not in config:
+                    continue
+                table_index = self._get_table_index(table, config[table])
+                for ref_path in table_index.get(referrer_id, {}).get(value, []):
+                    if ref_path not in ref_paths_set:
+                        ref_paths.append(ref_path)
+                        ref_paths_set.add(ref_path)
+
+        return ref_paths
+
+    def _is_covered(self, path_tokens, config):
+        tables = {path_tokens[0]} if path_tokens else set(config)
+        for table in self.unsupported_tables:
+            if table in config and (table in tables or self.table_refs.get(table, set()) & tables):
+                return False
+        return True
+
+    def _get_targets(self, path_tokens, config):
+        if path_tokens:
+            tables = [path_tokens[0]]
+        else:
+            # SonicYang orders the data by module, in the order the modules first show up in the config
+            module_tables = {}
+            for table in config:
+                if table in self.conf_db_yang_map:
+                    module_tables.setdefault(self.conf_db_yang_map[table]["module"], []).append(table)
+            tables = [table for tables in module_tables.values() for table in tables]
+
+        for table in tables:
+            targets = self.targets.get(table)
+            table_config = config.get(table)
+            if not targets or not isinstance(table_config, dict):
+                continue
+
+            keys = [path_tokens[1]] if len(path_tokens) > 1 else list(table_config)
+            for key in keys:
+                entry = table_config.get(key)
+                if not isinstance(entry, dict):
+                    continue
+                key_values = [value.strip() for value in key.split("|")]
+                for target in targets:
+                    _, node, kind, name = target
+                    if not self._is_node_entry(node, key, key_values):
+                        continue
+                    if kind == "key":
+                        if len(path_tokens) < 3 and name < len(key_values):
+                            yield target, key_values[name]
+                    elif (len(path_tokens) < 3 or path_tokens[2:] == [name]) and name in entry \
+                            and not isinstance(entry[name], list):
+                        yield target, str(entry[name])
+
+    def _is_node_entry(self, node, key, key_values):
+        node_name, is_list, key_count = node
+        if is_list:
+            return key_count is None or key_count == len(key_values)
+        return key == node_name
+
+    def _get_table_index(self, table, table_config):
+        cache_key = (table, id(table_config))
+        cached = self._table_index_cache.get(cache_key)
+        # The cached table object is kept alive, so its id cannot be reused by another object
+        if cached is not None and cached[0] is table_config:
+            return cached[1]
+
+        if len(self._table_index_cache) >= LeafrefIndex.MAX_CACHED_TABLES:
+            self._table_index_cache.clear()
+
+        table_index = self._index_table(table, table_config)
+        self._table_index_cache[cache_key] = (table_config, table_index)
+        return table_index
+
+    def _index_table(self, table, table_config):
+        """
+        Indexes the referrers within the given table as: referrer id -> referenced value -> referring paths.
+        """
+        table_index = {}
+        if not isinstance(table_config, dict):
+            return table_index
+
+        for referrer_id in self.table_referrers.get(table, []):
+            _, node, kind, name = self.referrers[referrer_id]
+            values = table_index.setdefault(referrer_id, {})
+            for key, entry in table_config.items():
+                key_values = [value.strip() for value in key.split("|")]
+                if not isinstance(entry, dict) or not self._is_node_entry(node, key, key_values):
+                    continue
+                if kind == "key":
+                    if name < len(key_values):
+                        values.setdefault(key_values[name], []).append(self.path_addressing.create_path([table, key]))
+                elif kind == "leaf":
+                    if name in entry:
+                        values.setdefault(str(entry[name]), []).append(
+                            self.path_addressing.create_path([table, key, name]))
+                elif isinstance(entry.get(name), list):
+                    for index, value in enumerate(entry[name]):
+                        values.setdefault(str(value), []).append(
+                            self.path_addressing.create_path([table, key, name, index]))
+
+        return table_index
+
+    def _add_table_referrers(self, table, container):
+        if "uses" in container:
+            raise ValueError(f"Table {table} uses a grouping")
+
+        list_models = container.get("list")
+        single_list = isinstance(list_models, dict)
+        for list_model in self._as_list(list_models):
+            if "uses" in list_model or "container" in list_model or "list" in list_model:
+                raise ValueError(f"Table {table} has unsupported nodes under list {list_model['@name']}")
+            keys = list_model["key"]["@value"].split()
+            node = (list_model["@name"], True, None if single_list else len(keys))
+            for leaf in self._get_leaves(list_model):
+                kind, name = ("key", keys.index(leaf["@name"])) if leaf["@name"] in keys else ("leaf", leaf["@name"])
+                self._add_referrer(table, node, kind, name, leaf.get("type"))
+            for leaf_list in self._as_list(list_model.get("leaf-list")):
+                self._add_referrer(table, node, "leaf-list", leaf_list["@name"], leaf_list.get("type"))
+
+        for container_model in self._as_list(container.get("container")):
+            if "uses" in container_model or "container" in container_model or "list" in container_model:
+                raise ValueError(f"Table {table} has unsupported nodes under container {container_model['@name']}")
+            node = (container_model["@name"], False, None)
+            for leaf in self._get_leaves(container_model):
+                self._add_referrer(table, node, "leaf", leaf["@name"], leaf.get("type"))
+            for leaf_list in self._as_list(container_model.get("leaf-list")):
+                self._add_referrer(table, node, "leaf-list", leaf_list["@name"], leaf_list.get("type"))
+
+    def _add_referrer(self, table, node, kind, name, type_model):
+        leafref_paths = list(self._get_leafref_paths(type_model))
+        if not leafref_paths:
+            return
+
+        referrer_id = len(self.referrers)
+        self.referrers.append((table, node, kind, name))
+        self.table_referrers.setdefault(table, []).append(referrer_id)
+        for leafref_path in leafref_paths:
+            target = self._resolve_leafref_path(leafref_path)
+            if target not in self.backlinks:
+                self.backlinks[target] = []
+                self.targets.setdefault(target[0], []).append(target)
+            self.backlinks[target].append(referrer_id)
+
+    def _resolve_leafref_path(self, leafref_path):
+        """
+        Resolves an absolute leafref path to the referenced leaf.
+        Example:
+          leafref_path: /port:sonic-port/port:PORT/port:PORT_LIST/port:name
+          return: ("PORT", ("PORT_LIST", True, None), "key", 0)
+        """
+        leafref_path = "".join(leafref_path.split())
+        tokens = [token.split(":")[-1] for token in leafref_path.split("/")[1:]]
+        if not leafref_path.startswith("/") or len(tokens) != 4 or any("[" in token for token in tokens):
+            raise ValueError(f"Leafref path {leafref_path} is not supported")
+
+        _, table, node_name, leaf_name = tokens
+        container = self.conf_db_yang_map[table]["container"]
+        list_models = container.get("list")
+        list_model = self.path_addressing._get_model(list_models, node_name)
+        if list_model:
+            keys = list_model["key"]["@value"].split()
+            node = (node_name, True, None if isinstance(list_models, dict) else len(keys))
+            if leaf_name in keys:
+                return (table, node, "key", keys.index(leaf_name))
+            return (table, node, "leaf", leaf_name)
+
+        if self.path_addressing._get_model(container.get("container"), node_name):
+            return (table, (node_name, False, None), "leaf", leaf_name)
+
+        raise ValueError(f"Leafref path {leafref_path} does not point to a table leaf")
+
+    def _get_leaves(self, model):
+        leaves = self._as_list(model.get("leaf"))
+        for choice in self._as_list(model.get("choice")):
+            for case in self._as_list(choice.get("case")):
+                leaves.extend(self._as_list(case.get("leaf")))
+        return leaves
+
+    def _get_leafref_paths(self, type_model):
+        for type_item in self._as_list(type_model):
+            if type_item.get("@name") == "leafref":
+                yield type_item["path"]["@value"]
+            elif type_item.get("@name") == "union":
+                yield from self._get_leafref_paths(type_item.get("type"))
+
+    def _as_list(self, model):
+        if model is None:
+            return []
+        if isinstance(model, list):
+            return list(model)
+        return [model]
+
 class TitledLogger(logger.Logger):
     def __init__(self, syslog_identifier, title, verbose, print_all_to_console):
         super().__init__(syslog_identifier)
@@ -768,3 +1137,95 @@ class GenericUpdaterLogging:
         return TitledLogger(SYSLOG_IDENTIFIER, title, self._verbose, print_all_to_console)
 
 genericUpdaterLogging = GenericUpdaterLogging()
+
+class YangModelsCache:
+    """
+    Process wide cache of SonicYang objects with loaded YANG models, one per YANG directory.
+
+    Loading the models has two parts:
+      - Parsing the YANG files into the libyang context. The context cannot be serialized,
+        so this is done once per process.
+      - Converting the parsed models to json and mapping ConfigDb tables to models. The result
+        is plain python data which is pickled to the disk cache, and reused by later processes
+        as long as the YANG files are not changed.
+    """
+    # SonicYang attributes computed by loadYangModel() from the parsed models
+    MODEL_ATTRIBUTES = ["yangFiles", "yJson", "confDbYangMap", "preProcessedYang"]
+
+    def __init__(self, cache_dir=YANG_MODELS_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._sonic_yangs = {}
+
+    def get_sonic_yang(self, yang_dir):
+        if yang_dir not in self._sonic_yangs:
+            self._sonic_yangs[yang_dir] = self._load_sonic_yang(yang_dir)
+        return self._sonic_yangs[yang_dir]
+
+    def clear(self):
+        self._sonic_yangs = {}
+
+    def _load_sonic_yang(self, yang_dir):
+        yang_files = sorted(glob.glob(os.path.join(yang_dir, "*.yang")))
+        cache_key = self._get_cache_key(yang_files)
+        cache_file = self._get_cache_file(yang_dir)
+
+        sy = sonic_yang.SonicYang(yang_dir)
+        cached_models = self._read_cache(cache_file, cache_key)
+        if cached_models is not None:
+            for yang_file in yang_files:
+                if sy._load_schema_module(yang_file) is None:
+                    raise GenericConfigUpdaterError(f"Could not load YANG module {yang_file}")
+            for name, value in cached_models.items():
+                setattr(sy, name, value)
+            return sy
+
+        sy.loadYangModel() # This call takes a long time (100s of ms) because it reads files from disk
+        models = {name: getattr(sy, name) for name in YangModelsCache.MODEL_ATTRIBUTES if hasattr(sy, name)}
+        self._write_cache(cache_file, cache_key, models)
+        return sy
+
+    def _get_cache_key(self, yang_files):
+        # The models json depends on both the YANG files and the sonic_yang version parsing them
+        stats = []
+        for path in yang_files + [sonic_yang.__file__]:
+            stat = os.stat(path)
+            stats.append([os.path.basename(path), stat.st_mtime_ns, stat.st_size])
+        return hashlib.sha256(json.dumps(stats).encode()).hexdigest()
+
+    def _get_cache_file(self, yang_dir):
+        name = hashlib.sha256(os.path.abspath(yang_dir).encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"yang_models_{name}.pickle")
+
+    def _read_cache(self, cache_file, cache_key):
+        try:
+            with open(cache_file, "rb") as f:
+                cached = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as ex:
+            self._log_debug(f"Ignoring unreadable YANG models cache {cache_file}: {ex}")
+            return None
+
+        if not isinstance(cached, dict) or cached.get("key") != cache_key:
+            return None
+        return cached["models"]
+
+    def _write_cache(self, cache_file, cache_key, models):
+        # The cache is only an optimization, failing to write it must not fail the caller
+        try:
+            os.makedirs(self.cache_dir, mode=0o755, exist_ok=True)
+            fd, tmp_file = tempfile.mkstemp(dir=self.cache_dir)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump({"key": cache_key, "models": models}, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_file, cache_file)
+            except BaseException:
+                os.remove(tmp_file)
+                raise
+        except Exception as ex:
+            self._log_debug(f"Failed to write YANG models cache {cache_file}: {ex}")
+
+    def _log_debug(self, msg):
+        genericUpdaterLogging.get_logger(title="YANG models cache").log_debug(msg)
+
+yangModelsCache = YangModelsCache()
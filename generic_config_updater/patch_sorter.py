@@ -1,6 +1,8 @@
 import copy
+import itertools
 import json
 import jsonpatch
+import multiprocessing
 from collections import deque
 from enum import Enum
 from .gu_common import OperationWrapper, OperationType, GenericConfigUpdaterError, \
@@ -13,11 +15,18 @@ class Diff:
     def __init__(self, current_config, target_config):
         self.current_config = current_config
         self.target_config = target_config
+        self._current_config_hash = None
+        self._target_config_hash = None
+        # The diff the sort started from, and the moves applied to it to get to this diff
+        self.root = self
+        self.moves_from_root = ()
 
     def __hash__(self):
-        cc = json.dumps(self.current_config, sort_keys=True)
-        tc = json.dumps(self.target_config, sort_keys=True)
-        return hash((cc,tc))
+        if self._current_config_hash is None:
+            self._current_config_hash = ConfigHash.from_config(self.current_config)
+        if self._target_config_hash is None:
+            self._target_config_hash = ConfigHash.from_config(self.target_config)
+        return hash((self._current_config_hash.value, self._target_config_hash.value))
 
     def __eq__(self, other):
         """Overrides the default implementation"""
@@ -26,12 +35,73 @@ class Diff:
 
         return False
 
-    # TODO: Can be optimized to apply the move in place. JsonPatch supports that using the option 'in_place=True'
-    # Check: https://python-json-patch.readthedocs.io/en/latest/tutorial.html#applying-a-patch
-    # NOTE: in case move is applied in place, we will need to support `undo_move` as well.
     def apply_move(self, move):
-        new_current_config = move.apply(self.current_config)
-        return Diff(new_current_config, self.target_config)
+        """
+        Returns the Diff after applying the move to the current config.
+
+        The move is not applied in place, the sorters keep generating moves lazily out of the parent diff after
+        visiting the new diff, so the parent configs must not change. Instead only the containers on the
+        path of the move are copied, and the rest of the config is shared with the parent diff. For the same
+        reason the configs of a Diff must be treated as read-only.
+        The hash of the new current config is also updated from the parent's hash, by only rehashing the
+        parts of the config changed by the move.
+        """
+        tokens = PathAddressing().get_path_tokens(move.path)
+        new_current_config = Diff._apply_move_sharing_config(move, tokens, self.current_config)
+
+        new_diff = Diff(new_current_config, self.target_config)
+        new_diff.root = self.root
+        new_diff.moves_from_root = self.moves_from_root + (move,)
+        new_diff._target_config_hash = self._target_config_hash
+        if self._current_config_hash is not None:
+            new_diff._current_config_hash = \
+                self._current_config_hash.update(tokens, self.current_config, new_current_config)
+
+        return new_diff
+
+    @staticmethod
+    def _apply_move_sharing_config(move, tokens, config):
+        if not tokens: # Updating whole config
+            return move.apply(config)
+
+        new_config = copy.copy(config)
+        parent = new_config
+        try:
+            for token in tokens[:-1]:
+                key = int(token) if isinstance(parent, list) else token
+                child = copy.copy(parent[key])
+                parent[key] = child
+                parent = child
+
+            token = tokens[-1]
+            value = copy.deepcopy(move.value)
+            if isinstance(parent, dict):
+                if move.op_type == OperationType.ADD:
+                    parent[token] = value
+                elif move.op_type == OperationType.REPLACE and token in parent:
+                    parent[token] = value
+                elif move.op_type == OperationType.REMOVE:
+                    del parent[token]
+                else:
+                    raise KeyError(token)
+            elif isinstance(parent, list):
+                if move.op_type == OperationType.ADD and token == "-":
+                    parent.append(value)
+                elif move.op_type == OperationType.ADD and 0 <= int(token) <= len(parent):
+                    parent.insert(int(token), value)
+                elif move.op_type == OperationType.REPLACE:
+                    parent[int(token)] = value
+                elif move.op_type == OperationType.REMOVE:
+                    del parent[int(token)]
+                else:
+                    raise IndexError(token)
+            else:
+                raise TypeError(token)
+        except (KeyError, IndexError, TypeError, ValueError):
+            # Let JsonPatch report the invalid move
+            return move.apply(config)
+
+        return new_config
 
     def has_no_diff(self):
         return self.current_config == self.target_config
@@ -43,6 +113,85 @@ target_config: {self.target_config}"""
     def __repr__(self):
         return str(self)
 
+class ConfigHash:
+    """
+    A Merkle style hash of a config, which can be updated after a move by only rehashing what the move changed.
+
+    The hash of a table which is a dict is the sum of the hashes of its entries i.e. its direct keys with their
+    values, and the hash of the config is the sum of the hashes of its tables. Sums do not depend on the order
+    of the keys, and allow replacing the hash of a single entry or table without visiting the others.
+    """
+    MASK = (1 << 64) - 1
+
+    def __init__(self, table_hashes, value):
+        # table name -> (True, sum of entry hashes) if the table is a dict, otherwise (False, hash of table)
+        self.table_hashes = table_hashes
+        self.value = value
+
+    @staticmethod
+    def from_config(config):
+        if not isinstance(config, dict):
+            return ConfigHash(None, ConfigHash._hash_value(config))
+
+        table_hashes = {}
+        value = 0
+        for table, table_config in config.items():
+            table_hashes[table] = ConfigHash._hash_table(table_config)
+            value += hash((table, table_hashes[table]))
+        return ConfigHash(table_hashes, value & ConfigHash.MASK)
+
+    def update(self, tokens, config, new_config):
+        """
+        Returns the hash of 'new_config' which is 'config' (with this hash) updated at the path of the 'tokens'.
+        """
+        if not tokens or self.table_hashes is None or not isinstance(new_config, dict):
+            return ConfigHash.from_config(new_config)
+
+        table = tokens[0]
+        table_config = config.get(table)
+        new_table_config = new_config.get(table)
+
+        if len(tokens) > 1 and isinstance(table_config, dict) and isinstance(new_table_config, dict):
+            key = tokens[1]
+            is_dict, entries_hash = self.table_hashes[table]
+            entries_hash -= ConfigHash._hash_entry(key, table_config)
+            entries_hash += ConfigHash._hash_entry(key, new_table_config)
+            new_table_hash = (is_dict, entries_hash & ConfigHash.MASK)
+        elif table in new_config:
+            new_table_hash = ConfigHash._hash_table(new_table_config)
+        else:
+            new_table_hash = None
+
+        table_hashes = dict(self.table_hashes)
+        value = self.value
+        if table in table_hashes:
+            value -= hash((table, table_hashes.pop(table)))
+        if new_table_hash is not None:
+            table_hashes[table] = new_table_hash
+            value += hash((table, new_table_hash))
+
+        return ConfigHash(table_hashes, value & ConfigHash.MASK)
+
+    @staticmethod
+    def _hash_table(table_config):
+        if not isinstance(table_config, dict):
+            return (False, ConfigHash._hash_value(table_config))
+
+        entries_hash = 0
+        for key in table_config:
+            entries_hash += ConfigHash._hash_entry(key, table_config)
+        return (True, entries_hash & ConfigHash.MASK)
+
+    @staticmethod
+    def _hash_entry(key, table_config):
+        if key not in table_config:
+            return 0
+        return hash((key, ConfigHash._hash_value(table_config[key])))
+
+    @staticmethod
+    def _hash_value(value):
+        return hash(json.dumps(value, sort_keys=True))
+
 class JsonMove:
     """
     A class similar to JsonPatch operation, but it allows the path to refer to non-existing middle elements.
@@ -289,11 +438,49 @@ class JsonMove:
     def __hash__(self):
         return hash((self.op_type, self.path, json.dumps(self.value)))
 
+# State of a validation worker process: the move validators and the root diff of the sort are inherited from
+# the sorting process when the worker is forked, the last diff validated is kept to rebuild the next one from
+_worker_move_validators = None
+_worker_root_diff = None
+_worker_diff = None
+
+def _init_move_validation_worker(move_validators, root_diff):
+    global _worker_move_validators, _worker_root_diff, _worker_diff
+    _worker_move_validators = move_validators
+    _worker_root_diff = root_diff
+    _worker_diff = root_diff
+
+def _get_worker_diff(moves_from_root):
+    global _worker_diff
+    # The sorters mostly go one move deeper than the previous state, so the last diff is usually a prefix
+    diff = _worker_diff
+    applied = len(diff.moves_from_root)
+    if moves_from_root[:applied] != diff.moves_from_root:
+        diff = _worker_root_diff
+        applied = 0
+    for move in moves_from_root[applied:]:
+        diff = diff.apply_move(move)
+    _worker_diff = diff
+    return diff
+
+def _validate_move_in_worker(task):
+    moves_from_root, move = task
+    diff = _get_worker_diff(moves_from_root)
+    for validator in _worker_move_validators:
+        if not validator.validate(move, diff):
+            return False
+    return True
+
 class MoveWrapper:
-    def __init__(self, move_generators, move_extenders, move_validators):
+    def __init__(self, move_generators, move_extenders, move_validators, validation_workers=0):
         self.move_generators = move_generators
         self.move_extenders = move_extenders
         self.move_validators = move_validators
+        # If more than 1, the generated moves are validated speculatively in batches by a pool of
+        # that many worker processes
+        self.validation_workers = validation_workers
+        self.validation_pool = None
+        self.validation_pool_root = None
 
     def generate(self, diff):
         processed_moves = set()
@@ -320,9 +507,52 @@ class MoveWrapper:
                 return False
         return True
 
+    def generate_valid(self, diff):
+        """
+        Generates the moves of the diff which pass all the validators, in the order they are generated.
+        """
+        moves = self.generate(diff)
+        if self.validation_workers < 2:
+            for move in moves:
+                if self.validate(move, diff):
+                    yield move
+            return
+
+        while True:
+            batch = list(itertools.islice(moves, self.validation_workers))
+            if not batch:
+                return
+            # The workers rebuild the diff from the root diff they inherited, only the moves are sent to them
+            pool = self._get_validation_pool(diff.root)
+            results = pool.map(_validate_move_in_worker, [(diff.moves_from_root, move) for move in batch])
+            for move, is_valid in zip(batch, results):
+                if is_valid:
+                    yield move
+
     def simulate(self, move, diff):
         return diff.apply_move(move)
 
+    def close(self):
+        if self.validation_pool is not None:
+            self.validation_pool.terminate()
+            self.validation_pool.join()
+            self.validation_pool = None
+            self.validation_pool_root = None
+
+    def _get_validation_pool(self, root_diff):
+        # Workers are forked once, so each one gets a copy of the validators along with the YANG models
+        # already loaded by the sorting process, and of the root diff of the sort. The pool is only forked
+        # again if the wrapper is used for another sort
+        if self.validation_pool is not None and self.validation_pool_root is not root_diff:
+            self.close()
+        if self.validation_pool is None:
+            context = multiprocessing.get_context("fork")
+            self.validation_pool = context.Pool(self.validation_workers,
+                                                _init_move_validation_worker,
+                                                (self.move_validators, root_diff))
+            self.validation_pool_root = root_diff
+        return self.validation_pool
+
     def _generate_moves(self, diff):
         for generator in self.move_generators:
             for move in generator.generate(diff):
@@ -353,6 +583,35 @@ class FullConfigMoveValidator:
         simulated_config = move.apply(diff.current_config)
         return self.config_wrapper.validate_config_db_config(simulated_config)
 
+class IncrementalConfigMoveValidator:
+    """
+    A class to validate that the config is valid according to YANG models after applying the move, by only
+    validating the tables the move can affect i.e. the updated table, the tables referring to it and the
+    tables needed to resolve their references. The rest of the config is assumed to be valid, so the full
+    config has to be validated separately.
+    """
+    def __init__(self, path_addressing, config_wrapper):
+        self.path_addressing = path_addressing
+        self.config_wrapper = config_wrapper
+
+    def validate(self, move, diff):
+        tokens = self.path_addressing.get_path_tokens(move.path)
+        # Only the containers on the path of the move are copied, the rest is shared with the current config
+        simulated_config = Diff._apply_move_sharing_config(move, tokens, diff.current_config)
+
+        if not tokens: # If updating whole file
+            return self.config_wrapper.validate_config_db_config(simulated_config)
+
+        table_refs = self.path_addressing.get_table_refs()
+        tables = self.path_addressing.get_tables_to_validate([tokens[0]])
+
+        partial_config = {table: simulated_config[table] for table in tables
+                          if table in simulated_config and table in table_refs}
+        if not partial_config: # No tables with YANG models affected
+            return True
+
+        return self.config_wrapper.validate_config_db_config(partial_config)
+
 # TODO: Add this validation to YANG models instead
 class UniqueLanesMoveValidator:
     """
@@ -970,14 +1229,11 @@ class DfsSorter:
             return None
         self.visited[diff_hash] = True
 
-        moves = self.move_wrapper.generate(diff)
-
-        for move in moves:
-            if self.move_wrapper.validate(move, diff):
-                new_diff = self.move_wrapper.simulate(move, diff)
-                new_moves = self.sort(new_diff)
-                if new_moves is not None:
-                    return [move] + new_moves
+        for move in self.move_wrapper.generate_valid(diff):
+            new_diff = self.move_wrapper.simulate(move, diff)
+            new_moves = self.sort(new_diff)
+            if new_moves is not None:
+                return [move] + new_moves
 
         return None
 
@@ -1005,14 +1261,12 @@ class BfsSorter:
             if diff.has_no_diff():
                 return prv_moves
 
-            moves = self.move_wrapper.generate(diff)
-            for move in moves:
-                if self.move_wrapper.validate(move, diff):
-                    new_diff = self.move_wrapper.simulate(move, diff)
-                    new_prv_moves = prv_moves + [move]
+            for move in self.move_wrapper.generate_valid(diff):
+                new_diff = self.move_wrapper.simulate(move, diff)
+                new_prv_moves = prv_moves + [move]
 
-                    diff_queue.append(new_diff)
-                    prv_moves_queue.append(new_prv_moves)
+                diff_queue.append(new_diff)
+                prv_moves_queue.append(new_prv_moves)
 
         return None
 
@@ -1033,15 +1287,12 @@ class MemoizationSorter:
             return None
         self.visited[diff_hash] = True
 
-        moves = self.move_wrapper.generate(diff)
-
         bst_moves = None
-        for move in moves:
-            if self.move_wrapper.validate(move, diff):
-                new_diff = self.move_wrapper.simulate(move, diff)
-                new_moves = self.sort(new_diff)
-                if new_moves != None and (bst_moves is None or len(bst_moves) > len(new_moves)+1):
-                    bst_moves = [move] + new_moves
+        for move in self.move_wrapper.generate_valid(diff):
+            new_diff = self.move_wrapper.simulate(move, diff)
+            new_moves = self.sort(new_diff)
+            if new_moves != None and (bst_moves is None or len(bst_moves) > len(new_moves)+1):
+                bst_moves = [move] + new_moves
 
         self.mem[diff_hash] = bst_moves
         return bst_moves
@@ -1052,24 +1303,42 @@ class Algorithm(Enum):
     MEMOIZATION = 3
 
 class SortAlgorithmFactory:
-    def __init__(self, operation_wrapper, config_wrapper, path_addressing):
+    def __init__(self, operation_wrapper, config_wrapper, path_addressing, incremental_validation=False,
+                 validation_workers=0):
         self.operation_wrapper = operation_wrapper
         self.config_wrapper = config_wrapper
         self.path_addressing = path_addressing
+        # If set, moves are validated by IncrementalConfigMoveValidator instead of FullConfigMoveValidator,
+        # and the sorting result needs a full config validation at the end
+        self.incremental_validation = incremental_validation
+        # Number of worker processes validating the moves, see MoveWrapper
+        self.validation_workers = validation_workers
 
     def create(self, algorithm=Algorithm.DFS):
         move_generators = [LowLevelMoveGenerator(self.path_addressing)]
         move_extenders = [UpperLevelMoveExtender(),
                           DeleteInsteadOfReplaceMoveExtender(),
                           DeleteRefsMoveExtender(self.path_addressing)]
+        if self.incremental_validation:
+            config_move_validator = IncrementalConfigMoveValidator(self.path_addressing, self.config_wrapper)
+        else:
+            config_move_validator = FullConfigMoveValidator(self.config_wrapper)
+
         move_validators = [DeleteWholeConfigMoveValidator(),
-                           FullConfigMoveValidator(self.config_wrapper),
+                           config_move_validator,
                            NoDependencyMoveValidator(self.path_addressing, self.config_wrapper),
                            UniqueLanesMoveValidator(),
                            CreateOnlyMoveValidator(self.path_addressing),
                            NoEmptyTableMoveValidator(self.path_addressing)]
 
-        move_wrapper = MoveWrapper(move_generators, move_extenders, move_validators)
+        if self.validation_workers > 1:
+            # Load the YANG models and index their references before the validation workers are forked, so
+            # this is done only once
+            self.config_wrapper.create_sonic_yang_with_loaded_models()
+            self.path_addressing.get_table_refs()
+            self.path_addressing.get_leafref_index()
+
+        move_wrapper = MoveWrapper(move_generators, move_extenders, move_validators, self.validation_workers)
 
         if algorithm == Algorithm.DFS:
             sorter = DfsSorter(move_wrapper)
@@ -1083,11 +1352,12 @@ class SortAlgorithmFactory:
         return sorter
 
 class StrictPatchSorter:
-    def __init__(self, config_wrapper, patch_wrapper, inner_patch_sorter=None):
+    def __init__(self, config_wrapper, patch_wrapper, inner_patch_sorter=None, validation_workers=0):
         self.logger = genericUpdaterLogging.get_logger(title="Patch Sorter - Strict", print_all_to_console=True)
         self.config_wrapper = config_wrapper
         self.patch_wrapper = patch_wrapper
-        self.inner_patch_sorter = inner_patch_sorter if inner_patch_sorter else PatchSorter(config_wrapper, patch_wrapper)
+        self.inner_patch_sorter = inner_patch_sorter if inner_patch_sorter else \
+            PatchSorter(config_wrapper, patch_wrapper, validation_workers=validation_workers)
 
     def sort(self, patch, algorithm=Algorithm.DFS):
         current_config = self.config_wrapper.get_config_db_as_json()
@@ -1270,13 +1540,15 @@ class ChangeWrapper:
         return adjusted_changes
 
 class NonStrictPatchSorter:
-    def __init__(self, config_wrapper, patch_wrapper, config_splitter, change_wrapper=None, patch_sorter=None):
+    def __init__(self, config_wrapper, patch_wrapper, config_splitter, change_wrapper=None, patch_sorter=None,
+                 validation_workers=0):
         self.logger = genericUpdaterLogging.get_logger(title="Patch Sorter - Non-Strict", print_all_to_console=True)
         self.config_wrapper = config_wrapper
         self.patch_wrapper = patch_wrapper
         self.config_splitter = config_splitter
         self.change_wrapper = change_wrapper if change_wrapper else ChangeWrapper(patch_wrapper, config_splitter)
-        self.inner_patch_sorter = patch_sorter if patch_sorter else PatchSorter(config_wrapper, patch_wrapper)
+        self.inner_patch_sorter = patch_sorter if patch_sorter else \
+            PatchSorter(config_wrapper, patch_wrapper, validation_workers=validation_workers)
 
     def sort(self, patch, algorithm=Algorithm.DFS):
         current_config = self.config_wrapper.get_config_db_as_json()
@@ -1330,13 +1602,14 @@ class NonStrictPatchSorter:
         return changes
 
 class PatchSorter:
-    def __init__(self, config_wrapper, patch_wrapper, sort_algorithm_factory=None):
+    def __init__(self, config_wrapper, patch_wrapper, sort_algorithm_factory=None, validation_workers=0):
         self.config_wrapper = config_wrapper
         self.patch_wrapper = patch_wrapper
         self.operation_wrapper = OperationWrapper()
         self.path_addressing = PathAddressing(self.config_wrapper)
         self.sort_algorithm_factory = sort_algorithm_factory if sort_algorithm_factory else \
-            SortAlgorithmFactory(self.operation_wrapper, config_wrapper, self.path_addressing)
+            SortAlgorithmFactory(self.operation_wrapper, config_wrapper, self.path_addressing, incremental_validation=True,
+                                 validation_workers=validation_workers)
 
     def sort(self, patch, algorithm=Algorithm.DFS, preloaded_current_config=None):
         current_config = preloaded_current_config if preloaded_current_config else self.config_wrapper.get_config_db_as_json()
@@ -1345,11 +1618,19 @@ class PatchSorter:
         diff = Diff(current_config, target_config)
 
         sort_algorithm = self.sort_algorithm_factory.create(algorithm)
-        moves = sort_algorithm.sort(diff)
+        try:
+            moves = sort_algorithm.sort(diff)
+        finally:
+            sort_algorithm.move_wrapper.close()
 
         if moves is None:
             raise GenericConfigUpdaterError("There is no possible sorting")
 
+        # Moves were only validated against the tables they affect, validate the full config once
+        if self.sort_algorithm_factory.incremental_validation and moves and \
+           not self.config_wrapper.validate_config_db_config(target_config):
+            raise GenericConfigUpdaterError("There is no possible sorting, the patch results in an invalid config")
+
         changes = [JsonChange(move.patch) for move in moves]
 
         return changes
@@ -19,6 +19,11 @@ How:
     5) Rule out local interfaces & default routes
     6) If still outstanding diffs, report failure.
 
+    With --incremental, the routes of both DBs are read once through
+    subscriptions and kept in memory. Every scan then only applies the
+    updates received since the previous scan, and new mismatches get the
+    same one second settle window before being reported.
+
 To verify:
     Run this tool in SONiC switch and watch the result. In case of failure
     checkout the result to validate the failure.
@@ -53,6 +58,9 @@ APPL_DB_NAME = 'APPL_DB'
 ASIC_DB_NAME = 'ASIC_DB'
 ASIC_TABLE_NAME = 'ASIC_STATE'
 ASIC_KEY_PREFIX = 'SAI_OBJECT_TYPE_ROUTE_ENTRY:'
+# sairedis serializes the route entry with "dest" as the first attribute
+ASIC_KEY_DEST_PREFIX = ASIC_KEY_PREFIX + '{"dest":"'
+ASIC_KEY_DEST_OFFSET = len(ASIC_KEY_DEST_PREFIX)
 
 SUBSCRIBE_WAIT_SECS = 1
 
@@ -66,6 +74,9 @@ os.environ['PYTHONUNBUFFERED']='True'
 PREFIX_SEPARATOR = '/'
 IPV6_SEPARATOR = ':'
 
+# Every link local address starts with one of these (169.254.0.0/16, fe80::/10)
+LINK_LOCAL_STARTS = ('169.254.', 'fe8', 'fe9', 'fea', 'feb')
+
 MIN_SCAN_INTERVAL = 10      # Every 10 seconds
 MAX_SCAN_INTERVAL = 3600    # An hour
 
@@ -159,6 +170,9 @@ def is_local(ip):
     :param ip: IP to check as string
     :return True if link local, else False
     """
+    # Cheap string check first; only possible link local IPs are parsed
+    if not ip.lower().startswith(LINK_LOCAL_STARTS):
+        return False
     t = ipaddress.ip_address(ip.split("/")[0])
     return t.is_link_local
 
@@ -173,52 +187,31 @@ def is_default_route(ip):
     return t.is_unspecified and ip.split("/")[1] == "0"
 
 
-def cmps(s1, s2):
-    """
-    helper to compare two strings
-    :param s1: left string
-    :param s2: right string
-    :return comparison result as -1/0/1
-    """
-    if (s1 == s2):
-        return 0
-    if (s1 < s2):
-        return -1
-    return 1
-
-
-def diff_sorted_lists(t1, t2):
-    """
-    helper to compare two sorted lists.
-    :param t1: list 1
-    :param t2: list 2
-    :return (<t1 entries that are not in t2>, <t2 entries that are not in t1>)
-    """
-    t1_x = t2_x = 0
-    t1_miss = []
-    t2_miss = []
-    t1_len = len(t1);
-    t2_len = len(t2);
-    while t1_x < t1_len and t2_x < t2_len:
-        d = cmps(t1[t1_x], t2[t2_x])
-        if (d == 0):
-            t1_x += 1
-            t2_x += 1
-        elif (d < 0):
-            t1_miss.append(t1[t1_x])
-            t1_x += 1
-        else:
-            t2_miss.append(t2[t2_x])
-            t2_x += 1
+def diff_sets(t1, t2):
+    """
+    helper to compare two collections of entries.
+    :param t1: list or set 1
+    :param t2: list or set 2
+    :return (<sorted t1 entries that are not in t2>, <sorted t2 entries that are not in t1>)
+    """
+    s1 = t1 if isinstance(t1, (set, frozenset)) else set(t1)
+    s2 = t2 if isinstance(t2, (set, frozenset)) else set(t2)
+    return sorted(s1 - s2), sorted(s2 - s1)
 
-    while t1_x < t1_len:
-        t1_miss.append(t1[t1_x])
-        t1_x += 1
 
-    while t2_x < t2_len:
-        t2_miss.append(t2[t2_x])
-        t2_x += 1
-    return t1_miss, t2_miss
+def parse_rt_entry_key(k):
+    """
+    helper to strip out the IP of an ASIC-DB route entry key.
+    :param k: key to parse as string
+    :return ip in lower case, or None if k is not a route entry key
+    """
+    if k.startswith(ASIC_KEY_DEST_PREFIX):
+        end = k.find('"', ASIC_KEY_DEST_OFFSET)
+        if end != -1:
+            return k[ASIC_KEY_DEST_OFFSET:end].lower()
+    if k.startswith(ASIC_KEY_PREFIX):
+        return k.lower().split("\"", -1)[3]
+    return None
 
 
 def checkout_rt_entry(k):
@@ -227,13 +220,37 @@ def checkout_rt_entry(k):
     :param ip: key to check as string
     :return (True, ip) or (False, None)
     """
-    if k.startswith(ASIC_KEY_PREFIX):
-        e = k.lower().split("\"", -1)[3]
-        if not is_local(e):
-            return True, e
+    e = parse_rt_entry_key(k)
+    if e is not None and not is_local(e):
+        return True, e
     return False, None
 
 
+def pop_all(subs):
+    """
+    generator of the pending messages of a subscriber
+    :param subs: Subscription object to pop messages
+    :return yields (key, op, fvs) until no message is left
+    """
+    while True:
+        key, op, val = subs.pop()
+        if not key:
+            return
+        yield key, op, val
+
+
+def iter_rt_entries(msgs):
+    """
+    generator of the route entries of ASIC-DB messages
+    :param msgs: iterable of (key, op, fvs)
+    :return yields (ip, op) for the route entry keys which are not local
+    """
+    for key, op, _ in msgs:
+        res, e = checkout_rt_entry(key)
+        if res:
+            yield e, op
+
+
 def get_subscribe_updates(selector, subs):
     """
     helper to collect subscribe messages for a period
@@ -249,16 +266,11 @@ def get_subscribe_updates(selector, subs):
     while t_wait > 0:
         selector.select(t_wait)
         t_wait = int(t_end - time.time())
-        while True:
-            key, op, val = subs.pop()
-            if not key:
-                break
-            res, e = checkout_rt_entry(key)
-            if res:
-                if op == "SET":
-                    adds.append(e)
-                elif op == "DEL":
-                    deletes.append(e)
+        for e, op in iter_rt_entries(pop_all(subs)):
+            if op == "SET":
+                adds.append(e)
+            elif op == "DEL":
+                deletes.append(e)
 
     print_message(syslog.LOG_DEBUG, "adds={}".format(adds))
     print_message(syslog.LOG_DEBUG, "dels={}".format(deletes))
@@ -269,10 +281,21 @@ def is_vrf(k):
     return k.startswith("Vrf")
 
 
+def checkout_appl_rt_entry(k):
+    """
+    helper to filter out APPL-DB ROUTE_TABLE keys to check.
+    :param k: key to check as string
+    :return (True, route with prefix ensured) or (False, None)
+    """
+    if not is_vrf(k) and not is_local(k):
+        return True, add_prefix_ifnot(k.lower())
+    return False, None
+
+
 def get_routes():
     """
     helper to read route table from APPL-DB.
-    :return list of sorted routes with prefix ensured
+    :return list of routes with prefix ensured
     """
     db = swsscommon.DBConnector(APPL_DB_NAME, 0)
     print_message(syslog.LOG_DEBUG, "APPL DB connected for routes")
@@ -281,37 +304,33 @@ def get_routes():
 
     valid_rt = []
     for k in keys:
-        if not is_vrf(k) and not is_local(k):
-            valid_rt.append(add_prefix_ifnot(k.lower()))
+        res, e = checkout_appl_rt_entry(k)
+        if res:
+            valid_rt.append(e)
 
-    print_message(syslog.LOG_DEBUG, json.dumps({"ROUTE_TABLE": sorted(valid_rt)}, indent=4))
-    return sorted(valid_rt)
+    if report_level >= syslog.LOG_DEBUG:
+        print_message(syslog.LOG_DEBUG, json.dumps({"ROUTE_TABLE": sorted(valid_rt)}, indent=4))
+    return valid_rt
 
 
 def get_route_entries():
     """
     helper to read present route entries from ASIC-DB and 
     as well initiate selector for ASIC-DB:ASIC-state updates.
-    :return (selector,  subscriber, <list of sorted routes>)
+    :return (selector,  subscriber, <set of routes>)
     """
     db = swsscommon.DBConnector(ASIC_DB_NAME, 0)
     subs = swsscommon.SubscriberStateTable(db, ASIC_TABLE_NAME)
     print_message(syslog.LOG_DEBUG, "ASIC DB connected")
 
-    rt = []
-    while True:
-        k, _, _ = subs.pop()
-        if not k:
-            break
-        res, e = checkout_rt_entry(k)
-        if res:
-            rt.append(e)
-                                
-    print_message(syslog.LOG_DEBUG, json.dumps({"ASIC_ROUTE_ENTRY": sorted(rt)}, indent=4))
+    rt = {e for e, _ in iter_rt_entries(pop_all(subs))}
+
+    if report_level >= syslog.LOG_DEBUG:
+        print_message(syslog.LOG_DEBUG, json.dumps({"ASIC_ROUTE_ENTRY": sorted(rt)}, indent=4))
 
     selector = swsscommon.Select()
     selector.addSelectable(subs)
-    return (selector, subs, sorted(rt))
+    return (selector, subs, rt)
 
 
 def get_interfaces():
@@ -335,7 +354,8 @@ def get_interfaces():
         if not is_local(ip):
             intf.append(ip)
 
-    print_message(syslog.LOG_DEBUG, json.dumps({"APPL_DB_INTF": sorted(intf)}, indent=4))
+    if report_level >= syslog.LOG_DEBUG:
+        print_message(syslog.LOG_DEBUG, json.dumps({"APPL_DB_INTF": sorted(intf)}, indent=4))
     return sorted(intf)
 
 
@@ -467,7 +487,6 @@ def check_routes():
     rt_appl_miss = []
     rt_asic_miss = []
 
-    results = {}
     adds = []
     deletes = []
 
@@ -477,15 +496,15 @@ def check_routes():
     intf_appl = get_interfaces()
 
     # Diff APPL-DB routes & ASIC-DB routes
-    rt_appl_miss, rt_asic_miss = diff_sorted_lists(rt_appl, rt_asic)
+    rt_appl_miss, rt_asic_miss = diff_sets(rt_appl, rt_asic)
 
     # Check missed ASIC routes against APPL-DB INTF_TABLE
-    _, rt_asic_miss = diff_sorted_lists(intf_appl, rt_asic_miss)
+    _, rt_asic_miss = diff_sets(intf_appl, rt_asic_miss)
     rt_asic_miss = filter_out_default_routes(rt_asic_miss)
     rt_asic_miss = filter_out_vnet_routes(rt_asic_miss)
 
     # Check APPL-DB INTF_TABLE with ASIC table route entries
-    intf_appl_miss, _ = diff_sorted_lists(intf_appl, rt_asic)
+    intf_appl_miss, _ = diff_sets(intf_appl, rt_asic)
 
     if rt_appl_miss:
         rt_appl_miss = filter_out_local_interfaces(rt_appl_miss)
@@ -498,10 +517,20 @@ def check_routes():
         adds, deletes = get_subscribe_updates(selector, subs)
 
         # Drop all those for which SET received
-        rt_appl_miss, _ = diff_sorted_lists(rt_appl_miss, adds)
+        rt_appl_miss, _ = diff_sets(rt_appl_miss, adds)
 
         # Drop all those for which DEL received
-        rt_asic_miss, _ = diff_sorted_lists(rt_asic_miss, deletes)
+        rt_asic_miss, _ = diff_sets(rt_asic_miss, deletes)
+
+    return report_results(rt_appl_miss, intf_appl_miss, rt_asic_miss, adds, deletes)
+
+
+def report_results(rt_appl_miss, intf_appl_miss, rt_asic_miss, adds, deletes):
+    """
+    helper to report the unjustifiable entries of a check.
+    :return (0, None) on sucess, else (-1, results)
+    """
+    results = {}
 
     if rt_appl_miss:
         results["missed_ROUTE_TABLE_routes"] = rt_appl_miss
@@ -523,6 +552,132 @@ def check_routes():
         return 0, None
 
 
+class RouteState(object):
+    """
+    In memory view of APPL-DB ROUTE_TABLE routes & ASIC-DB route entries
+    for the incremental mode.
+
+    Both tables are read once through subscriptions, and then kept up to
+    date with the subscription updates. The routes present in only one of
+    the two DBs are maintained along with every update, so a check costs
+    O(changes since the last check) instead of reading & comparing all the
+    routes again.
+    """
+    def __init__(self):
+        self.rt_appl = set()
+        self.rt_asic = set()
+        # Routes present in APPL-DB only & ASIC-DB only
+        self.appl_only = set()
+        self.asic_only = set()
+        # Mismatches reported by the previous check, these had already
+        # settled and are not waited for again
+        self.reported = set()
+        self.adds = []
+        self.deletes = []
+
+        appl_db = swsscommon.DBConnector(APPL_DB_NAME, 0)
+        self.appl_subs = swsscommon.SubscriberStateTable(appl_db, 'ROUTE_TABLE')
+        asic_db = swsscommon.DBConnector(ASIC_DB_NAME, 0)
+        self.asic_subs = swsscommon.SubscriberStateTable(asic_db, ASIC_TABLE_NAME)
+        print_message(syslog.LOG_DEBUG, "APPL & ASIC DB subscribed for routes")
+
+        self.selector = swsscommon.Select()
+        self.selector.addSelectable(self.appl_subs)
+        self.selector.addSelectable(self.asic_subs)
+
+        # The initial pop drains the current content of both tables
+        self.apply_updates()
+        self.adds = []
+        self.deletes = []
+
+    def _update(self, route, present, own, other, own_only, other_only):
+        if present:
+            if route in own:
+                return
+            own.add(route)
+            if route in other:
+                other_only.discard(route)
+            else:
+                own_only.add(route)
+        else:
+            if route not in own:
+                return
+            own.discard(route)
+            if route in other:
+                other_only.add(route)
+            else:
+                own_only.discard(route)
+
+    def apply_updates(self):
+        """
+        Apply all the pending subscription updates of both DBs.
+        """
+        for key, op, _ in pop_all(self.appl_subs):
+            res, e = checkout_appl_rt_entry(key)
+            if res:
+                self._update(e, op == "SET", self.rt_appl, self.rt_asic,
+                             self.appl_only, self.asic_only)
+
+        for e, op in iter_rt_entries(pop_all(self.asic_subs)):
+            if op == "SET":
+                self.adds.append(e)
+            elif op == "DEL":
+                self.deletes.append(e)
+            self._update(e, op == "SET", self.rt_asic, self.rt_appl,
+                         self.asic_only, self.appl_only)
+
+    def wait_updates(self, timeout):
+        """
+        Collect the subscription updates for timeout seconds.
+        """
+        t_end = time.time() + timeout
+        t_wait = timeout
+        while t_wait > 0:
+            self.selector.select(t_wait)
+            self.apply_updates()
+            t_wait = int(t_end - time.time())
+
+    def get_mismatches(self, intf_appl):
+        """
+        Filter the current mismatches as check_routes does.
+        :return (<missed APPL-DB routes>, <missed INTF_TABLE entries>, <unaccounted ASIC-DB routes>)
+        """
+        rt_appl_miss = sorted(self.appl_only)
+        _, rt_asic_miss = diff_sets(intf_appl, self.asic_only)
+        rt_asic_miss = filter_out_default_routes(rt_asic_miss)
+        rt_asic_miss = filter_out_vnet_routes(rt_asic_miss)
+        intf_appl_miss, _ = diff_sets(intf_appl, self.rt_asic)
+
+        if rt_appl_miss:
+            rt_appl_miss = filter_out_local_interfaces(rt_appl_miss)
+
+        if rt_appl_miss:
+            rt_appl_miss = filter_out_voq_neigh_routes(rt_appl_miss)
+
+        return rt_appl_miss, intf_appl_miss, rt_asic_miss
+
+    def check(self):
+        """
+        Check the in memory routes. Mismatches which were not reported by
+        the previous check are given the settle window to be resolved by
+        subscription updates before being reported.
+        :return same as check_routes
+        """
+        self.adds = []
+        self.deletes = []
+        self.apply_updates()
+        intf_appl = set(get_interfaces())
+
+        rt_appl_miss, intf_appl_miss, rt_asic_miss = self.get_mismatches(intf_appl)
+        if not set(rt_appl_miss + rt_asic_miss).issubset(self.reported):
+            self.wait_updates(SUBSCRIBE_WAIT_SECS)
+            rt_appl_miss, intf_appl_miss, rt_asic_miss = self.get_mismatches(intf_appl)
+
+        self.reported = set(rt_appl_miss + rt_asic_miss)
+        return report_results(rt_appl_miss, intf_appl_miss, rt_asic_miss,
+                              sorted(self.adds), sorted(self.deletes))
+
+
 def main():
     """
     main entry point, which mainly parses the args and call check_routes
@@ -535,6 +690,8 @@ def main():
     parser.add_argument('-m', "--mode", type=Level, choices=list(Level), default='ERR')
     parser.add_argument("-i", "--interval", type=int, default=0, help="Scan interval in seconds")
     parser.add_argument("-s", "--log_to_syslog", action="store_true", default=True, help="Write message to syslog")
+    parser.add_argument("-n", "--incremental", action="store_true", default=False,
+                        help="Keep the routes in memory and only apply the DB updates between scans; requires --interval")
     args = parser.parse_args()
 
     set_level(args.mode, args.log_to_syslog)
@@ -551,13 +708,26 @@ def main():
 
     signal.signal(signal.SIGALRM, handler)
 
+    route_state = None
+    if args.incremental and interval:
+        signal.alarm(TIMEOUT_SECONDS)
+        route_state = RouteState()
+        signal.alarm(0)
+
     while True:
         signal.alarm(TIMEOUT_SECONDS)
-        ret, res= check_routes()
+        if route_state:
+            ret, res = route_state.check()
+        else:
+            ret, res= check_routes()
         signal.alarm(0)
 
         if interval:
-            time.sleep(interval)
+            if route_state:
+                # Keep applying the updates while waiting for the next scan
+                route_state.wait_updates(interval)
+            else:
+                time.sleep(interval)
             if UNIT_TESTING:
                 return ret, res
         else:
@@ -178,6 +178,7 @@ setup(
             'undebug = undebug.main:cli',
             'watchdogutil = watchdogutil.main:watchdogutil',
             'sonic-cli-gen = sonic_cli_gen.main:cli',
+            'sonic-db-broker = utilities_common.db_broker:main',
         ]
     },
     install_requires=[
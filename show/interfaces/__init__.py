@@ -10,6 +10,7 @@ from tabulate import tabulate
 from sonic_py_common import multi_asic
 from sonic_py_common import device_info
 from swsscommon.swsscommon import ConfigDBConnector, SonicV2Connector
+from utilities_common.db import Db
 from portconfig import get_child_ports
 import sonic_platform_base.sonic_sfp.sfputilhelper
 
@@ -539,14 +540,16 @@ def counters(ctx, verbose, period, interface, printall, namespace, display):
         if namespace is not None:
             cmd += " -n {}".format(namespace)
 
-        clicommon.run_command(cmd, display_cmd=verbose)
+        clicommon.run_script(cmd, ctx.ensure_object(Db), display_cmd=verbose,
+                             display_prefix="Running command: ")
 
 # 'errors' subcommand ("show interfaces counters errors")
 @counters.command()
 @click.option('-p', '--period')
 @multi_asic_util.multi_asic_click_options
 @click.option('--verbose', is_flag=True, help="Enable verbose output")
-def errors(verbose, period, namespace, display):
+@clicommon.pass_db
+def errors(db, verbose, period, namespace, display):
     """Show interface counters errors"""
     cmd = "portstat -e"
     if period is not None:
@@ -556,14 +559,15 @@ def errors(verbose, period, namespace, display):
     if namespace is not None:
         cmd += " -n {}".format(namespace)
 
-    clicommon.run_command(cmd, display_cmd=verbose)
+    clicommon.run_script(cmd, db, display_cmd=verbose, display_prefix="Running command: ")
 
 # 'rates' subcommand ("show interfaces counters rates")
 @counters.command()
 @click.option('-p', '--period')
 @multi_asic_util.multi_asic_click_options
 @click.option('--verbose', is_flag=True, help="Enable verbose output")
-def rates(verbose, period, namespace, display):
+@clicommon.pass_db
+def rates(db, verbose, period, namespace, display):
     """Show interface counters rates"""
     cmd = "portstat -R"
     if period is not None:
@@ -571,7 +575,7 @@ def rates(verbose, period, namespace, display):
     cmd += " -s {}".format(display)
     if namespace is not None:
         cmd += " -n {}".format(namespace)
-    clicommon.run_command(cmd, display_cmd=verbose)
+    clicommon.run_script(cmd, db, display_cmd=verbose, display_prefix="Running command: ")
 
 # 'counters' subcommand ("show interfaces counters rif")
 @counters.command()
@@ -594,7 +598,8 @@ def rif(interface, period, verbose):
 @click.argument('interface', metavar='<interface_name>', required=True, type=str)
 @click.option('-p', '--period', help="Display statistics over a specified period (in seconds)")
 @click.option('--verbose', is_flag=True, help="Enable verbose output")
-def detailed(interface, period, verbose):
+@clicommon.pass_db
+def detailed(db, interface, period, verbose):
     """Show interface counters detailed"""
 
     cmd = "portstat -l"
@@ -603,7 +608,7 @@ def detailed(interface, period, verbose):
     if interface is not None:
         cmd += " -i {}".format(interface)
 
-    clicommon.run_command(cmd, display_cmd=verbose)
+    clicommon.run_script(cmd, db, display_cmd=verbose, display_prefix="Running command: ")
 
 
 #
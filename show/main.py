@@ -1,3 +1,4 @@
+import importlib
 import json
 import os
 import subprocess
@@ -13,6 +14,7 @@ from sonic_py_common import device_info
 from swsscommon.swsscommon import SonicV2Connector, ConfigDBConnector
 from tabulate import tabulate
 from utilities_common import util_base
+from utilities_common.bulk_db import any_key_matches
 from utilities_common.db import Db
 import utilities_common.constants as constants
 from utilities_common.general import load_db_config
@@ -34,28 +36,6 @@ try:
 except KeyError:
     pass
 
-from . import acl
-from . import bgp_common
-from . import chassis_modules
-from . import dropcounters
-from . import feature
-from . import fgnhg
-from . import flow_counters
-from . import gearbox
-from . import interfaces
-from . import kdump
-from . import kube
-from . import muxcable
-from . import nat
-from . import platform
-from . import processes
-from . import reboot_cause
-from . import sflow
-from . import vlan
-from . import vnet
-from . import vxlan
-from . import system_health
-from . import warm_restart
 from . import plugins
 
 # Global Variables
@@ -65,7 +45,9 @@ PORT_STR = "Ethernet"
 
 VLAN_SUB_INTERFACE_SEPARATOR = '.'
 
-GEARBOX_TABLE_PHY_PATTERN = r"_GEARBOX_TABLE:phy:*"
+GEARBOX_TABLE_PHY_PATTERN = "_GEARBOX_TABLE:phy:*"
+GEARBOX_CACHE_NAME = "gearbox_configured"
+PORT_INIT_DONE_KEY = "PORT_TABLE:PortInitDone"
 
 # To be enhanced. Routing-stack information should be collected from a global
 # location (configdb?), so that we prevent the continous execution of this
@@ -87,10 +69,6 @@ def get_routing_stack():
 
     return (result)
 
-
-# Global Routing-Stack variable
-routing_stack = get_routing_stack()
-
 # Read given JSON file
 def readJsonFile(fileName):
     try:
@@ -128,7 +106,7 @@ def run_command(command, display_cmd=False, return_cmd=False):
         sys.exit(rc)
 
 # Global class instance for SONiC interface name to alias conversion
-iface_alias_converter = clicommon.InterfaceAliasConverter()
+iface_alias_converter = clicommon.LazyInterfaceAliasConverter()
 
 
 
@@ -142,18 +120,33 @@ def connect_config_db():
 
 def is_gearbox_configured():
     """
-    Checks whether Gearbox is configured or not
+    Checks whether Gearbox is configured or not.
+    The result is cached until the next boot, once the ports are initialized.
     """
+    helper = util_base.UtilHelper()
+    use_cache = "UTILITIES_UNIT_TESTING" not in os.environ
+    if use_cache:
+        configured = helper.read_boot_cache(GEARBOX_CACHE_NAME)
+        if configured is not None:
+            return configured
+
     app_db = SonicV2Connector()
     app_db.connect(app_db.APPL_DB)
-
-    keys = app_db.keys(app_db.APPL_DB, '*')
+    client = app_db.get_redis_client(app_db.APPL_DB)
 
     # If any _GEARBOX_TABLE:phy:* records present in APPL_DB, then the gearbox is configured
-    if any(re.match(GEARBOX_TABLE_PHY_PATTERN, key) for key in keys):
-        return True
-    else:
-        return False
+    configured = any_key_matches(client, GEARBOX_TABLE_PHY_PATTERN)
+
+    # The gearbox tables are written before the ports are initialized, so until
+    # then a missing gearbox may only mean that it is not there yet
+    if use_cache and (configured or client.exists(PORT_INIT_DONE_KEY)):
+        helper.write_boot_cache(GEARBOX_CACHE_NAME, configured)
+    return configured
+
+def add_gearbox_command():
+    if is_gearbox_configured():
+        from . import gearbox
+        cli.add_command(gearbox.gearbox)
 
 CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help', '-?'])
 
@@ -163,7 +156,7 @@ CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help', '-?'])
 
 # This is our entrypoint - the main "show" command
 # TODO: Consider changing function name to 'show' for better understandability
-@click.group(cls=clicommon.AliasedGroup, context_settings=CONTEXT_SETTINGS)
+@click.group(cls=clicommon.LazyAliasedGroup, context_settings=CONTEXT_SETTINGS)
 @click.pass_context
 def cli(ctx):
     """SONiC command line - 'show' command"""
@@ -173,32 +166,30 @@ def cli(ctx):
     ctx.obj = Db()
 
 
-# Add groups from other modules
-cli.add_command(acl.acl)
-cli.add_command(chassis_modules.chassis)
-cli.add_command(dropcounters.dropcounters)
-cli.add_command(feature.feature)
-cli.add_command(fgnhg.fgnhg)
-cli.add_command(flow_counters.flowcnt_trap)
-cli.add_command(kdump.kdump)
-cli.add_command(interfaces.interfaces)
-cli.add_command(kdump.kdump)
-cli.add_command(kube.kubernetes)
-cli.add_command(muxcable.muxcable)
-cli.add_command(nat.nat)
-cli.add_command(platform.platform)
-cli.add_command(processes.processes)
-cli.add_command(reboot_cause.reboot_cause)
-cli.add_command(sflow.sflow)
-cli.add_command(vlan.vlan)
-cli.add_command(vnet.vnet)
-cli.add_command(vxlan.vxlan)
-cli.add_command(system_health.system_health)
-cli.add_command(warm_restart.warm_restart)
-
-# Add greabox commands only if GEARBOX is configured
-if is_gearbox_configured():
-    cli.add_command(gearbox.gearbox)
+# Add groups from other modules, their module is imported when they are used
+cli.add_lazy_command('acl', 'show.acl')
+cli.add_lazy_command('chassis', 'show.chassis_modules')
+cli.add_lazy_command('dropcounters', 'show.dropcounters')
+cli.add_lazy_command('feature', 'show.feature')
+cli.add_lazy_command('fgnhg', 'show.fgnhg')
+cli.add_lazy_command('flowcnt-trap', 'show.flow_counters')
+cli.add_lazy_command('kdump', 'show.kdump')
+cli.add_lazy_command('interfaces', 'show.interfaces')
+cli.add_lazy_command('kubernetes', 'show.kube')
+cli.add_lazy_command('muxcable', 'show.muxcable')
+cli.add_lazy_command('nat', 'show.nat')
+cli.add_lazy_command('platform', 'show.platform')
+cli.add_lazy_command('processes', 'show.processes')
+cli.add_lazy_command('reboot-cause', 'show.reboot_cause')
+cli.add_lazy_command('sflow', 'show.sflow')
+cli.add_lazy_command('vlan', 'show.vlan')
+cli.add_lazy_command('vnet', 'show.vnet')
+cli.add_lazy_command('vxlan', 'show.vxlan')
+cli.add_lazy_command('system-health', 'show.system_health')
+cli.add_lazy_command('warm_restart', 'show.warm_restart')
+
+# Add greabox commands only if GEARBOX is configured, which is checked when they are used
+cli.add_lazy_commands(['gearbox'], add_gearbox_command)
 
 
 #
@@ -445,14 +436,15 @@ def pfc():
 @pfc.command()
 @multi_asic_util.multi_asic_click_options
 @click.option('--verbose', is_flag=True, help="Enable verbose output")
-def counters(namespace, display, verbose):
+@clicommon.pass_db
+def counters(db, namespace, display, verbose):
     """Show pfc counters"""
 
     cmd = "pfcstat -s {}".format(display)
     if namespace is not None:
         cmd += " -n {}".format(namespace)
 
-    run_command(cmd, display_cmd=verbose)
+    clicommon.run_script(cmd, db, display_cmd=verbose, fallback=run_command)
 
 @pfc.command()
 @click.argument('interface', type=click.STRING, required=False)
@@ -545,7 +537,8 @@ def queue():
 @click.argument('interfacename', required=False)
 @click.option('--verbose', is_flag=True, help="Enable verbose output")
 @click.option('--json', is_flag=True, help="JSON output")
-def counters(interfacename, verbose, json):
+@clicommon.pass_db
+def counters(db, interfacename, verbose, json):
     """Show queue counters"""
 
     cmd = "queuestat"
@@ -560,7 +553,7 @@ def counters(interfacename, verbose, json):
     if json:
         cmd += " -j"
 
-    run_command(cmd, display_cmd=verbose)
+    clicommon.run_script(cmd, db, display_cmd=verbose, fallback=run_command)
 
 #
 # 'watermarks' subgroup ("show queue watermarks ...")
@@ -573,24 +566,27 @@ def watermark():
 
 # 'unicast' subcommand ("show queue watermarks unicast")
 @watermark.command('unicast')
-def wm_q_uni():
+@clicommon.pass_db
+def wm_q_uni(db):
     """Show user WM for unicast queues"""
     command = 'watermarkstat -t q_shared_uni'
-    run_command(command)
+    clicommon.run_script(command, db, fallback=run_command)
 
 # 'multicast' subcommand ("show queue watermarks multicast")
 @watermark.command('multicast')
-def wm_q_multi():
+@clicommon.pass_db
+def wm_q_multi(db):
     """Show user WM for multicast queues"""
     command = 'watermarkstat -t q_shared_multi'
-    run_command(command)
+    clicommon.run_script(command, db, fallback=run_command)
 
 # 'all' subcommand ("show queue watermarks all")
 @watermark.command('all')
-def wm_q_all():
+@clicommon.pass_db
+def wm_q_all(db):
     """Show user WM for all queues"""
     command = 'watermarkstat -t q_shared_all'
-    run_command(command)
+    clicommon.run_script(command, db, fallback=run_command)
 
 #
 # 'persistent-watermarks' subgroup ("show queue persistent-watermarks ...")
@@ -603,24 +599,27 @@ def persistent_watermark():
 
 # 'unicast' subcommand ("show queue persistent-watermarks unicast")
 @persistent_watermark.command('unicast')
-def pwm_q_uni():
+@clicommon.pass_db
+def pwm_q_uni(db):
     """Show persistent WM for unicast queues"""
     command = 'watermarkstat -p -t q_shared_uni'
-    run_command(command)
+    clicommon.run_script(command, db, fallback=run_command)
 
 # 'multicast' subcommand ("show queue persistent-watermarks multicast")
 @persistent_watermark.command('multicast')
-def pwm_q_multi():
+@clicommon.pass_db
+def pwm_q_multi(db):
     """Show persistent WM for multicast queues"""
     command = 'watermarkstat -p -t q_shared_multi'
-    run_command(command)
+    clicommon.run_script(command, db, fallback=run_command)
 
 # 'all' subcommand ("show queue persistent-watermarks all")
 @persistent_watermark.command('all')
-def pwm_q_all():
+@clicommon.pass_db
+def pwm_q_all(db):
     """Show persistent WM for all queues"""
     command = 'watermarkstat -p -t q_shared_all'
-    run_command(command)
+    clicommon.run_script(command, db, fallback=run_command)
 
 #
 # 'priority-group' group ("show priority-group ...")
@@ -636,16 +635,18 @@ def watermark():
     pass
 
 @watermark.command('headroom')
-def wm_pg_headroom():
+@clicommon.pass_db
+def wm_pg_headroom(db):
     """Show user headroom WM for pg"""
     command = 'watermarkstat -t pg_headroom'
-    run_command(command)
+    clicommon.run_script(command, db, fallback=run_command)
 
 @watermark.command('shared')
-def wm_pg_shared():
+@clicommon.pass_db
+def wm_pg_shared(db):
     """Show user shared WM for pg"""
     command = 'watermarkstat -t pg_shared'
-    run_command(command)
+    clicommon.run_script(command, db, fallback=run_command)
 
 @priority_group.group()
 def drop():
@@ -664,16 +665,18 @@ def persistent_watermark():
     pass
 
 @persistent_watermark.command('headroom')
-def pwm_pg_headroom():
+@clicommon.pass_db
+def pwm_pg_headroom(db):
     """Show persistent headroom WM for pg"""
     command = 'watermarkstat -p -t pg_headroom'
-    run_command(command)
+    clicommon.run_script(command, db, fallback=run_command)
 
 @persistent_watermark.command('shared')
-def pwm_pg_shared():
+@clicommon.pass_db
+def pwm_pg_shared(db):
     """Show persistent shared WM for pg"""
     command = 'watermarkstat -p -t pg_shared'
-    run_command(command)
+    clicommon.run_script(command, db, fallback=run_command)
 
 
 #
@@ -685,16 +688,18 @@ def buffer_pool():
     """Show details of the buffer pools"""
 
 @buffer_pool.command('watermark')
-def wm_buffer_pool():
+@clicommon.pass_db
+def wm_buffer_pool(db):
     """Show user WM for buffer pools"""
     command = 'watermarkstat -t buffer_pool'
-    run_command(command)
+    clicommon.run_script(command, db, fallback=run_command)
 
 @buffer_pool.command('persistent-watermark')
-def pwm_buffer_pool():
+@clicommon.pass_db
+def pwm_buffer_pool(db):
     """Show persistent WM for buffer pools"""
     command = 'watermarkstat -p -t buffer_pool'
-    run_command(command)
+    clicommon.run_script(command, db, fallback=run_command)
 
 
 #
@@ -706,16 +711,18 @@ def headroom_pool():
     """Show details of headroom pool"""
 
 @headroom_pool.command('watermark')
-def wm_headroom_pool():
+@clicommon.pass_db
+def wm_headroom_pool(db):
     """Show user WM for headroom pool"""
     command = 'watermarkstat -t headroom_pool'
-    run_command(command)
+    clicommon.run_script(command, db, fallback=run_command)
 
 @headroom_pool.command('persistent-watermark')
-def pwm_headroom_pool():
+@clicommon.pass_db
+def pwm_headroom_pool(db):
     """Show persistent WM for headroom pool"""
     command = 'watermarkstat -p -t headroom_pool'
-    run_command(command)
+    clicommon.run_script(command, db, fallback=run_command)
 
 
 #
@@ -725,8 +732,10 @@ def pwm_headroom_pool():
 @cli.command()
 @click.option('-v', '--vlan')
 @click.option('-p', '--port')
+@click.option('-c', '--count', is_flag=True, help="Display the number of MAC entries only")
 @click.option('--verbose', is_flag=True, help="Enable verbose output")
-def mac(vlan, port, verbose):
+@clicommon.pass_db
+def mac(db, vlan, port, count, verbose):
     """Show MAC (FDB) entries"""
 
     cmd = "fdbshow"
@@ -737,7 +746,10 @@ def mac(vlan, port, verbose):
     if port is not None:
         cmd += " -p {}".format(port)
 
-    run_command(cmd, display_cmd=verbose)
+    if count:
+        cmd += " -c"
+
+    clicommon.run_script(cmd, db, display_cmd=verbose, fallback=run_command)
 
 #
 # 'show route-map' command ("show route-map")
@@ -759,7 +771,7 @@ def route_map(route_map_name, verbose):
 #
 
 # This group houses IP (i.e., IPv4) commands and subgroups
-@cli.group(cls=clicommon.AliasedGroup)
+@cli.group(cls=clicommon.LazyAliasedGroup)
 def ip():
     """Show IP (IPv4) commands"""
     pass
@@ -794,6 +806,7 @@ def interfaces(namespace, display):
 def route(args, namespace, display, verbose):
     """Show IP (IPv4) routing table"""
     # Call common handler to handle the show ip route cmd
+    from . import bgp_common
     bgp_common.show_routes(args, namespace, display, verbose, "ip")
 
 #
@@ -826,7 +839,7 @@ def protocol(verbose):
 #
 
 # This group houses IPv6-related commands and subgroups
-@cli.group(cls=clicommon.AliasedGroup)
+@cli.group(cls=clicommon.LazyAliasedGroup)
 def ipv6():
     """Show IPv6 commands"""
     pass
@@ -880,6 +893,7 @@ def interfaces(namespace, display):
 def route(args, namespace, display, verbose):
     """Show IPv6 routing table"""
     # Call common handler to handle the show ipv6 route cmd
+    from . import bgp_common
     bgp_common.show_routes(args, namespace, display, verbose, "ipv6")
 
 
@@ -893,18 +907,22 @@ def protocol(verbose):
 
 #
 # Inserting BGP functionality into cli's show parse-chain.
-# BGP commands are determined by the routing-stack being elected.
+# BGP commands are determined by the routing-stack being elected,
+# which is only looked up when a 'bgp' command is used.
 #
-if routing_stack == "quagga":
-    from .bgp_quagga_v4 import bgp
-    ip.add_command(bgp)
-    from .bgp_quagga_v6 import bgp
-    ipv6.add_command(bgp)
-elif routing_stack == "frr":
-    from .bgp_frr_v4 import bgp
-    ip.add_command(bgp)
-    from .bgp_frr_v6 import bgp
-    ipv6.add_command(bgp)
+BGP_COMMAND_MODULES = {
+    "quagga": ("show.bgp_quagga_v4", "show.bgp_quagga_v6"),
+    "frr": ("show.bgp_frr_v4", "show.bgp_frr_v6"),
+}
+
+def add_bgp_command(group, ip_version_index):
+    routing_stack = get_routing_stack()
+    if routing_stack in BGP_COMMAND_MODULES:
+        module = importlib.import_module(BGP_COMMAND_MODULES[routing_stack][ip_version_index])
+        group.add_command(module.bgp)
+
+ip.add_lazy_commands(['bgp'], lambda: add_bgp_command(ip, 0))
+ipv6.add_lazy_commands(['bgp'], lambda: add_bgp_command(ipv6, 1))
 
 #
 # 'link-local-mode' subcommand ("show ipv6 link-local-mode")
@@ -1022,6 +1040,7 @@ def version(verbose):
     """Show version information"""
     version_info = device_info.get_sonic_version_info()
     platform_info = device_info.get_platform_info()
+    from . import platform
     chassis_info = platform.get_chassis_info()
     
     sys_uptime_cmd = "uptime"
@@ -0,0 +1,126 @@
+import os
+import sys
+from unittest import mock
+
+from swsscommon.swsscommon import SonicV2Connector
+
+test_path = os.path.dirname(os.path.abspath(__file__))
+modules_path = os.path.dirname(test_path)
+sys.path.insert(0, test_path)
+sys.path.insert(0, modules_path)
+
+import mock_tables.dbconnector
+
+from utilities_common import bulk_db
+from utilities_common.bulk_db import any_key_matches, get_all_bulk, scan_keys
+
+
+class SwssClient(object):
+    """
+    Redis client of a swsscommon connector, which does not support pipelines
+    """
+    def hgetall(self, key):
+        raise AssertionError("hashes must be read with pipelines")
+
+
+class SwssConnector(object):
+    namespace = ''
+
+    def __init__(self, data):
+        self.data = data
+        self.get_all = mock.Mock(side_effect=lambda db_name, key: self.data.get(key, {}))
+
+    def get_redis_client(self, db_name):
+        return SwssClient()
+
+
+class SocketClient(object):
+    def __init__(self, data):
+        self.data = data
+        self.pipelines = 0
+
+    def pipeline(self, transaction=True):
+        self.pipelines += 1
+        return SocketPipeline(self.data)
+
+
+class SocketPipeline(object):
+    def __init__(self, data):
+        self.data = data
+        self.queued = []
+
+    def hgetall(self, key):
+        self.queued.append(key)
+
+    def execute(self):
+        return [self.data.get(key, {}) for key in self.queued]
+
+
+class TestBulkDb(object):
+    @classmethod
+    def setup_class(cls):
+        os.environ["UTILITIES_UNIT_TESTING"] = "1"
+
+    def test_get_all_bulk(self):
+        db = SonicV2Connector(host='127.0.0.1')
+        db.connect(db.COUNTERS_DB)
+        keys = ['COUNTERS:oid:0x1000000000012', 'COUNTERS:oid:0x1000000000013', 'COUNTERS:oid:0xdead']
+
+        result = get_all_bulk(db, db.COUNTERS_DB, keys, batch_size=2)
+
+        assert list(result.keys()) == keys
+        for key in keys[:2]:
+            assert result[key] == db.get_all(db.COUNTERS_DB, key)
+        assert result['COUNTERS:oid:0x1000000000012']['SAI_PORT_STAT_IF_IN_UCAST_PKTS'] == '8'
+        assert result['COUNTERS:oid:0xdead'] == {}
+
+    def test_get_all_bulk_empty(self):
+        db = SonicV2Connector(host='127.0.0.1')
+        db.connect(db.COUNTERS_DB)
+        assert get_all_bulk(db, db.COUNTERS_DB, []) == {}
+
+    def test_scan_keys(self):
+        db = SonicV2Connector(host='127.0.0.1')
+        db.connect(db.APPL_DB)
+        client = db.get_redis_client(db.APPL_DB)
+
+        keys = list(scan_keys(client, '_GEARBOX_TABLE:phy:*', count=3))
+
+        assert sorted(keys) == sorted(db.keys(db.APPL_DB, '_GEARBOX_TABLE:phy:*'))
+        assert any_key_matches(client, '_GEARBOX_TABLE:interface:*', count=3)
+        assert not any_key_matches(client, '_GEARBOX_TABLE:none:*')
+
+    def test_get_all_bulk_swsscommon_connector(self):
+        data = {'ASIC_STATE:oid:0x1': {'a': '1'}, 'ASIC_STATE:oid:0x2': {'b': '2'}}
+        db = SwssConnector(data)
+        socket_client = SocketClient(data)
+        keys = ['ASIC_STATE:oid:0x1', 'ASIC_STATE:oid:0x2', 'ASIC_STATE:oid:0x3']
+
+        with mock.patch.object(bulk_db, 'redis') as mock_redis, \
+                mock.patch.object(bulk_db, '_socket_clients', {}), \
+                mock.patch.object(bulk_db.SonicDBConfig, 'getDbSock', return_value='/var/run/redis/redis.sock'), \
+                mock.patch.object(bulk_db.SonicDBConfig, 'getDbId', return_value=1), \
+                mock.patch('os.path.exists', return_value=True):
+            mock_redis.Redis.return_value = socket_client
+            result = get_all_bulk(db, 'ASIC_DB', keys, batch_size=2)
+            get_all_bulk(db, 'ASIC_DB', keys[:1])
+
+        assert result == {'ASIC_STATE:oid:0x1': {'a': '1'}, 'ASIC_STATE:oid:0x2': {'b': '2'}, 'ASIC_STATE:oid:0x3': {}}
+        mock_redis.Redis.assert_called_once_with(unix_socket_path='/var/run/redis/redis.sock', db=1,
+                                                 decode_responses=True)
+        assert socket_client.pipelines == 3
+        assert not db.get_all.called
+
+    def test_get_all_bulk_without_pipeline(self):
+        data = {'ASIC_STATE:oid:0x1': {'a': '1'}}
+        db = SwssConnector(data)
+
+        with mock.patch.object(bulk_db, 'redis', None):
+            result = get_all_bulk(db, 'ASIC_DB', ['ASIC_STATE:oid:0x1', 'ASIC_STATE:oid:0x2'])
+
+        assert result == {'ASIC_STATE:oid:0x1': {'a': '1'}, 'ASIC_STATE:oid:0x2': {}}
+        assert db.get_all.call_count == 2
+
+    @classmethod
+    def teardown_class(cls):
+        os.environ["UTILITIES_UNIT_TESTING"] = "0"
@@ -0,0 +1,92 @@
+import json
+import os
+import tempfile
+from unittest import mock
+
+import pytest
+
+from config import config_loader
+from config.config_loader import ConfigLoadError
+
+
+class TestConfigLoader(object):
+    def setup_method(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def teardown_method(self):
+        for name in os.listdir(self.tmpdir):
+            os.remove(os.path.join(self.tmpdir, name))
+        os.rmdir(self.tmpdir)
+
+    def write_file(self, name, content):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'w') as f:
+            f.write(content if isinstance(content, str) else json.dumps(content))
+        return path
+
+    def test_read_config_files_merged_in_order(self):
+        init_cfg = self.write_file("init_cfg.json", {
+            "DEVICE_METADATA": {"localhost": {"buffer_model": "traditional", "hwsku": "default"}},
+            "CRM": {"Config": {"polling_interval": "300"}}
+        })
+        config_db = self.write_file("config_db.json", {
+            "DEVICE_METADATA": {"localhost": {"hwsku": "Force10-S6000"}},
+            "PORT": {"Ethernet0": {"lanes": "1,2,3,4", "mtu": 9100}},
+            "VLAN_MEMBER": {"Vlan1000|Ethernet0": {"tagging_mode": "untagged"}},
+            "not_a_table": {"ignored": {}}
+        })
+
+        config = config_loader.read_config_files([init_cfg, config_db])
+
+        assert config == {
+            "DEVICE_METADATA": {"localhost": {"buffer_model": "traditional", "hwsku": "Force10-S6000"}},
+            "CRM": {"Config": {"polling_interval": "300"}},
+            "PORT": {"Ethernet0": {"lanes": "1,2,3,4", "mtu": 9100}},
+            "VLAN_MEMBER": {"Vlan1000|Ethernet0": {"tagging_mode": "untagged"}},
+        }
+        assert config_loader.get_hwsku(config_db) == "Force10-S6000"
+
+    @pytest.mark.parametrize("content", [
+        "{",
+        "[]",
+        {"PORT": []},
+        {"PORT": {"Ethernet0": "up"}},
+        {"PORT": {"Ethernet0": {"admin_status": None}}},
+        {"PORT": {"Ethernet0": {"admin_status": {"up": "1"}}}},
+        {"PORT": {"Ethernet0": {"lanes": [1, 2, 3, 4]}}},
+        {"PORT": {"Ethernet0": {"lanes": ["1", None]}}},
+    ])
+    def test_read_config_files_invalid(self, content):
+        path = self.write_file("config_db.json", content)
+
+        with pytest.raises(ConfigLoadError) as e:
+            config_loader.read_config_files([path])
+        assert str(e.value).startswith(path)
+
+    def test_read_config_files_missing(self):
+        with pytest.raises(ConfigLoadError):
+            config_loader.read_config_files([os.path.join(self.tmpdir, "missing.json")])
+
+    def test_write_config_one_pipeline_per_table(self):
+        config_db = mock.Mock()
+        config = {
+            "PORT": {"Ethernet0": {"admin_status": "up"}, "Ethernet4": {"admin_status": "down"}},
+            "VLAN": {"Vlan1000": {"vlanid": "1000"}},
+        }
+
+        timings = config_loader.write_config(config_db, config)
+
+        assert config_db.mod_config.call_args_list == [
+            mock.call({"PORT": config["PORT"]}),
+            mock.call({"VLAN": config["VLAN"]}),
+        ]
+        assert [(table, keys) for table, keys, _ in timings] == [("PORT", 2), ("VLAN", 1)]
+
+    def test_format_timing_report(self):
+        report = config_loader.format_timing_report([("PORT", 2, 0.25), ("VLAN", 1, 0.5)])
+        lines = report.splitlines()
+
+        assert lines[0].split() == ["Table", "Keys", "Time", "(s)"]
+        assert lines[2].split() == ["VLAN", "1", "0.500"]
+        assert lines[3].split() == ["PORT", "2", "0.250"]
+        assert lines[4].split() == ["Total", "3", "0.750"]
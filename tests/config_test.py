@@ -46,7 +46,7 @@ Please note setting loaded from minigraph will be lost after system reboot. To p
 RELOAD_CONFIG_DB_OUTPUT = """\
 Running command: rm -rf /tmp/dropstat-*
 Stopping SONiC target ...
-Running command: /usr/local/bin/sonic-cfggen  -j /tmp/config.json  --write-to-db
+Loading /tmp/config.json into CONFIG_DB
 Restarting SONiC target ...
 Reloading Monit configuration ...
 """
@@ -62,9 +62,9 @@ Reloading Monit configuration ...
 RELOAD_MASIC_CONFIG_DB_OUTPUT = """\
 Running command: rm -rf /tmp/dropstat-*
 Stopping SONiC target ...
-Running command: /usr/local/bin/sonic-cfggen  -j /tmp/config.json  --write-to-db
-Running command: /usr/local/bin/sonic-cfggen  -j /tmp/config.json  -n asic0  --write-to-db
-Running command: /usr/local/bin/sonic-cfggen  -j /tmp/config.json  -n asic1  --write-to-db
+Loading /tmp/config.json into CONFIG_DB
+Loading /tmp/config.json into CONFIG_DB of asic0
+Loading /tmp/config.json into CONFIG_DB of asic1
 Restarting SONiC target ...
 Reloading Monit configuration ...
 """
@@ -84,8 +84,8 @@ def mock_run_command_side_effect(*args, **kwargs):
             return 'snmp.timer'
         elif command == "systemctl list-dependencies --plain sonic.target | sed '1d'":
             return 'swss'
-        elif command == "systemctl is-enabled snmp.timer":
-            return 'enabled'
+        elif command == "systemctl show snmp.timer --all --property=UnitFileState":
+            return 'UnitFileState=enabled'
         else:
             return ''
 
@@ -162,11 +162,10 @@ class TestLoadMinigraph(object):
             traceback.print_tb(result.exc_info[2])
             assert result.exit_code == 0
             assert "\n".join([l.rstrip() for l in result.output.split('\n')]) == load_minigraph_command_output
-            # Verify "systemctl reset-failed" is called for services under sonic.target 
-            mock_run_command.assert_any_call('systemctl reset-failed swss')
-            # Verify "systemctl reset-failed" is called for services under sonic-delayed.target 
-            mock_run_command.assert_any_call('systemctl reset-failed snmp')
-            assert mock_run_command.call_count == 11
+            # Verify "systemctl reset-failed" is called in one job for the services under
+            # sonic.target and the enabled ones under sonic-delayed.target
+            mock_run_command.assert_any_call('systemctl reset-failed swss snmp')
+            assert mock_run_command.call_count == 10
 
     def test_load_minigraph_with_port_config_bad_format(self, get_cmd_module, setup_single_broadcom_asic):
         with mock.patch(
@@ -203,12 +202,30 @@ class TestLoadMinigraph(object):
             # From up to down
             db.cfgdb.set_entry("PORT", "Ethernet0", {"admin_status": "up"})
             port_config = [{"PORT": {"Ethernet0": {"admin_status": "down"}}}]
-            self.check_port_config(db, config, port_config, "config interface shutdown Ethernet0")
+            self.check_port_config(db, config, port_config, "Setting admin_status of Ethernet0 to down")
+            assert db.cfgdb.get_entry("PORT", "Ethernet0")["admin_status"] == "down"
 
             # From down to up
             db.cfgdb.set_entry("PORT", "Ethernet0", {"admin_status": "down"})
             port_config = [{"PORT": {"Ethernet0": {"admin_status": "up"}}}]
-            self.check_port_config(db, config, port_config, "config interface startup Ethernet0")
+            self.check_port_config(db, config, port_config, "Setting admin_status of Ethernet0 to up")
+            assert db.cfgdb.get_entry("PORT", "Ethernet0")["admin_status"] == "up"
+
+            # Only the ports whose state changes are written, all in one batch
+            db.cfgdb.set_entry("PORT", "Ethernet0", {"admin_status": "up"})
+            db.cfgdb.set_entry("PORT", "Ethernet4", {"admin_status": "up"})
+            db.cfgdb.set_entry("PORT", "Ethernet8", {"admin_status": "up"})
+            port_config = [{"PORT": {
+                "Ethernet0": {"admin_status": "down"},
+                "Ethernet4": {"admin_status": "up"},
+                "Ethernet8": {"admin_status": "down"}
+            }}]
+            with mock.patch.object(db.cfgdb, "mod_config", wraps=db.cfgdb.mod_config) as mock_mod_config:
+                self.check_port_config(db, config, port_config, "Setting admin_status of Ethernet8 to down")
+                mock_mod_config.assert_called_once_with({"PORT": {
+                    "Ethernet0": {"admin_status": "down"},
+                    "Ethernet8": {"admin_status": "down"}
+                }})
 
     def check_port_config(self, db, config, port_config, expected_output):
         def read_json_file_side_effect(filename):
@@ -216,13 +233,17 @@ class TestLoadMinigraph(object):
         with mock.patch('config.main.read_json_file', mock.MagicMock(side_effect=read_json_file_side_effect)):
             def is_file_side_effect(filename):
                 return True if 'port_config' in filename else False
-            with mock.patch('os.path.isfile', mock.MagicMock(side_effect=is_file_side_effect)):
+            with mock.patch('os.path.isfile', mock.MagicMock(side_effect=is_file_side_effect)), \
+                    mock.patch('config.main.config_loader.connect_config_db',
+                               mock.MagicMock(return_value=db.cfgdb if db else None)) as mock_connect:
                 runner = CliRunner()
                 result = runner.invoke(config.config.commands["load_minigraph"], ["-y"], obj=db)
                 print(result.exit_code)
                 print(result.output)
                 assert result.exit_code == 0
                 assert expected_output in result.output
+                if db:
+                    mock_connect.assert_called_once_with()
 
     @classmethod
     def teardown_class(cls):
@@ -231,6 +252,7 @@ class TestLoadMinigraph(object):
 
 class TestReloadConfig(object):
     dummy_cfg_file = os.path.join(os.sep, "tmp", "config.json")
+    bad_cfg_file = os.path.join(os.sep, "tmp", "bad_config.json")
 
     @classmethod
     def setup_class(cls):
@@ -238,7 +260,10 @@ class TestReloadConfig(object):
         print("SETUP")
         import config.main
         importlib.reload(config.main)
-        open(cls.dummy_cfg_file, 'w').close()
+        with open(cls.dummy_cfg_file, 'w') as f:
+            json.dump({"PORT": {"Ethernet0": {"admin_status": "up"}}}, f)
+        with open(cls.bad_cfg_file, 'w') as f:
+            f.write("{")
 
     def test_reload_config(self, get_cmd_module, setup_single_broadcom_asic):
         with mock.patch(
@@ -282,6 +307,75 @@ class TestReloadConfig(object):
             assert "\n".join([l.rstrip() for l in result.output.split('\n')]) \
                 == RELOAD_MASIC_CONFIG_DB_OUTPUT
 
+    def test_reload_config_masic_parallel(self, get_cmd_module, setup_multi_broadcom_masic):
+        with mock.patch(
+                "utilities_common.cli.run_command",
+                mock.MagicMock(side_effect=mock_run_command_side_effect)
+        ) as mock_run_command:
+            (config, show) = get_cmd_module
+            runner = CliRunner()
+            cfg_files = "{},{},{}".format(
+                            self.dummy_cfg_file,
+                            self.dummy_cfg_file,
+                            self.dummy_cfg_file)
+            result = runner.invoke(
+                config.config.commands["reload"],
+                [cfg_files, '-y', '-f', '--parallel', '--timing'])
+
+            print(result.exit_code)
+            print(result.output)
+            traceback.print_tb(result.exc_info[2])
+            assert result.exit_code == 0
+            lines = [l.rstrip() for l in result.output.split('\n')]
+            assert "[host] Loading /tmp/config.json into CONFIG_DB" in lines
+            assert "[asic0] Loading /tmp/config.json into CONFIG_DB of asic0" in lines
+            assert "[asic1] Loading /tmp/config.json into CONFIG_DB of asic1" in lines
+            assert any(l.startswith("[asic1] PORT") for l in lines)
+            assert lines[-3:-1] == ["Restarting SONiC target ...", "Reloading Monit configuration ..."]
+
+    def test_reload_config_masic_parallel_failure(self, get_cmd_module, setup_multi_broadcom_masic):
+        with mock.patch(
+                "utilities_common.cli.run_command",
+                mock.MagicMock(side_effect=mock_run_command_side_effect)
+        ) as mock_run_command:
+            (config, show) = get_cmd_module
+            runner = CliRunner(mix_stderr=False)
+            cfg_files = "{},{},{}".format(
+                            self.dummy_cfg_file,
+                            self.dummy_cfg_file,
+                            self.bad_cfg_file)
+            result = runner.invoke(
+                config.config.commands["reload"],
+                [cfg_files, '-y', '-f', '--parallel'])
+
+            print(result.exit_code)
+            print(result.output)
+            print(result.stderr)
+            assert result.exit_code == 1
+            assert "[asic1] Failed: /tmp/bad_config.json" in result.stderr
+            assert "Failed to load the config of: asic1" in result.stderr
+            assert "[asic0] Loaded /tmp/config.json" in result.output
+            # Services are not started on a failed load
+            assert "Restarting SONiC target ..." not in result.output
+
+    def test_reload_config_bad_file(self, get_cmd_module, setup_single_broadcom_asic):
+        with mock.patch(
+                "utilities_common.cli.run_command",
+                mock.MagicMock(side_effect=mock_run_command_side_effect)
+        ) as mock_run_command:
+            (config, show) = get_cmd_module
+            runner = CliRunner()
+
+            result = runner.invoke(
+                config.config.commands["reload"],
+                [self.bad_cfg_file, '-y', '-f'])
+
+            print(result.exit_code)
+            print(result.output)
+            assert result.exit_code == 1
+            assert "Failed to load the config: /tmp/bad_config.json" in result.output
+            assert "Restarting SONiC target ..." not in result.output
+
     def test_reload_yang_config(self, get_cmd_module,
                                         setup_single_broadcom_asic):
         with mock.patch(
@@ -305,6 +399,7 @@ class TestReloadConfig(object):
     def teardown_class(cls):
         os.environ['UTILITIES_UNIT_TESTING'] = "0"
         os.remove(cls.dummy_cfg_file)
+        os.remove(cls.bad_cfg_file)
         print("TEARDOWN")
 
  
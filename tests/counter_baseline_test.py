@@ -0,0 +1,82 @@
+import _pickle as pickle
+import datetime
+import os
+import tempfile
+from collections import OrderedDict, namedtuple
+
+from utilities_common.counter_baseline import load_baseline, save_baseline, counters_diff_from_baseline, CounterBaseline
+from utilities_common.netstat import STATUS_NA
+
+Stats = namedtuple("Stats", "rx_ok, rx_err, tx_ok")
+
+
+class TestCounterBaseline(object):
+    def setup_method(self):
+        self.fd, self.path = tempfile.mkstemp()
+        os.close(self.fd)
+        self.cnstat_dict = OrderedDict()
+        self.cnstat_dict['time'] = datetime.datetime(2021, 7, 1, 10, 20, 30, 123456)
+        self.cnstat_dict['Ethernet0'] = Stats('8', STATUS_NA, '18446744073709551614')
+        self.cnstat_dict['Ethernet4'] = Stats('4', '0', '40')
+
+    def teardown_method(self):
+        os.remove(self.path)
+
+    def test_save_and_load(self):
+        save_baseline(self.path, self.cnstat_dict)
+        baseline = load_baseline(self.path, Stats)
+
+        assert isinstance(baseline, CounterBaseline)
+        assert list(baseline) == ['time', 'Ethernet0', 'Ethernet4']
+        assert baseline.get('time') == self.cnstat_dict['time']
+        assert baseline['Ethernet0'] == Stats(8, STATUS_NA, 18446744073709551614)
+        assert baseline['Ethernet4'] == Stats(4, 0, 40)
+        assert baseline.na_mask('Ethernet0') == 0b010
+        assert list(baseline.row('Ethernet0')) == [8, 0, 18446744073709551614]
+        assert 'Ethernet8' not in baseline
+        assert baseline.get('Ethernet8') is None
+
+    def test_diff(self):
+        save_baseline(self.path, self.cnstat_dict)
+        baseline = load_baseline(self.path, Stats)
+
+        assert baseline.diff('Ethernet0', Stats('10', '5', '18446744073709551615')) == [2, 5, 1]
+        assert baseline.diff('Ethernet4', Stats('1', STATUS_NA, '50')) == [0, STATUS_NA, 10]
+        assert baseline.diff('Ethernet8', Stats('1', '2', '3')) == [1, 2, 3]
+
+    def test_counters_diff_from_baseline(self):
+        save_baseline(self.path, self.cnstat_dict)
+        baseline = load_baseline(self.path, Stats)
+        keys = ['Ethernet0', 'Ethernet8']
+        new_rows = [Stats('10', '5', '18446744073709551615'), Stats('1', '2', '3')]
+
+        assert counters_diff_from_baseline(baseline, keys, new_rows) == [[2, 5, 1], [1, 2, 3]]
+        assert counters_diff_from_baseline(self.cnstat_dict, keys, new_rows) == [[2, 5, 1], [1, 2, 3]]
+        assert counters_diff_from_baseline({}, keys, new_rows) == [[10, 5, 18446744073709551615], [1, 2, 3]]
+
+    def test_na_mask_over_64_fields(self):
+        WideStats = namedtuple("WideStats", ["c{}".format(i) for i in range(70)])
+        values = [str(i) for i in range(70)]
+        values[1] = STATUS_NA
+        values[68] = STATUS_NA
+        cnstat_dict = OrderedDict([('time', None), ('Ethernet0', WideStats._make(values))])
+        save_baseline(self.path, cnstat_dict)
+        baseline = load_baseline(self.path, WideStats)
+
+        assert baseline.na_mask('Ethernet0') == (1 << 1) | (1 << 68)
+        assert baseline['Ethernet0'] == WideStats._make(STATUS_NA if value == STATUS_NA else int(value)
+                                                        for value in values)
+
+    def test_empty_snapshot(self):
+        cnstat_dict = OrderedDict()
+        cnstat_dict['time'] = self.cnstat_dict['time']
+        save_baseline(self.path, cnstat_dict)
+        baseline = load_baseline(self.path, Stats)
+
+        assert dict(baseline) == {'time': self.cnstat_dict['time']}
+
+    def test_load_pickled_snapshot(self):
+        with open(self.path, 'wb') as f:
+            pickle.dump(self.cnstat_dict, f)
+
+        assert load_baseline(self.path, Stats) == self.cnstat_dict
@@ -0,0 +1,147 @@
+import os
+import tempfile
+import threading
+from unittest import mock
+
+from utilities_common import db_broker
+from utilities_common.bulk_db import get_all_bulk
+
+
+class FakeConnector(object):
+    COUNTERS_DB = 'COUNTERS_DB'
+
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self.data = {
+            'COUNTERS:oid:0x1': {'SAI_PORT_STAT_IF_IN_UCAST_PKTS': '8'},
+            'COUNTERS:oid:0x2': {'SAI_PORT_STAT_IF_IN_UCAST_PKTS': '4'},
+        }
+
+    def get(self, db_name, _hash, key):
+        return self.data.get(_hash, {}).get(key)
+
+    def get_all(self, db_name, _hash):
+        return self.data.get(_hash, {})
+
+    def keys(self, db_name, pattern='*'):
+        return list(self.data.keys())
+
+    def exists(self, db_name, key):
+        return key in self.data
+
+    def get_redis_client(self, db_name):
+        return object()
+
+
+class TestDbBroker(object):
+    def setup_method(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.tmpdir, 'broker.sock')
+        self.env = mock.patch.dict(os.environ, {db_broker.BROKER_SOCKET_ENV: self.socket_path})
+        self.env.start()
+        db_broker._client = None
+
+    def teardown_method(self):
+        self.env.stop()
+        db_broker._client = None
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        os.rmdir(self.tmpdir)
+
+    def start_server(self):
+        server = db_broker._BrokerServer(self.socket_path, db_broker._RequestHandler)
+        server.broker = db_broker.DbBroker()
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return server
+
+    def test_not_available(self):
+        assert not db_broker.is_available()
+        with mock.patch('sonic_py_common.multi_asic.connect_to_all_dbs_for_ns',
+                        side_effect=FakeConnector) as mock_connect:
+            db = db_broker.connect_to_all_dbs_for_ns('asic0')
+        assert isinstance(db, FakeConnector)
+        mock_connect.assert_called_once_with('asic0')
+
+    def test_reads_through_broker(self):
+        with mock.patch('sonic_py_common.multi_asic.connect_to_all_dbs_for_ns',
+                        side_effect=FakeConnector) as mock_connect:
+            server = self.start_server()
+            try:
+                assert db_broker.is_available()
+                db = db_broker.connect_to_all_dbs_for_ns('asic0')
+                assert isinstance(db, db_broker.BrokerConnector)
+                assert db.COUNTERS_DB == 'COUNTERS_DB'
+                assert db.get(db.COUNTERS_DB, 'COUNTERS:oid:0x1', 'SAI_PORT_STAT_IF_IN_UCAST_PKTS') == '8'
+                assert db.get_all(db.COUNTERS_DB, 'COUNTERS:oid:0x2') == {'SAI_PORT_STAT_IF_IN_UCAST_PKTS': '4'}
+                assert db.exists(db.COUNTERS_DB, 'COUNTERS:oid:0x3') is False
+                assert sorted(db.keys(db.COUNTERS_DB, 'COUNTERS:*')) == ['COUNTERS:oid:0x1', 'COUNTERS:oid:0x2']
+                result = get_all_bulk(db, db.COUNTERS_DB, ['COUNTERS:oid:0x1', 'COUNTERS:oid:0x3'])
+                assert result == {'COUNTERS:oid:0x1': {'SAI_PORT_STAT_IF_IN_UCAST_PKTS': '8'},
+                                  'COUNTERS:oid:0x3': {}}
+            finally:
+                server.shutdown()
+                server.server_close()
+        # Only the broker connected to the database, and only once
+        mock_connect.assert_called_once_with('asic0')
+
+    def test_unsupported_operation(self):
+        broker = db_broker.DbBroker()
+        assert 'error' in broker.handle({'namespace': '', 'op': 'set', 'args': []})
+
+    def test_fallback_when_broker_is_down(self):
+        # A stale socket file without a listening broker
+        open(self.socket_path, 'w').close()
+        with mock.patch('sonic_py_common.multi_asic.connect_to_all_dbs_for_ns',
+                        side_effect=FakeConnector):
+            db = db_broker.connect_to_all_dbs_for_ns('')
+            assert db.get_all(db.COUNTERS_DB, 'COUNTERS:oid:0x1') == {'SAI_PORT_STAT_IF_IN_UCAST_PKTS': '8'}
+
+    def test_connector_not_shared_by_concurrent_requests(self):
+        broker = db_broker.DbBroker()
+        with mock.patch('sonic_py_common.multi_asic.connect_to_all_dbs_for_ns',
+                        side_effect=FakeConnector) as mock_connect:
+            db1 = broker.acquire_connector('')
+            db2 = broker.acquire_connector('')
+            assert db1 is not db2
+            broker.release_connector('', db1)
+            assert broker.acquire_connector('') is db1
+        assert mock_connect.call_count == 2
+
+    def test_stale_connector_dropped(self):
+        stale = FakeConnector('')
+        stale.get_all = mock.Mock(side_effect=OSError('Connection reset'))
+        broker = db_broker.DbBroker()
+        broker.release_connector('', stale)
+        with mock.patch('sonic_py_common.multi_asic.connect_to_all_dbs_for_ns',
+                        side_effect=FakeConnector):
+            response = broker.handle({'namespace': '', 'op': 'get_all', 'args': ['COUNTERS_DB', 'COUNTERS:oid:0x1']})
+        assert response == {'result': {'SAI_PORT_STAT_IF_IN_UCAST_PKTS': '8'}}
+        assert stale not in broker.idle_connectors['']
+        assert len(broker.idle_connectors['']) == 1
+
+    def test_client_connection_per_thread(self):
+        with mock.patch('sonic_py_common.multi_asic.connect_to_all_dbs_for_ns',
+                        side_effect=FakeConnector):
+            server = self.start_server()
+            try:
+                client = db_broker.get_client()
+                sockets = []
+
+                def read():
+                    assert client.call('', 'get', ['COUNTERS_DB', 'COUNTERS:oid:0x1',
+                                                   'SAI_PORT_STAT_IF_IN_UCAST_PKTS']) == '8'
+                    sockets.append(client.local.sock)
+                    client.close()
+
+                threads = [threading.Thread(target=read) for _ in range(2)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            finally:
+                server.shutdown()
+                server.server_close()
+        assert len(sockets) == 2
+        assert sockets[0] is not sockets[1]
@@ -0,0 +1,115 @@
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from utilities_common import db as db_module
+from utilities_common.db import Db
+
+
+class FakeV2Connector(object):
+    STATE_DB = 'STATE_DB'
+
+    def __init__(self, **kwargs):
+        self.namespace = kwargs.get('namespace', '')
+        self.connected = []
+
+    def get_db_list(self):
+        return ['APPL_DB', 'STATE_DB', 'COUNTERS_DB']
+
+    def get_db_separator(self, db_name):
+        return '|'
+
+    def connect(self, db_name, retry_on=True):
+        self.connected.append(db_name)
+
+    def get_all(self, db_name, _hash):
+        assert db_name in self.connected
+        return {'state': 'ok'}
+
+
+class SlowV2Connector(FakeV2Connector):
+    def connect(self, db_name, retry_on=True):
+        time.sleep(0.05)
+        super(SlowV2Connector, self).connect(db_name, retry_on)
+
+
+class FakeConfigDBConnector(object):
+    def __init__(self, **kwargs):
+        self.namespace = kwargs.get('namespace', '')
+        self.connected = False
+
+    def connect(self):
+        self.connected = True
+
+    def get_table(self, table):
+        return {'localhost': {'hostname': self.namespace or 'sonic'}}
+
+
+class TestDb(object):
+    def setup_method(self):
+        self.patches = [
+            mock.patch.object(db_module, 'SonicV2Connector', FakeV2Connector),
+            mock.patch.object(db_module, 'ConfigDBConnector', FakeConfigDBConnector),
+            mock.patch.object(db_module.db_broker, 'is_available', mock.Mock(return_value=False)),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def teardown_method(self):
+        for patch in self.patches:
+            patch.stop()
+
+    def test_nothing_connected_on_creation(self):
+        db = Db()
+        assert db.opened_connections == []
+        assert list(db.cfgdb_clients) == ['']
+        assert list(db.db_clients) == ['']
+
+    def test_connect_on_first_use(self):
+        db = Db()
+        assert db.get_data('DEVICE_METADATA', 'localhost') == {'hostname': 'sonic'}
+        assert db.opened_connections == [('', 'CONFIG_DB')]
+
+        assert db.db.get_db_separator(db.db.STATE_DB) == '|'
+        assert db.opened_connections == [('', 'CONFIG_DB')]
+
+        assert db.db.get_all(db.db.STATE_DB, 'FEATURE|bgp') == {'state': 'ok'}
+        assert db.db.get_all(db.db.STATE_DB, 'FEATURE|swss') == {'state': 'ok'}
+        assert db.opened_connections == [('', 'CONFIG_DB'), ('', 'STATE_DB')]
+        assert db.db._connector.connected == ['STATE_DB']
+
+    def test_multi_asic_namespace_connected_on_lookup(self):
+        with mock.patch('sonic_py_common.multi_asic.is_multi_asic', return_value=True), \
+                mock.patch.object(db_module, 'multi_asic_ns_choices', return_value=['asic0', 'asic1']):
+            db = Db()
+        assert list(db.cfgdb_clients) == ['', 'asic0', 'asic1']
+        assert db.cfgdb_clients.get('asic2') is None
+
+        assert db.cfgdb_clients['asic1'].get_table('DEVICE_METADATA') == {'localhost': {'hostname': 'asic1'}}
+        db.db_clients['asic0'].get_all('APPL_DB', 'PORT_TABLE:Ethernet0')
+        assert db.opened_connections == [('asic1', 'CONFIG_DB'), ('asic0', 'APPL_DB')]
+
+        output = io.StringIO()
+        db.report_connections(output)
+        assert output.getvalue() == "DB connections opened: 2 (asic1/CONFIG_DB, asic0/APPL_DB)\n"
+
+    def test_report_registered_from_environment(self):
+        with mock.patch.dict(os.environ, {db_module.DB_STATS_ENV: '1'}), \
+                mock.patch('atexit.register') as mock_register:
+            db = Db()
+        mock_register.assert_called_once_with(db.report_connections)
+
+        output = io.StringIO()
+        db.report_connections(output)
+        assert output.getvalue() == "DB connections opened: 0\n"
+
+    def test_connect_once_from_threads(self):
+        db = Db()
+        with mock.patch.object(db_module, 'SonicV2Connector', SlowV2Connector), \
+                ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda _: db.db.get_all('STATE_DB', 'FEATURE|bgp'), range(4)))
+        assert results == [{'state': 'ok'}] * 4
+        assert db.opened_connections == [('', 'STATE_DB')]
+        assert db.db._connector.connected == ['STATE_DB']
@@ -0,0 +1,115 @@
+import os
+import sys
+from unittest import mock
+
+from swsscommon.swsscommon import SonicV2Connector
+from tabulate import tabulate
+
+test_path = os.path.dirname(os.path.abspath(__file__))
+modules_path = os.path.dirname(test_path)
+sys.path.insert(0, test_path)
+sys.path.insert(0, modules_path)
+
+import mock_tables.dbconnector
+
+from utilities_common import bulk_db
+from utilities_common.fdb_reader import FDB_ENTRY_PREFIX, FDB_TABLE_HEADER, VLAN_PREFIX, FdbEntry, FdbReader, \
+    format_fdb_table
+
+mock_db_path = os.path.join(test_path, "fdbshow_input")
+
+
+class SwssClient(object):
+    """
+    Redis client of a swsscommon connector, which supports neither SCAN nor pipelines
+    """
+    def __init__(self, client):
+        self.client = client
+
+    def keys(self, pattern):
+        return self.client.keys(pattern)
+
+
+class SwssConnector(object):
+    def __init__(self, db):
+        self.db = db
+
+    def get_redis_client(self, db_name):
+        return SwssClient(self.db.get_redis_client(db_name))
+
+    def get_all(self, db_name, key, blocking=False):
+        assert not key.startswith((FDB_ENTRY_PREFIX, VLAN_PREFIX)), "FDB entries and VLANs must be read with pipelines"
+        return self.db.get_all(db_name, key, blocking)
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+
+class TestFdbReader(object):
+    @classmethod
+    def setup_class(cls):
+        os.environ["UTILITIES_UNIT_TESTING"] = "1"
+        mock_tables.dbconnector.dedicated_dbs['ASIC_DB'] = os.path.join(mock_db_path, 'asic_db')
+        mock_tables.dbconnector.dedicated_dbs['COUNTERS_DB'] = os.path.join(mock_db_path, 'counters_db')
+
+    def get_reader(self, batch_size=2):
+        db = SonicV2Connector(host='127.0.0.1')
+        db.connect(db.ASIC_DB)
+        return FdbReader(db, batch_size=batch_size)
+
+    def test_bvid_vlan_map(self):
+        bvid_vlan_map = self.get_reader().get_bvid_vlan_map()
+        assert bvid_vlan_map['oid:0x260000000005c5'] == '2'
+        assert bvid_vlan_map['oid:0x260000000007c7'] == '4'
+
+    def test_get_entries(self):
+        entries = self.get_reader().get_entries()
+        assert entries == [
+            FdbEntry(2, '11:22:33:44:55:66', 'Ethernet0', 'Dynamic'),
+            FdbEntry(3, '11:22:33:66:55:44', 'Ethernet4', 'Static'),
+            FdbEntry(4, '66:55:44:33:22:11', 'Ethernet0', 'Dynamic'),
+            FdbEntry(4, '77:66:44:33:22:11', '1000000000fff', 'Dynamic'),
+            FdbEntry(5, '77:66:55:44:22:11', 'Ethernet4', 'Dynamic'),
+        ]
+
+    def test_filter_entries(self):
+        reader = self.get_reader()
+        assert reader.get_entries(vlan=4, port='Ethernet0') == [
+            FdbEntry(4, '66:55:44:33:22:11', 'Ethernet0', 'Dynamic')]
+        assert reader.count_entries(port='Ethernet4') == 2
+
+        for vlan, port, error in ((123, None, "123 is not in list"),
+                                  (2, 'Ethernet4', "'Ethernet4' is not in list")):
+            try:
+                reader.count_entries(vlan, port)
+            except ValueError as e:
+                assert str(e) == error
+            else:
+                assert False, "ValueError not raised"
+
+    def test_get_entries_swsscommon_connector(self):
+        db = self.get_reader().db
+        socket_client = db.get_redis_client(db.ASIC_DB)
+        reader = FdbReader(SwssConnector(db), batch_size=2)
+
+        with mock.patch.object(bulk_db, 'redis') as mock_redis, \
+                mock.patch.object(bulk_db, '_socket_clients', {}), \
+                mock.patch.object(bulk_db.SonicDBConfig, 'getDbSock', return_value='/var/run/redis/redis.sock'), \
+                mock.patch.object(bulk_db.SonicDBConfig, 'getDbId', return_value=1), \
+                mock.patch('os.path.exists', return_value=True):
+            mock_redis.Redis.return_value = socket_client
+            entries = reader.get_entries()
+
+        assert entries == self.get_reader().get_entries()
+        assert len(entries) == 5
+
+    def test_format_fdb_table(self):
+        entries = self.get_reader().get_entries()
+        rows = [(index,) + tuple(entry) for index, entry in enumerate(entries, 1)]
+        assert list(format_fdb_table(entries)) == tabulate(rows, FDB_TABLE_HEADER).splitlines()
+        assert list(format_fdb_table([])) == tabulate([], FDB_TABLE_HEADER).splitlines()
+
+    @classmethod
+    def teardown_class(cls):
+        os.environ["UTILITIES_UNIT_TESTING"] = "0"
+        mock_tables.dbconnector.dedicated_dbs = {}
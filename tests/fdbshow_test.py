@@ -36,6 +36,10 @@ show_mac__port_vlan_output = """\
 Total number of entries 1
 """
 
+show_mac_count_output = """\
+Total number of entries 2
+"""
+
 show_mac_no_results_output = """\
 No.    Vlan    MacAddress    Port    Type
 -----  ------  ------------  ------  ------
@@ -116,6 +120,21 @@ class TestFdbshow():
         assert return_code == 0
         assert result == show_mac__port_vlan_output
 
+    def test_show_mac_count(self):
+        self.set_mock_variant("1")
+
+        result = self.runner.invoke(show.cli.commands["mac"], "-v 4 -c")
+        print(result.exit_code)
+        print(result.output)
+        assert result.exit_code == 0
+        assert result.output == show_mac_count_output
+
+        return_code, result = get_result_and_return_code('fdbshow -v 4 -c')
+        print("return_code: {}".format(return_code))
+        print("result = {}".format(result))
+        assert return_code == 0
+        assert result == show_mac_count_output
+
     def test_show_mac_no_port(self):
         self.set_mock_variant("1")
 
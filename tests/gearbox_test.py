@@ -1,7 +1,7 @@
 import sys
 import os
 from click.testing import CliRunner
-from unittest import TestCase
+from unittest import TestCase, mock
 
 test_path = os.path.dirname(os.path.abspath(__file__))
 modules_path = os.path.dirname(test_path)
@@ -44,6 +44,19 @@ class TestGearbox(TestCase):
         )
         self.assertEqual(result.output.strip(), expected_output)
     
+    def test_gearbox_configured_cached_per_boot(self):
+        with mock.patch.dict(os.environ):
+            del os.environ["UTILITIES_UNIT_TESTING"]
+            with mock.patch("utilities_common.util_base.UtilHelper.read_boot_cache", return_value=None), \
+                    mock.patch("utilities_common.util_base.UtilHelper.write_boot_cache") as mock_write:
+                self.assertTrue(show.is_gearbox_configured())
+                mock_write.assert_called_once_with(show.GEARBOX_CACHE_NAME, True)
+
+            with mock.patch("utilities_common.util_base.UtilHelper.read_boot_cache", return_value=False), \
+                    mock.patch("show.main.SonicV2Connector") as mock_connector:
+                self.assertFalse(show.is_gearbox_configured())
+                mock_connector.assert_not_called()
+
     @classmethod
     def teardown_class(cls):
         print("TEARDOWN")
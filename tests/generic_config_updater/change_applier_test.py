@@ -73,17 +73,15 @@ def debug_print(msg):
     print(msg)
 
 
-# Mimics os.system call for sonic-cfggen -d --print-data > filename
+# Mimics reading CONFIG_DB as sonic-cfggen -d --print-data does
 #
-def os_system_cfggen(cmd):
+def read_config_db_as_json(config_db):
     global running_config
 
-    fname = cmd.split(">")[-1].strip()
-    with open(fname, "w") as s:
-        s.write(json.dumps(running_config, indent=4))
-    debug_print("File created {} type={} cfg={}".format(fname,
+    assert config_db == DB_HANDLE
+    debug_print("Config read type={} cfg={}".format(
         type(running_config), json.dumps(running_config)[1:40]))
-    return 0
+    return copy.deepcopy(running_config)
 
 
 # mimics config_db.set_entry
@@ -116,6 +114,14 @@ def set_entry(config_db, tbl, key, data):
         change_data.pop(tbl)
 
 
+# mimics config_db.mod_config, which writes a batch of entries
+#
+def mod_config(config_db, data):
+    for tbl in data:
+        for key in data[tbl]:
+            set_entry(config_db, tbl, key, data[tbl][key])
+
+
 # mimics JsonChange.apply
 #
 class mock_obj:
@@ -210,16 +216,18 @@ def vlan_validate(old_cfg, new_cfg, keys):
 
 class TestChangeApplier(unittest.TestCase):
 
-    @patch("generic_config_updater.change_applier.os.system")
+    @patch("generic_config_updater.change_applier.read_config_db_as_json")
     @patch("generic_config_updater.change_applier.get_config_db")
+    @patch("generic_config_updater.change_applier.mod_config")
     @patch("generic_config_updater.change_applier.set_config")
-    def test_change_apply(self, mock_set, mock_db, mock_os_sys):
+    def test_change_apply(self, mock_set, mock_mod, mock_db, mock_read):
         global read_data, running_config, json_changes, json_change_index
         global start_running_config
 
-        mock_os_sys.side_effect = os_system_cfggen
+        mock_read.side_effect = read_config_db_as_json
         mock_db.return_value = DB_HANDLE
         mock_set.side_effect = set_entry
+        mock_mod.side_effect = mod_config
 
         with open(DATA_FILE, "r") as s:
             read_data = json.load(s)
@@ -242,8 +250,12 @@ class TestChangeApplier(unittest.TestCase):
             
             debug_print("main: json_change_index={}".format(json_change_index))
 
+            mod_calls = mock_mod.call_count
             applier.apply(mock_obj())
 
+            # All the keys of a change are written in one batch
+            assert mock_mod.call_count - mod_calls <= 1
+
             debug_print(f"Testing json_change {json_change_index}")
 
             debug_print("Checking: index={} update:{} remove:{} svcs:{}".format(i,
@@ -257,6 +269,12 @@ class TestChangeApplier(unittest.TestCase):
 
         debug_print("All changes applied & tested")
 
+        # CONFIG_DB is read once for the first change, and once more to
+        # verify all the changes are reflected
+        assert mock_read.call_count == 1
+        assert applier.verify() == 0
+        assert mock_read.call_count == 2
+
         # Test data is set up in such a way the multiple changes
         # finally brings it back to original config.
         #
@@ -269,6 +287,64 @@ class TestChangeApplier(unittest.TestCase):
         debug_print("all good for applier")
 
 
+    @patch("generic_config_updater.change_applier.read_config_db_as_json")
+    @patch("generic_config_updater.change_applier.get_config_db")
+    @patch("generic_config_updater.change_applier.mod_config")
+    @patch("generic_config_updater.change_applier.set_config")
+    def test_verify__config_db_changed__failure(self, mock_set, mock_mod, mock_db, mock_read):
+        generic_config_updater.change_applier.UPDATER_CONF_FILE = CONF_FILE
+        mock_db.return_value = DB_HANDLE
+        mock_read.side_effect = [{"PORT": {"Ethernet0": {"mtu": "9100"}}},
+                                 {"PORT": {"Ethernet0": {"mtu": "1500"}}}]
+        change = Mock()
+        change.apply.side_effect = lambda config: config
+
+        applier = generic_config_updater.change_applier.ChangeApplier()
+        applier._services_validate = Mock(return_value=0)
+        applier.apply(change)
+
+        assert applier.verify() == -1
+        mock_set.assert_not_called()
+        mock_mod.assert_not_called()
+        # Nothing applied since, nothing to verify
+        assert applier.verify() == 0
+        assert mock_read.call_count == 2
+
+
+    @patch("generic_config_updater.change_applier.read_config_db_as_json")
+    @patch("generic_config_updater.change_applier.get_config_db")
+    @patch("generic_config_updater.change_applier.mod_config")
+    @patch("generic_config_updater.change_applier.set_config")
+    def test_apply__multiple_keys__written_in_one_batch(self, mock_set, mock_mod, mock_db, mock_read):
+        generic_config_updater.change_applier.UPDATER_CONF_FILE = CONF_FILE
+        mock_db.return_value = DB_HANDLE
+        mock_read.return_value = {
+            "PORT": {"Ethernet0": {"mtu": "9100", "admin_status": "up"},
+                     "Ethernet4": {"mtu": "9100"}},
+            "VLAN_MEMBER": {"Vlan1000|Ethernet0": {"tagging_mode": "untagged"}},
+            "ACL_TABLE": {"EVERFLOW": {"ports": ["Ethernet0"]}}}
+        upd_data = {
+            "PORT": {"Ethernet0": {"mtu": "9100"},
+                     "Ethernet4": {"mtu": "1500"},
+                     "Ethernet8": {"mtu": "9100"}},
+            "VLAN": {"Vlan1000": {}},
+            "ACL_TABLE": {"EVERFLOW": {"ports": ["Ethernet0"]}}}
+        change = Mock()
+        change.apply.side_effect = lambda config: copy.deepcopy(upd_data)
+
+        applier = generic_config_updater.change_applier.ChangeApplier()
+        applier._services_validate = Mock(return_value=0)
+        assert applier.apply(change) == 0
+
+        # Ethernet0 has a field removed, so it is replaced on its own
+        mock_set.assert_called_once_with(DB_HANDLE, "PORT", "Ethernet0", {"mtu": "9100"})
+        mock_mod.assert_called_once_with(DB_HANDLE, {
+            "PORT": {"Ethernet4": {"mtu": "1500"}, "Ethernet8": {"mtu": "9100"}},
+            "VLAN": {"Vlan1000": {}},
+            "VLAN_MEMBER": {"Vlan1000|Ethernet0": None}})
+        assert applier.running_config == upd_data
+
+
 class TestDryRunChangeApplier(unittest.TestCase):
     def test_apply__calls_apply_change_to_config_db(self):
         # Arrange
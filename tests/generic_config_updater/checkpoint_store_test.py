@@ -0,0 +1,136 @@
+import json
+import os
+import shutil
+import unittest
+
+from generic_config_updater.checkpoint_store import CheckpointStore
+
+class TestCheckpointStore(unittest.TestCase):
+    def setUp(self):
+        self.checkpoints_dir = os.path.join(os.getcwd(), "checkpoints")
+        self.clean_up()
+        self.store = CheckpointStore(self.checkpoints_dir)
+        self.config = {
+            "PORT": {"Ethernet0": {"lanes": "65", "admin_status": "up"}},
+            "VLAN": {"Vlan1000": {"vlanid": "1000"}},
+            "DEVICE_METADATA": {"localhost": {"hostname": "sonic"}}
+        }
+
+    def tearDown(self):
+        self.clean_up()
+
+    def test_save_and_load__same_config(self):
+        self.store.save("checkpoint1", self.config)
+
+        self.assertEqual(self.config, self.store.load("checkpoint1"))
+        self.assertEqual(3, self.count_objects())
+
+    def test_save__unchanged_tables_shared(self):
+        self.store.save("checkpoint1", self.config)
+        self.set_older_mtime("checkpoint1")
+        config2 = json.loads(json.dumps(self.config))
+        config2["VLAN"]["Vlan1000"]["mtu"] = "9100"
+        del config2["DEVICE_METADATA"]
+        config2["ACL_TABLE"] = {"DATAACL": {"type": "L3"}}
+
+        self.store.save("checkpoint2", config2)
+
+        self.assertEqual(config2, self.store.load("checkpoint2"))
+        # PORT is stored once, VLAN twice, DEVICE_METADATA and ACL_TABLE once each
+        self.assertEqual(5, self.count_objects())
+        self.assertEqual(("checkpoint1", {"added": ["ACL_TABLE"], "removed": ["DEVICE_METADATA"], "modified": ["VLAN"]}),
+                         self.store.get_diff("checkpoint2"))
+        self.assertEqual((None, {"added": ["DEVICE_METADATA", "PORT", "VLAN"], "removed": [], "modified": []}),
+                         self.store.get_diff("checkpoint1"))
+
+    def test_load__current_config__only_changed_tables_read(self):
+        self.store.save("checkpoint1", self.config)
+        current_config = json.loads(json.dumps(self.config))
+        current_config["VLAN"]["Vlan1000"]["mtu"] = "9100"
+        current_config["ACL_TABLE"] = {"DATAACL": {"type": "L3"}}
+
+        # Remove the objects of the unchanged tables, they must be taken from the current config
+        for table in ["PORT", "DEVICE_METADATA"]:
+            os.remove(self.store._get_object_path(CheckpointStore.hash_table(self.config[table])))
+        actual = self.store.load("checkpoint1", current_config)
+
+        self.assertEqual(self.config, actual)
+        self.assertEqual(["ACL_TABLE", "VLAN"], self.store.get_changed_tables("checkpoint1", current_config))
+
+    def test_delete__unreferenced_objects_removed(self):
+        self.store.save("checkpoint1", self.config)
+        config2 = dict(self.config, VLAN={"Vlan2000": {"vlanid": "2000"}})
+        self.store.save("checkpoint2", config2)
+        self.assertEqual(4, self.count_objects())
+
+        self.store.delete("checkpoint1")
+
+        self.assertFalse(self.store.exists("checkpoint1"))
+        self.assertEqual(["checkpoint2"], self.store.list())
+        self.assertEqual(config2, self.store.load("checkpoint2"))
+        self.assertEqual(3, self.count_objects())
+
+    def test_delete__children_reparented(self):
+        config2 = dict(self.config, VLAN={"Vlan2000": {"vlanid": "2000"}})
+        config3 = dict(config2, PORT={})
+        self.store.save("checkpoint1", self.config)
+        self.set_older_mtime("checkpoint1", 20)
+        self.store.save("checkpoint2", config2)
+        self.set_older_mtime("checkpoint2", 10)
+        self.store.save("checkpoint3", config3)
+        mtime = os.path.getmtime(self.store._get_checkpoint_full_path("checkpoint3"))
+
+        self.store.delete("checkpoint2")
+
+        self.assertEqual(("checkpoint1", {"added": [], "removed": [], "modified": ["PORT", "VLAN"]}),
+                         self.store.get_diff("checkpoint3"))
+        self.assertEqual(mtime, os.path.getmtime(self.store._get_checkpoint_full_path("checkpoint3")))
+
+        self.store.delete("checkpoint1")
+
+        self.assertEqual((None, {"added": ["DEVICE_METADATA", "PORT", "VLAN"], "removed": [], "modified": []}),
+                         self.store.get_diff("checkpoint3"))
+        self.assertEqual(config3, self.store.load("checkpoint3"))
+
+    def test_save__same_name__replaced_objects_removed_and_children_reparented(self):
+        config2 = dict(self.config, VLAN={"Vlan2000": {"vlanid": "2000"}})
+        self.store.save("checkpoint1", self.config)
+        self.set_older_mtime("checkpoint1")
+        self.store.save("checkpoint2", config2)
+        self.assertEqual(4, self.count_objects())
+
+        config1 = dict(self.config, VLAN={"Vlan3000": {"vlanid": "3000"}})
+        self.store.save("checkpoint1", config1)
+
+        self.assertEqual(config1, self.store.load("checkpoint1"))
+        self.assertEqual(config2, self.store.load("checkpoint2"))
+        # The VLAN of the replaced checkpoint is no longer referenced
+        self.assertEqual(4, self.count_objects())
+        self.assertEqual((None, {"added": ["DEVICE_METADATA", "PORT", "VLAN"], "removed": [], "modified": []}),
+                         self.store.get_diff("checkpoint2"))
+        self.assertEqual(("checkpoint2", {"added": [], "removed": [], "modified": ["VLAN"]}),
+                         self.store.get_diff("checkpoint1"))
+
+    def test_legacy_checkpoint__full_config_file__loaded(self):
+        os.makedirs(self.checkpoints_dir)
+        with open(os.path.join(self.checkpoints_dir, "legacy.cp.json"), "w") as fh:
+            fh.write(json.dumps(self.config))
+
+        self.store.save("checkpoint1", self.config)
+
+        self.assertEqual(self.config, self.store.load("legacy"))
+        self.assertEqual((None, None), self.store.get_diff("legacy"))
+        self.assertEqual(("legacy", {"added": [], "removed": [], "modified": []}), self.store.get_diff("checkpoint1"))
+        self.assertCountEqual(["legacy", "checkpoint1"], self.store.list())
+
+    def count_objects(self):
+        return sum(len(files) for _, _, files in os.walk(self.store.objects_dir))
+
+    def set_older_mtime(self, name, seconds=10):
+        path = self.store._get_checkpoint_full_path(name)
+        mtime = os.path.getmtime(path) - seconds
+        os.utime(path, (mtime, mtime))
+
+    def clean_up(self):
+        if os.path.isdir(self.checkpoints_dir):
+            shutil.rmtree(self.checkpoints_dir)
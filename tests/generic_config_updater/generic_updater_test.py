@@ -8,6 +8,7 @@ from .gutest_helpers import create_side_effect_dict, Files
 import generic_config_updater.generic_updater as gu
 import generic_config_updater.patch_sorter as ps
 import generic_config_updater.change_applier as ca
+from generic_config_updater.checkpoint_store import CheckpointStore
 
 # import sys
 # sys.path.insert(0,'../../generic_config_updater')
@@ -28,6 +29,13 @@ class TestPatchApplier(unittest.TestCase):
         # Act and assert
         self.assertRaises(gu.GenericConfigUpdaterError, patch_applier.apply, Files.MULTI_OPERATION_CONFIG_DB_PATCH)
 
+    def test_apply__config_db_not_matching_applied_changes__failure(self):
+        # Arrange
+        patch_applier = self.__create_patch_applier(verified_applied_changes=False)
+
+        # Act and assert
+        self.assertRaises(gu.GenericConfigUpdaterError, patch_applier.apply, Files.MULTI_OPERATION_CONFIG_DB_PATCH)
+
     def test_apply__no_errors__update_successful(self):
         # Arrange
         changes = [Mock(), Mock()]
@@ -42,13 +50,15 @@ class TestPatchApplier(unittest.TestCase):
             [call(Files.MULTI_OPERATION_CONFIG_DB_PATCH, Files.CONFIG_DB_AS_JSON)])
         patch_applier.patchsorter.sort.assert_has_calls([call(Files.MULTI_OPERATION_CONFIG_DB_PATCH)])
         patch_applier.changeapplier.apply.assert_has_calls([call(changes[0]), call(changes[1])])
+        patch_applier.changeapplier.verify.assert_called_once_with()
         patch_applier.patch_wrapper.verify_same_json.assert_has_calls(
             [call(Files.CONFIG_DB_AFTER_MULTI_PATCH, Files.CONFIG_DB_AFTER_MULTI_PATCH)])
 
     def __create_patch_applier(self,
                                changes=None,
                                valid_patch_does_not_produce_empty_tables=True,
-                               verified_same_config=True):
+                               verified_same_config=True,
+                               verified_applied_changes=True):
         config_wrapper = Mock()
         config_wrapper.get_config_db_as_json.side_effect = \
             [Files.CONFIG_DB_AS_JSON, Files.CONFIG_DB_AFTER_MULTI_PATCH]
@@ -73,6 +83,7 @@ class TestPatchApplier(unittest.TestCase):
 
         changeapplier = Mock()
         changeapplier.apply.side_effect = create_side_effect_dict({(str(changes[0]),): 0, (str(changes[1]),): 0})
+        changeapplier.verify.return_value = 0 if verified_applied_changes else -1
 
         return gu.PatchApplier(patchsorter, changeapplier, config_wrapper, patch_wrapper)
 
@@ -290,10 +301,7 @@ class TestFileSystemConfigRollbacker(unittest.TestCase):
             fh.write(json.dumps(json_content))
 
     def get_checkpoint(self, name):
-        path=os.path.join(self.checkpoints_dir, f"{name}{self.checkpoint_ext}")
-        with open(path) as fh:
-            text = fh.read()
-            return json.loads(text)
+        return CheckpointStore(self.checkpoints_dir).load(name)
 
     def check_checkpoint_exists(self, name):
         path=os.path.join(self.checkpoints_dir, f"{name}{self.checkpoint_ext}")
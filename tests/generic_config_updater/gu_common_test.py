@@ -1,9 +1,12 @@
 import copy
 import json
 import jsonpatch
+import os
+import shutil
 import sonic_yang
+import tempfile
 import unittest
-from unittest.mock import MagicMock, Mock
+from unittest.mock import MagicMock, Mock, patch
 
 from .gutest_helpers import create_side_effect_dict, Files
 import generic_config_updater.gu_common as gu_common
@@ -57,6 +60,31 @@ class TestConfigWrapper(unittest.TestCase):
         self.config_wrapper_mock = gu_common.ConfigWrapper()
         self.config_wrapper_mock.get_config_db_as_json=MagicMock(return_value=Files.CONFIG_DB_AS_JSON)
 
+    def test_get_config_db_as_json__reads_config_db_in_process(self):
+        # Arrange
+        config_db = Mock()
+        config_db.KEY_SEPARATOR = "|"
+        config_db.get_config.return_value = {
+            "PORT": {"Ethernet0": {"lanes": "65", "mtu": "9100"}},
+            "VLAN_MEMBER": {("Vlan1000", "Ethernet0"): {"tagging_mode": "untagged"}},
+            "ACL_TABLE": {"EVERFLOW": {"ports": ["Ethernet0", "Ethernet4"]}}
+        }
+        expected = {
+            "PORT": {"Ethernet0": {"lanes": "65", "mtu": "9100"}},
+            "VLAN_MEMBER": {"Vlan1000|Ethernet0": {"tagging_mode": "untagged"}},
+            "ACL_TABLE": {"EVERFLOW": {"ports": ["Ethernet0", "Ethernet4"]}}
+        }
+        config_wrapper = gu_common.ConfigWrapper()
+
+        # Act
+        with patch("generic_config_updater.gu_common.get_config_db", return_value=config_db) as mock_get_db:
+            actual = config_wrapper.get_config_db_as_json()
+            config_wrapper.get_config_db_as_json()
+
+        # Assert
+        self.assertDictEqual(expected, actual)
+        mock_get_db.assert_called_once_with()
+
     def test_ctor__default_values_set(self):
         config_wrapper = gu_common.ConfigWrapper()
 
@@ -302,6 +330,86 @@ class TestConfigWrapper(unittest.TestCase):
         check(sy1, config_wrapper.sonic_yang_with_loaded_models)
         check(sy2, config_wrapper.sonic_yang_with_loaded_models)
 
+class TestYangModelsCache(unittest.TestCase):
+    def setUp(self):
+        self.yang_dir = tempfile.mkdtemp()
+        self.cache_dir = tempfile.mkdtemp()
+        for name in ["sonic-vlan.yang", "sonic-port.yang"]:
+            with open(os.path.join(self.yang_dir, name), "w") as f:
+                f.write(name)
+
+    def tearDown(self):
+        shutil.rmtree(self.yang_dir)
+        shutil.rmtree(self.cache_dir)
+
+    def create_sonic_yang_mock(self, yang_dir):
+        sy = Mock(spec=["loadYangModel", "_load_schema_module"])
+        def load_yang_model():
+            sy.yangFiles = ["sonic-port", "sonic-vlan"]
+            sy.yJson = [{"module": {"@name": "sonic-port"}}, {"module": {"@name": "sonic-vlan"}}]
+            sy.confDbYangMap = {"PORT": {"module": "sonic-port", "yangModule": sy.yJson[0]["module"]}}
+        sy.loadYangModel.side_effect = load_yang_model
+        self.sonic_yangs.append(sy)
+        return sy
+
+    def load(self):
+        self.sonic_yangs = []
+        cache = gu_common.YangModelsCache(self.cache_dir)
+        with patch("generic_config_updater.gu_common.sonic_yang.SonicYang", side_effect=self.create_sonic_yang_mock):
+            sy = cache.get_sonic_yang(self.yang_dir)
+            # Loaded once per process
+            self.assertIs(sy, cache.get_sonic_yang(self.yang_dir))
+        self.assertEqual(1, len(self.sonic_yangs))
+        return sy
+
+    def test_get_sonic_yang__no_cache_file__loads_models_and_writes_cache(self):
+        # Act
+        sy = self.load()
+
+        # Assert
+        sy.loadYangModel.assert_called_once()
+        self.assertEqual(1, len(os.listdir(self.cache_dir)))
+
+    def test_get_sonic_yang__valid_cache_file__only_parses_schema_modules(self):
+        # Arrange
+        expected = self.load()
+
+        # Act
+        actual = self.load()
+
+        # Assert
+        actual.loadYangModel.assert_not_called()
+        self.assertEqual(2, actual._load_schema_module.call_count)
+        self.assertEqual(expected.yangFiles, actual.yangFiles)
+        self.assertEqual(expected.yJson, actual.yJson)
+        self.assertEqual(expected.confDbYangMap, actual.confDbYangMap)
+        self.assertIs(actual.yJson[0]["module"], actual.confDbYangMap["PORT"]["yangModule"])
+
+    def test_get_sonic_yang__yang_file_modified__reloads_models(self):
+        # Arrange
+        self.load()
+        yang_file = os.path.join(self.yang_dir, "sonic-vlan.yang")
+        stat = os.stat(yang_file)
+        os.utime(yang_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+
+        # Act
+        sy = self.load()
+
+        # Assert
+        sy.loadYangModel.assert_called_once()
+
+    def test_get_sonic_yang__cache_dir_not_writable__loads_models(self):
+        # Arrange
+        self.cache_dir = os.path.join(self.cache_dir, "file")
+        open(self.cache_dir, "w").close()
+
+        # Act
+        sy = self.load()
+
+        # Assert
+        sy.loadYangModel.assert_called_once()
+        self.cache_dir = os.path.dirname(self.cache_dir)
+
 class TestPatchWrapper(unittest.TestCase):
     def setUp(self):
         self.config_wrapper_mock = gu_common.ConfigWrapper()
@@ -485,12 +593,192 @@ class TestPatchWrapper(unittest.TestCase):
 
         self.assertTrue(patch_wrapper.verify_same_json(after_update_config_db_cropped, after_update_sonic_yang_as_config_db))
 
+class TestLeafrefIndex(unittest.TestCase):
+    def setUp(self):
+        port_leafref = {"@name": "leafref", "path": {"@value": "/port:sonic-port/port:PORT/port:PORT_LIST/port:name"}}
+        lag_leafref = {"@name": "leafref",
+                       "path": {"@value": "/lag:sonic-portchannel/lag:PORTCHANNEL/lag:PORTCHANNEL_LIST/lag:name"}}
+        vlan_leafref = {"@name": "leafref", "path": {"@value": "/vlan:sonic-vlan/vlan:VLAN/vlan:VLAN_LIST/vlan:name"}}
+        self.conf_db_yang_map = {
+            "ACL_TABLE": {"module": "sonic-acl", "container": {"@name": "ACL_TABLE", "list": {
+                "@name": "ACL_TABLE_LIST", "key": {"@value": "ACL_TABLE_NAME"},
+                "leaf": [{"@name": "ACL_TABLE_NAME", "type": {"@name": "string"}},
+                         {"@name": "type", "type": {"@name": "string"}}],
+                "leaf-list": {"@name": "ports", "type": {"@name": "union", "type": [port_leafref, lag_leafref]}}}}},
+            "INTERFACE": {"module": "sonic-interface", "container": {"@name": "INTERFACE", "list": [
+                {"@name": "INTERFACE_LIST", "key": {"@value": "name"},
+                 "leaf": {"@name": "name", "type": port_leafref}},
+                {"@name": "INTERFACE_IPPREFIX_LIST", "key": {"@value": "name ip-prefix"},
+                 "leaf": [{"@name": "name", "type": port_leafref},
+                          {"@name": "ip-prefix", "type": {"@name": "string"}}]}]}},
+            "PORT": {"module": "sonic-port", "container": {"@name": "PORT", "list": {
+                "@name": "PORT_LIST", "key": {"@value": "name"},
+                "leaf": [{"@name": "name", "type": {"@name": "string"}},
+                         {"@name": "lanes", "type": {"@name": "string"}}]}}},
+            "PORTCHANNEL": {"module": "sonic-portchannel", "container": {"@name": "PORTCHANNEL", "list": {
+                "@name": "PORTCHANNEL_LIST", "key": {"@value": "name"},
+                "leaf": {"@name": "name", "type": {"@name": "string"}}}}},
+            "VLAN": {"module": "sonic-vlan", "container": {"@name": "VLAN", "list": {
+                "@name": "VLAN_LIST", "key": {"@value": "name"},
+                "leaf": {"@name": "name", "type": {"@name": "string"}}}}},
+            "VLAN_MEMBER": {"module": "sonic-vlan", "container": {"@name": "VLAN_MEMBER", "list": {
+                "@name": "VLAN_MEMBER_LIST", "key": {"@value": "name port"},
+                "leaf": [{"@name": "name", "type": vlan_leafref},
+                         {"@name": "port", "type": port_leafref},
+                         {"@name": "tagging_mode", "type": {"@name": "string"}}]}}},
+        }
+        self.table_refs = {"ACL_TABLE": {"PORT", "PORTCHANNEL"}, "INTERFACE": {"PORT"}, "PORT": set(),
+                           "PORTCHANNEL": set(), "VLAN": set(), "VLAN_MEMBER": {"PORT", "VLAN"}}
+        self.path_addressing = gu_common.PathAddressing()
+
+    def create_index(self):
+        return gu_common.LeafrefIndex(self.path_addressing, self.conf_db_yang_map, self.table_refs)
+
+    def test_find_ref_paths__same_refs_as_sonic_yang(self):
+        def check(path, expected, config=Files.CROPPED_CONFIG_DB_AS_JSON):
+            actual = index.find_ref_paths(self.path_addressing.get_path_tokens(path), config)
+            self.assertEqual(expected, actual)
+
+        index = self.create_index()
+
+        check("/PORT/Ethernet0", ["/ACL_TABLE/NO-NSW-PACL-V4/ports/0", "/VLAN_MEMBER/Vlan1000|Ethernet0"])
+        check("/VLAN/Vlan1000", ["/VLAN_MEMBER/Vlan1000|Ethernet0",
+                                 "/VLAN_MEMBER/Vlan1000|Ethernet4",
+                                 "/VLAN_MEMBER/Vlan1000|Ethernet8"])
+        check("/PORT/Ethernet8", ["/INTERFACE/Ethernet8", "/INTERFACE/Ethernet8|10.0.0.1~130"],
+              Files.CONFIG_DB_WITH_INTERFACE)
+        check("/PORTCHANNEL/PortChannel0001", ["/ACL_TABLE/NO-NSW-PACL-V4/ports/1"],
+              Files.CONFIG_DB_WITH_PORTCHANNEL_AND_ACL)
+        check("/PORT", ["/ACL_TABLE/NO-NSW-PACL-V4/ports/0",
+                        "/VLAN_MEMBER/Vlan1000|Ethernet0",
+                        "/ACL_TABLE/DATAACL/ports/0",
+                        "/ACL_TABLE/EVERFLOWV6/ports/0",
+                        "/VLAN_MEMBER/Vlan1000|Ethernet4",
+                        "/ACL_TABLE/EVERFLOW/ports/0",
+                        "/ACL_TABLE/EVERFLOWV6/ports/1",
+                        "/VLAN_MEMBER/Vlan1000|Ethernet8"])
+        check("", ["/VLAN_MEMBER/Vlan1000|Ethernet0",
+                   "/VLAN_MEMBER/Vlan1000|Ethernet4",
+                   "/VLAN_MEMBER/Vlan1000|Ethernet8",
+                   "/ACL_TABLE/NO-NSW-PACL-V4/ports/0",
+                   "/ACL_TABLE/DATAACL/ports/0",
+                   "/ACL_TABLE/EVERFLOWV6/ports/0",
+                   "/ACL_TABLE/EVERFLOW/ports/0",
+                   "/ACL_TABLE/EVERFLOWV6/ports/1"])
+        check("/PORT/Ethernet0/lanes", [])
+        check("/PORT/Ethernet100", [])
+        check("/VLAN_MEMBER", [])
+
+    def test_find_ref_paths__only_changed_tables_indexed_again(self):
+        # Arrange
+        index = self.create_index()
+        index._index_table = MagicMock(side_effect=index._index_table)
+        config = Files.CROPPED_CONFIG_DB_AS_JSON
+        tokens = self.path_addressing.get_path_tokens("/PORT/Ethernet0")
+        index.find_ref_paths(tokens, config)
+        self.assertCountEqual(["ACL_TABLE", "VLAN_MEMBER"],
+                              [call[0][0] for call in index._index_table.call_args_list])
+        index._index_table.reset_mock()
+
+        # Act
+        new_config = dict(config)
+        new_config["VLAN_MEMBER"] = dict(config["VLAN_MEMBER"])
+        del new_config["VLAN_MEMBER"]["Vlan1000|Ethernet0"]
+        actual = index.find_ref_paths(tokens, new_config)
+
+        # Assert
+        self.assertEqual(["/ACL_TABLE/NO-NSW-PACL-V4/ports/0"], actual)
+        self.assertEqual(["VLAN_MEMBER"], [call[0][0] for call in index._index_table.call_args_list])
+
+    def test_find_ref_paths__unsupported_referrer__not_covered(self):
+        # Arrange
+        self.conf_db_yang_map["VLAN_MEMBER"]["container"]["list"]["uses"] = {"@name": "vlan:member-grouping"}
+        index = self.create_index()
+
+        # Act and assert
+        self.assertIn("VLAN_MEMBER", index.unsupported_tables)
+        self.assertIsNone(index.find_ref_paths(["PORT", "Ethernet0"], Files.CROPPED_CONFIG_DB_AS_JSON))
+        self.assertIsNone(index.find_ref_paths([], Files.CROPPED_CONFIG_DB_AS_JSON))
+        self.assertEqual(["/ACL_TABLE/NO-NSW-PACL-V4/ports/1"],
+                         index.find_ref_paths(["PORTCHANNEL"], Files.CONFIG_DB_WITH_PORTCHANNEL_AND_ACL))
+
+    def test_find_ref_paths__relative_leafref__not_covered(self):
+        # Arrange
+        self.conf_db_yang_map["INTERFACE"]["container"]["list"][0]["leaf"]["type"] = \
+            {"@name": "leafref", "path": {"@value": "../../PORT/PORT_LIST/name"}}
+        index = self.create_index()
+
+        # Act and assert
+        self.assertIsNone(index.find_ref_paths(["PORT"], Files.CONFIG_DB_WITH_INTERFACE))
+
+    def test_find_ref_paths__not_covered__falls_back_to_sonic_yang(self):
+        # Arrange
+        path_addressing = gu_common.PathAddressing(Mock())
+        path_addressing._leafref_index = Mock()
+        path_addressing._leafref_index.find_ref_paths.return_value = None
+        path_addressing._find_leafref_paths = MagicMock(return_value=["/VLAN_MEMBER/Vlan1000|Ethernet0"])
+
+        # Act
+        actual = path_addressing.find_ref_paths("/PORT/Ethernet0", Files.CROPPED_CONFIG_DB_AS_JSON)
+
+        # Assert
+        self.assertEqual(["/VLAN_MEMBER/Vlan1000|Ethernet0"], actual)
+        path_addressing._leafref_index.find_ref_paths.assert_called_once_with(["PORT", "Ethernet0"],
+                                                                              Files.CROPPED_CONFIG_DB_AS_JSON)
+
 class TestPathAddressing(unittest.TestCase):
     def setUp(self):
         self.path_addressing = gu_common.PathAddressing(gu_common.ConfigWrapper())
         self.sy_only_models = sonic_yang.SonicYang(gu_common.YANG_DIR)
         self.sy_only_models.loadYangModel()
 
+    def test_get_table_refs__real_models__refs_found(self):
+        # Act
+        actual = self.path_addressing.get_table_refs()
+
+        # Assert
+        self.assertTrue({"VLAN", "PORT"} <= actual["VLAN_MEMBER"])
+        self.assertIn("PORT", actual["ACL_TABLE"])
+        self.assertNotIn("VLAN_MEMBER", actual["VLAN_MEMBER"])
+
+    def test_get_tables_to_validate__real_models__referrers_and_their_refs_included(self):
+        # Act
+        actual = self.path_addressing.get_tables_to_validate(["PORT"])
+
+        # Assert
+        self.assertTrue({"PORT", "VLAN_MEMBER", "VLAN", "ACL_TABLE"} <= actual)
+
+    def test_get_tables_to_validate__only_affected_tables(self):
+        # Arrange
+        port_model = {"module": {"@name": "sonic-port", "container": {"@name": "sonic-port"}}}
+        vlan_model = {"module": {"@name": "sonic-vlan", "import": {"@module": "sonic-port"},
+                                 "leaf": {"type": {"@name": "leafref",
+                                                   "path": {"@value": "/port:sonic-port/port:PORT/port:PORT_LIST/port:name"}}},
+                                 "must": {"@condition": "count(../../VLAN/VLAN_LIST[name=current()]) > 0"}}}
+        acl_model = {"module": {"@name": "sonic-acl", "leaf": {"type": {"@name": "leafref",
+                                "path": {"@value": "/lag:sonic-portchannel/lag:PORTCHANNEL/lag:PORTCHANNEL_LIST/lag:name"}}}}}
+        lag_model = {"module": {"@name": "sonic-portchannel", "container": {"@name": "sonic-portchannel"}}}
+        sy = Mock()
+        sy.confDbYangMap = {"PORT": {"module": "sonic-port", "yangModule": port_model["module"]},
+                            "VLAN": {"module": "sonic-vlan", "yangModule": vlan_model["module"]},
+                            "VLAN_MEMBER": {"module": "sonic-vlan", "yangModule": vlan_model["module"]},
+                            "ACL_TABLE": {"module": "sonic-acl", "yangModule": acl_model["module"]},
+                            "PORTCHANNEL": {"module": "sonic-portchannel", "yangModule": lag_model["module"]}}
+        config_wrapper = Mock()
+        config_wrapper.create_sonic_yang_with_loaded_models.return_value = sy
+        path_addressing = gu_common.PathAddressing(config_wrapper)
+
+        # Act and assert
+        self.assertEqual({"PORT": set(), "VLAN": {"PORT"}, "VLAN_MEMBER": {"PORT", "VLAN"},
+                          "ACL_TABLE": {"PORTCHANNEL"}, "PORTCHANNEL": set()},
+                         path_addressing.get_table_refs())
+        self.assertEqual({"PORT", "VLAN", "VLAN_MEMBER"}, path_addressing.get_tables_to_validate(["PORT"]))
+        self.assertEqual({"VLAN", "VLAN_MEMBER", "PORT"}, path_addressing.get_tables_to_validate(["VLAN"]))
+        self.assertEqual({"ACL_TABLE", "PORTCHANNEL"}, path_addressing.get_tables_to_validate(["PORTCHANNEL"]))
+        self.assertEqual({"ACL_TABLE", "PORTCHANNEL"}, path_addressing.get_tables_to_validate(["ACL_TABLE"]))
+        self.assertEqual({"TABLE_WITHOUT_YANG"}, path_addressing.get_tables_to_validate(["TABLE_WITHOUT_YANG"]))
+        config_wrapper.create_sonic_yang_with_loaded_models.assert_called_once()
+
     def test_get_path_tokens(self):
         def check(path, tokens):
             expected=tokens
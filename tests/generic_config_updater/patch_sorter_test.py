@@ -1,3 +1,4 @@
+import json
 import jsonpatch
 import unittest
 from unittest.mock import MagicMock, Mock
@@ -22,6 +23,81 @@ class TestDiff(unittest.TestCase):
         self.assertEqual(expected.current_config, actual.current_config)
         self.assertEqual(expected.target_config, actual.target_config)
 
+    def test_apply_move__keeps_moves_from_root(self):
+        # Arrange
+        diff = ps.Diff({"VLAN": {"Vlan1000": {"vlanid": "1000"}}}, {})
+        move1 = ps.JsonMove.from_operation({"op": "add", "path": "/VLAN/Vlan2000", "value": {"vlanid": "2000"}})
+        move2 = ps.JsonMove.from_operation({"op": "remove", "path": "/VLAN/Vlan1000"})
+
+        # Act
+        actual = diff.apply_move(move1).apply_move(move2)
+
+        # Assert
+        self.assertIs(diff, diff.root)
+        self.assertEqual((), diff.moves_from_root)
+        self.assertIs(diff, actual.root)
+        self.assertEqual((move1, move2), actual.moves_from_root)
+
+    def test_apply_move__does_not_change_parent_diff_and_shares_unchanged_tables(self):
+        # Arrange
+        current_config = {"PORT": {"Ethernet0": {"lanes": "65"}, "Ethernet4": {"lanes": "66"}},
+                          "VLAN": {"Vlan1000": {"members": ["Ethernet0"]}}}
+        diff = ps.Diff(current_config, {})
+        current_config_json = json.dumps(current_config, sort_keys=True)
+        move = ps.JsonMove.from_operation({"op": "add", "path": "/VLAN/Vlan1000/members/-", "value": "Ethernet4"})
+
+        # Act
+        actual = diff.apply_move(move)
+
+        # Assert
+        self.assertEqual({"PORT": {"Ethernet0": {"lanes": "65"}, "Ethernet4": {"lanes": "66"}},
+                          "VLAN": {"Vlan1000": {"members": ["Ethernet0", "Ethernet4"]}}},
+                         actual.current_config)
+        self.assertEqual(current_config_json, json.dumps(diff.current_config, sort_keys=True))
+        self.assertIs(diff.current_config["PORT"], actual.current_config["PORT"])
+
+    def test_apply_move__same_as_json_patch(self):
+        current_config = {"PORT": {"Ethernet0": {"lanes": "65"}, "Ethernet4": {"lanes": "66"}},
+                          "VLAN": {"Vlan1000": {"members": ["Ethernet0", "Ethernet4"]}},
+                          "SCALAR": "value"}
+        operations = [{"op": "add", "path": "/PORT/Ethernet8", "value": {"lanes": "67"}},
+                      {"op": "add", "path": "/PORT/Ethernet0", "value": {"lanes": "1"}},
+                      {"op": "add", "path": "/VLAN/Vlan1000/members/0", "value": "Ethernet8"},
+                      {"op": "add", "path": "/VLAN/Vlan1000/members/2", "value": "Ethernet8"},
+                      {"op": "add", "path": "/ACL_TABLE", "value": {"EVERFLOW": {}}},
+                      {"op": "add", "path": "", "value": {"PORT": {}}},
+                      {"op": "remove", "path": "/PORT/Ethernet4"},
+                      {"op": "remove", "path": "/VLAN/Vlan1000/members/1"},
+                      {"op": "remove", "path": "/VLAN"},
+                      {"op": "remove", "path": "/SCALAR"},
+                      {"op": "replace", "path": "/PORT/Ethernet0/lanes", "value": "1"},
+                      {"op": "replace", "path": "/VLAN/Vlan1000/members/0", "value": "Ethernet8"},
+                      {"op": "replace", "path": "/SCALAR", "value": {"key": "value"}},
+                      {"op": "replace", "path": "", "value": {}}]
+        diff = ps.Diff(current_config, Files.ANY_CONFIG_DB)
+        hash(diff)
+
+        for operation in operations:
+            with self.subTest(operation=operation):
+                # Arrange
+                move = ps.JsonMove.from_operation(operation)
+                expected = ps.Diff(jsonpatch.JsonPatch([operation]).apply(current_config), Files.ANY_CONFIG_DB)
+
+                # Act
+                actual = diff.apply_move(move)
+
+                # Assert
+                self.assertEqual(expected, actual)
+                self.assertEqual(hash(expected), hash(actual))
+
+    def test_apply_move__invalid_move__raises_json_patch_error(self):
+        # Arrange
+        diff = ps.Diff({"PORT": {}}, {})
+        move = ps.JsonMove.from_operation({"op": "remove", "path": "/PORT/Ethernet0"})
+
+        # Act and assert
+        self.assertRaises(jsonpatch.JsonPatchConflict, diff.apply_move, move)
+
     def test_has_no_diff__diff_exists__returns_false(self):
         # Arrange
         diff = ps.Diff(current_config=Files.CROPPED_CONFIG_DB_AS_JSON,
@@ -423,6 +499,22 @@ class TestJsonMove(unittest.TestCase):
         self.assertListEqual(expected_current_config_tokens, jsonmove.current_config_tokens)
         self.assertEqual(expected_target_config_tokens, jsonmove.target_config_tokens)
 
+class UnpicklableDiff:
+    """A sort state whose valid moves are the moves not applied yet, which must not be sent to the workers"""
+    def __init__(self, valid_moves, root=None, moves_from_root=()):
+        self.valid_moves = valid_moves
+        self.root = root if root is not None else self
+        self.moves_from_root = moves_from_root
+        self.apply_count = 0
+
+    def apply_move(self, move):
+        self.root.apply_count += 1
+        return UnpicklableDiff([valid_move for valid_move in self.valid_moves if valid_move != move],
+                               self.root, self.moves_from_root + (move,))
+
+    def __reduce__(self):
+        raise TypeError("The diff must not be sent to the validation workers")
+
 class TestMoveWrapper(unittest.TestCase):
     def setUp(self):
         self.any_current_config = {}
@@ -657,6 +749,90 @@ class TestMoveWrapper(unittest.TestCase):
         # Act and assert
         self.assertTrue(move_wrapper.validate(self.any_move, self.any_diff))
 
+    def test_generate_valid__invalid_moves_skipped__valid_moves_returned_in_order(self):
+        # Arrange
+        move_generators = [self.multiple_move_generator]
+        move_validator = Mock()
+        move_validator.validate.side_effect = lambda move, diff: move is not self.any_other_move1
+        move_wrapper = ps.MoveWrapper(move_generators, [], [move_validator])
+        expected = [self.any_move, self.any_other_move2]
+
+        # Act
+        actual = list(move_wrapper.generate_valid(self.any_diff))
+
+        # Assert
+        self.assertListEqual(expected, actual)
+
+    def test_generate_valid__validation_workers__same_moves_in_generation_order(self):
+        # Arrange
+        moves = [f"move{i}" for i in range(10)]
+        move_generator = Mock()
+        move_generator.generate.return_value = moves
+        move_validator = Mock()
+        move_validator.validate.side_effect = lambda move, diff: move not in ["move0", "move3", "move4", "move9"]
+        serial_move_wrapper = ps.MoveWrapper([move_generator], [], [move_validator])
+        parallel_move_wrapper = ps.MoveWrapper([move_generator], [], [move_validator], validation_workers=3)
+        expected = ["move1", "move2", "move5", "move6", "move7", "move8"]
+
+        # Act
+        try:
+            actual = list(parallel_move_wrapper.generate_valid(self.any_diff))
+        finally:
+            parallel_move_wrapper.close()
+
+        # Assert
+        self.assertListEqual(expected, actual)
+        self.assertListEqual(expected, list(serial_move_wrapper.generate_valid(self.any_diff)))
+        self.assertIsNone(parallel_move_wrapper.validation_pool)
+
+    def test_generate_valid__validation_workers__one_pool_for_all_states(self):
+        # Arrange
+        moves = [f"move{i}" for i in range(10)]
+        move_generator = Mock()
+        move_generator.generate.return_value = moves
+        move_validator = Mock()
+        move_validator.validate.side_effect = lambda move, diff: move in diff.valid_moves
+        parallel_move_wrapper = ps.MoveWrapper([move_generator], [], [move_validator], validation_workers=3)
+        root = UnpicklableDiff(["move1", "move5", "move8"])
+        child = root.apply_move("move1")
+        grandchild = child.apply_move("move5")
+        other_child = root.apply_move("move8")
+
+        # Act
+        try:
+            pools = []
+            actual = []
+            for diff in [root, child, grandchild, other_child]:
+                actual.append(list(parallel_move_wrapper.generate_valid(diff)))
+                pools.append(parallel_move_wrapper.validation_pool)
+        finally:
+            parallel_move_wrapper.close()
+
+        # Assert
+        self.assertListEqual([["move1", "move5", "move8"], ["move5", "move8"], ["move8"], ["move1", "move5"]],
+                             actual)
+        # The pool is forked once for the whole sort
+        self.assertEqual(1, len(set(map(id, pools))))
+        self.assertIsNone(parallel_move_wrapper.validation_pool)
+
+    def test_validate_move_in_worker__diff_rebuilt_from_last_state(self):
+        # Arrange
+        move_validator = Mock()
+        move_validator.validate.side_effect = lambda move, diff: move in diff.valid_moves
+        root = UnpicklableDiff(["move1", "move5", "move8"])
+        ps._init_move_validation_worker([move_validator], root)
+
+        # Act & Assert
+        self.assertTrue(ps._validate_move_in_worker((("move1",), "move5")))
+        self.assertFalse(ps._validate_move_in_worker((("move1", "move5"), "move5")))
+        # Only the last move is applied on top of the previous state
+        self.assertEqual(2, root.apply_count)
+        self.assertTrue(ps._validate_move_in_worker((("move8",), "move1")))
+        # Another branch is rebuilt from the root
+        self.assertEqual(3, root.apply_count)
+        self.assertTrue(ps._validate_move_in_worker(((), "move8")))
+        self.assertEqual(3, root.apply_count)
+
     def test_simulate__applies_move(self):
         # Arrange
         diff = Mock()
@@ -779,6 +955,81 @@ class TestFullConfigMoveValidator(unittest.TestCase):
         # Act and assert
         self.assertTrue(validator.validate(self.any_move, self.any_diff))
 
+class TestIncrementalConfigMoveValidator(unittest.TestCase):
+    def setUp(self):
+        self.config_wrapper = Mock()
+        self.config_wrapper.validate_config_db_config.return_value = True
+        self.path_addressing = PathAddressing(self.config_wrapper)
+        self.path_addressing.get_table_refs = MagicMock(return_value={"PORT": set(),
+                                                                      "VLAN": {"PORT"},
+                                                                      "VLAN_MEMBER": {"PORT", "VLAN"},
+                                                                      "ACL_TABLE": {"PORT"},
+                                                                      "LOOPBACK_INTERFACE": set()})
+        self.validator = ps.IncrementalConfigMoveValidator(self.path_addressing, self.config_wrapper)
+        self.current_config = {"PORT": {"Ethernet0": {"lanes": "65"}},
+                               "VLAN": {"Vlan1000": {}},
+                               "VLAN_MEMBER": {"Vlan1000|Ethernet0": {}},
+                               "LOOPBACK_INTERFACE": {"Loopback0": {}},
+                               "TABLE_WITHOUT_YANG": {"key": {}}}
+        self.diff = ps.Diff(self.current_config, {})
+
+    def test_validate__table_updated__only_affected_tables_validated(self):
+        # Arrange
+        move = ps.JsonMove(self.diff, OperationType.REMOVE, ["VLAN_MEMBER", "Vlan1000|Ethernet0"])
+        expected = {"PORT": {"Ethernet0": {"lanes": "65"}}, "VLAN": {"Vlan1000": {}}, "VLAN_MEMBER": {}}
+
+        # Act
+        actual = self.validator.validate(move, self.diff)
+
+        # Assert
+        self.assertTrue(actual)
+        self.config_wrapper.validate_config_db_config.assert_called_once_with(expected)
+
+    def test_validate__referenced_table_updated__referring_tables_validated(self):
+        # Arrange
+        self.config_wrapper.validate_config_db_config.return_value = False
+        move = ps.JsonMove(self.diff, OperationType.REMOVE, ["PORT"])
+        expected = {"VLAN": {"Vlan1000": {}}, "VLAN_MEMBER": {"Vlan1000|Ethernet0": {}}}
+
+        # Act
+        actual = self.validator.validate(move, self.diff)
+
+        # Assert
+        self.assertFalse(actual)
+        self.config_wrapper.validate_config_db_config.assert_called_once_with(expected)
+
+    def test_validate__table_without_yang_updated__success(self):
+        # Arrange
+        move = ps.JsonMove(self.diff, OperationType.REMOVE, ["TABLE_WITHOUT_YANG", "key"])
+
+        # Act and assert
+        self.assertTrue(self.validator.validate(move, self.diff))
+        self.config_wrapper.validate_config_db_config.assert_not_called()
+
+    def test_validate__table_updated__config_not_deep_copied(self):
+        # Arrange
+        diff = ps.Diff(self.current_config, {"VLAN": {"Vlan1000": {"vlanid": "1000"}}})
+        move = ps.JsonMove(diff, OperationType.ADD, ["VLAN", "Vlan1000", "vlanid"], ["VLAN", "Vlan1000", "vlanid"])
+
+        # Act
+        self.validator.validate(move, diff)
+
+        # Assert
+        validated_config = self.config_wrapper.validate_config_db_config.call_args[0][0]
+        self.assertDictEqual({"vlanid": "1000"}, validated_config["VLAN"]["Vlan1000"])
+        self.assertDictEqual({}, self.current_config["VLAN"]["Vlan1000"])
+        self.assertIs(self.current_config["PORT"], validated_config["PORT"])
+
+    def test_validate__whole_config_updated__full_config_validated(self):
+        # Arrange
+        move = ps.JsonMove(self.diff, OperationType.REPLACE, [], [])
+
+        # Act
+        self.validator.validate(move, self.diff)
+
+        # Assert
+        self.config_wrapper.validate_config_db_config.assert_called_once_with({})
+
 class TestCreateOnlyMoveValidator(unittest.TestCase):
     def setUp(self):
         self.validator = ps.CreateOnlyMoveValidator(ps.PathAddressing())
@@ -1752,14 +2003,34 @@ class TestSortAlgorithmFactory(unittest.TestCase):
     def test_memoization_sorter(self):
         self.verify(ps.Algorithm.MEMOIZATION, ps.MemoizationSorter)
 
-    def verify(self, algo, algo_class):
+    def test_dfs_sorter_incremental_validation(self):
+        self.verify(ps.Algorithm.DFS, ps.DfsSorter, incremental_validation=True)
+
+    def test_dfs_sorter_validation_workers(self):
+        # Arrange
+        config_wrapper = Mock()
+        path_addressing = Mock()
+        factory = ps.SortAlgorithmFactory(OperationWrapper(), config_wrapper, path_addressing,
+                                          validation_workers=4)
+
+        # Act
+        sorter = factory.create(ps.Algorithm.DFS)
+
+        # Assert
+        self.assertEqual(4, sorter.move_wrapper.validation_workers)
+        config_wrapper.create_sonic_yang_with_loaded_models.assert_called_once()
+        path_addressing.get_table_refs.assert_called_once()
+        path_addressing.get_leafref_index.assert_called_once()
+
+    def verify(self, algo, algo_class, incremental_validation=False):
         # Arrange
         config_wrapper = ConfigWrapper()
-        factory = ps.SortAlgorithmFactory(OperationWrapper(), config_wrapper, PathAddressing(config_wrapper))
+        factory = ps.SortAlgorithmFactory(OperationWrapper(), config_wrapper, PathAddressing(config_wrapper),
+                                          incremental_validation)
         expected_generators = [ps.LowLevelMoveGenerator]
         expected_extenders = [ps.UpperLevelMoveExtender, ps.DeleteInsteadOfReplaceMoveExtender, ps.DeleteRefsMoveExtender]
         expected_validator = [ps.DeleteWholeConfigMoveValidator,
-                              ps.FullConfigMoveValidator,
+                              ps.IncrementalConfigMoveValidator if incremental_validation else ps.FullConfigMoveValidator,
                               ps.NoDependencyMoveValidator,
                               ps.UniqueLanesMoveValidator,
                               ps.CreateOnlyMoveValidator,
@@ -1801,14 +2072,14 @@ class TestPatchSorter(unittest.TestCase):
             with self.subTest(name=test_case_name):
                 self.run_single_success_case(data[test_case_name], skip_exact_change_list_match)
 
-    def run_single_success_case(self, data, skip_exact_change_list_match):
+    def run_single_success_case(self, data, skip_exact_change_list_match, incremental_validation=False):
         current_config = data["current_config"]
         patch = jsonpatch.JsonPatch(data["patch"])
         expected_changes = []
         for item in data["expected_changes"]:
             expected_changes.append(JsonChange(jsonpatch.JsonPatch(item)))
 
-        sorter = self.create_patch_sorter(current_config)
+        sorter = self.create_patch_sorter(current_config, incremental_validation=incremental_validation)
 
         actual_changes = sorter.sort(patch)
 
@@ -1876,7 +2147,26 @@ class TestPatchSorter(unittest.TestCase):
         # Assert
         self.assertEqual(expected, actual)
 
-    def create_patch_sorter(self, config=None, sort_algorithm=None):
+    def test_patch_sorter_incremental_validation_success(self):
+        data = Files.PATCH_SORTER_TEST_SUCCESS
+        for test_case_name in data:
+            with self.subTest(name=test_case_name):
+                self.run_single_success_case(data[test_case_name], skip_exact_change_list_match=True,
+                                             incremental_validation=True)
+
+    def test_sort__incremental_validation__invalid_target_config__failure(self):
+        # Arrange
+        current_config = Files.CROPPED_CONFIG_DB_AS_JSON
+        any_patch = Files.SINGLE_OPERATION_CONFIG_DB_PATCH
+        sort_algorithm = Mock()
+        sort_algorithm.sort = lambda diff: [ps.JsonMove(diff, OperationType.REPLACE, [], [])]
+        patch_sorter = self.create_patch_sorter(current_config, sort_algorithm, incremental_validation=True)
+        self.config_wrapper.validate_config_db_config = MagicMock(return_value=False)
+
+        # Act and assert
+        self.assertRaises(GenericConfigUpdaterError, patch_sorter.sort, any_patch)
+
+    def create_patch_sorter(self, config=None, sort_algorithm=None, incremental_validation=False):
         if config is None:
             config=Files.CROPPED_CONFIG_DB_AS_JSON
         config_wrapper = self.config_wrapper
@@ -1884,7 +2174,8 @@ class TestPatchSorter(unittest.TestCase):
         patch_wrapper = PatchWrapper(config_wrapper)
         operation_wrapper = OperationWrapper()
         path_addressing= ps.PathAddressing(config_wrapper)
-        sort_algorithm_factory = ps.SortAlgorithmFactory(operation_wrapper, config_wrapper, path_addressing)
+        sort_algorithm_factory = ps.SortAlgorithmFactory(operation_wrapper, config_wrapper, path_addressing,
+                                                         incremental_validation)
         if sort_algorithm:
             sort_algorithm_factory.create = MagicMock(return_value=sort_algorithm)
 
@@ -0,0 +1,179 @@
+import os
+import shutil
+import sys
+import tempfile
+import types
+from unittest import mock
+
+import click
+from click.testing import CliRunner
+
+import utilities_common.cli as clicommon
+from utilities_common import util_base
+
+PLUGIN_ADDING_COMMAND = """
+import click
+
+@click.command()
+def hello():
+    click.echo("hello from plugin")
+
+def register(cli):
+    cli.add_command(hello)
+"""
+
+PLUGIN_EXTENDING_GROUP = """
+import click
+
+@click.command()
+def extra():
+    click.echo("extra")
+
+def register(cli):
+    cli.commands['base'].add_command(extra)
+"""
+
+
+def make_lazy_module(name):
+    module = types.ModuleType(name)
+
+    @click.command(name='lazy-cmd')
+    def lazy_cmd():
+        click.echo("lazy command")
+
+    module.lazy_cmd = lazy_cmd
+    return module
+
+
+class TestLazyAliasedGroup(object):
+    def make_cli(self):
+        @click.group(cls=clicommon.LazyAliasedGroup)
+        def cli():
+            pass
+
+        @cli.command()
+        def version():
+            click.echo("version")
+
+        cli.add_lazy_command('lazy-cmd', 'lazy_test_module')
+        return cli
+
+    def test_module_imported_on_resolution_only(self):
+        cli = self.make_cli()
+        with mock.patch.dict(sys.modules, {'lazy_test_module': make_lazy_module('lazy_test_module')}):
+            with mock.patch('importlib.import_module', wraps=__import__) as mock_import:
+                result = CliRunner().invoke(cli, ['version'])
+                assert result.exit_code == 0
+                assert not mock_import.called
+
+                assert 'lazy-cmd' in cli.commands
+                assert cli.list_commands(None) == ['lazy-cmd', 'version']
+
+                result = CliRunner().invoke(cli, ['lazy-cmd'])
+                assert result.exit_code == 0
+                assert result.output == "lazy command\n"
+                mock_import.assert_called_once_with('lazy_test_module')
+
+    def test_abbreviation_and_commands_lookup(self):
+        cli = self.make_cli()
+        with mock.patch.dict(sys.modules, {'lazy_test_module': make_lazy_module('lazy_test_module')}):
+            result = CliRunner().invoke(cli, ['laz'])
+            assert result.exit_code == 0
+            assert result.output == "lazy command\n"
+
+            cli = self.make_cli()
+            assert cli.commands['lazy-cmd'].name == 'lazy-cmd'
+
+    def test_loader_called_once_for_all_its_commands(self):
+        cli = self.make_cli()
+        loader = mock.Mock(side_effect=lambda: [cli.add_command(click.Command(name), name) for name in ['a', 'b']])
+        cli.add_lazy_commands(['a', 'b'], loader)
+
+        assert cli.commands.get('a').name == 'a'
+        assert cli.commands.get('b').name == 'b'
+        assert loader.call_count == 1
+
+    def test_loader_not_adding_the_command(self):
+        cli = self.make_cli()
+        cli.add_lazy_commands(['missing'], lambda: None)
+
+        assert cli.commands.get('missing') is None
+        assert 'missing' not in cli.commands
+
+
+class TestPluginManifest(object):
+    def setup_method(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.package_dir = os.path.join(self.tmpdir, 'lazy_test_plugins')
+        os.makedirs(self.package_dir)
+        open(os.path.join(self.package_dir, '__init__.py'), 'w').close()
+        with open(os.path.join(self.package_dir, 'adding.py'), 'w') as f:
+            f.write(PLUGIN_ADDING_COMMAND)
+        with open(os.path.join(self.package_dir, 'extending.py'), 'w') as f:
+            f.write(PLUGIN_EXTENDING_GROUP)
+        sys.path.insert(0, self.tmpdir)
+
+    def teardown_method(self):
+        sys.path.remove(self.tmpdir)
+        for name in [name for name in sys.modules if name.startswith('lazy_test_plugins')]:
+            del sys.modules[name]
+        shutil.rmtree(self.tmpdir)
+
+    def make_cli(self):
+        @click.group(cls=clicommon.LazyAliasedGroup)
+        def cli():
+            pass
+
+        @cli.group()
+        def base():
+            pass
+
+        return cli
+
+    def unload_plugins(self):
+        for name in [name for name in sys.modules if name.startswith('lazy_test_plugins.')]:
+            del sys.modules[name]
+
+    def test_manifest_built_then_used(self):
+        import lazy_test_plugins
+        helper = util_base.UtilHelper()
+        with mock.patch.object(util_base, 'PLUGIN_MANIFEST_DIR', os.path.join(self.tmpdir, 'cache')):
+            # First run registers all the plugins and saves what they add
+            cli = self.make_cli()
+            helper.load_and_register_plugins(lazy_test_plugins, cli)
+            assert 'hello' in cli.commands.loaded
+            assert 'extra' in cli.commands['base'].commands
+            assert helper.read_plugin_manifest(lazy_test_plugins, helper.get_plugins_signature(lazy_test_plugins)) == {
+                'lazy_test_plugins.adding': ['hello'],
+                'lazy_test_plugins.extending': None
+            }
+
+            # Next runs only import the plugins extending existing commands
+            self.unload_plugins()
+            cli = self.make_cli()
+            helper.load_and_register_plugins(lazy_test_plugins, cli)
+            assert 'lazy_test_plugins.adding' not in sys.modules
+            assert 'lazy_test_plugins.extending' in sys.modules
+            assert 'extra' in cli.commands['base'].commands
+            assert 'hello' in cli.commands
+            assert 'hello' not in cli.commands.loaded
+
+            result = CliRunner().invoke(cli, ['hello'])
+            assert result.exit_code == 0
+            assert result.output == "hello from plugin\n"
+
+    def test_manifest_rebuilt_when_plugins_change(self):
+        import lazy_test_plugins
+        helper = util_base.UtilHelper()
+        with mock.patch.object(util_base, 'PLUGIN_MANIFEST_DIR', os.path.join(self.tmpdir, 'cache')):
+            helper.load_and_register_plugins(lazy_test_plugins, self.make_cli())
+            os.remove(os.path.join(self.package_dir, 'extending.py'))
+
+            self.unload_plugins()
+            cli = self.make_cli()
+            helper.load_and_register_plugins(lazy_test_plugins, cli)
+            assert 'hello' in cli.commands.loaded
+            assert 'extra' not in cli.commands['base'].commands
+            assert helper.read_plugin_manifest(lazy_test_plugins, helper.get_plugins_signature(lazy_test_plugins)) == {
+                'lazy_test_plugins.adding': ['hello']
+            }
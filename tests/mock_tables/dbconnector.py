@@ -145,6 +145,24 @@ class SwssSyncClient(mockredis.MockRedis):
         # Find every key that matches the pattern
         return [key for key in self.redis if regex.match(key)]
 
+    # Patch mockredis/mockredis/client.py
+    # The official implementation matches a bytes pattern, which fails on
+    # the keys once the responses are decoded
+    def scan(self, cursor='0', match=None, count=10):
+        """Emulate scan."""
+        import fnmatch
+        import re
+
+        keys = sorted(self.redis)
+        cursor = int(cursor)
+        count = int(count or 10)
+        next_cursor = 0 if cursor + count >= len(keys) else cursor + count
+        keys = keys[cursor:cursor + count]
+        if match is not None:
+            regex = re.compile(fnmatch.translate(match))
+            keys = [key for key in keys if regex.match(key)]
+        return [next_cursor, keys]
+
 
 swsssdk.interface.DBInterface._subscribe_keyspace_notification = _subscribe_keyspace_notification
 mockredis.MockRedis.config_set = config_set
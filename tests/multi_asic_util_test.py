@@ -0,0 +1,51 @@
+import threading
+import time
+from unittest import mock
+
+from utilities_common import multi_asic as multi_asic_util
+
+
+class FakeDb(object):
+    def __init__(self, ns_list):
+        self.cfgdb_clients = {ns: 'cfgdb-' + ns for ns in ns_list}
+        self.db_clients = {ns: 'db-' + ns for ns in ns_list}
+
+
+class Collector(object):
+    def __init__(self, ns_list, concurrent):
+        self.multi_asic = multi_asic_util.MultiAsic(db=FakeDb(ns_list), concurrent=concurrent)
+        self.db = None
+        self.config_db = None
+        self.thread_ids = set()
+
+    @multi_asic_util.run_on_multi_asic
+    def collect(self, suffix):
+        ns = self.multi_asic.current_namespace
+        # Make the first namespace the slowest one to check the result order
+        time.sleep(0.1 if ns == 'asic0' else 0.01)
+        self.thread_ids.add(threading.get_ident())
+        return (ns, self.db, self.config_db, suffix)
+
+
+class TestRunOnMultiAsic(object):
+    ns_list = ['asic0', 'asic1', 'asic2']
+
+    def run_collect(self, concurrent):
+        with mock.patch.object(multi_asic_util.MultiAsic, 'get_ns_list_based_on_options',
+                               return_value=self.ns_list):
+            collector = Collector(self.ns_list, concurrent)
+            return collector, collector.collect('x')
+
+    def test_serial(self):
+        collector, results = self.run_collect(False)
+        assert results == [(ns, 'db-' + ns, 'cfgdb-' + ns, 'x') for ns in self.ns_list]
+        assert collector.multi_asic.current_namespace == 'asic2'
+        assert len(collector.thread_ids) == 1
+
+    def test_concurrent(self):
+        collector, results = self.run_collect(True)
+        assert results == [(ns, 'db-' + ns, 'cfgdb-' + ns, 'x') for ns in self.ns_list]
+        # Every namespace ran on its own copy of the object
+        assert collector.db is None
+        assert collector.config_db is None
+        assert collector.multi_asic.current_namespace is None
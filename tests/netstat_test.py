@@ -0,0 +1,38 @@
+from utilities_common.netstat import (STATUS_NA, counters_diff, counters_rate, counters_util, format_counter,
+                                      format_percent, format_util, ns_brate, ns_diff, ns_prate, ns_util)
+
+
+class TestCountersBatch(object):
+    def test_counters_diff(self):
+        new_rows = [('10', STATUS_NA, '5', '1000'), ('7', '8', '9', '10')]
+        old_rows = [('4', '2', STATUS_NA, '2000'), None]
+
+        diffs = counters_diff(new_rows, old_rows)
+
+        assert diffs == [[6, STATUS_NA, 5, 0], [7, 8, 9, 10]]
+        # Same result as the per field ns_diff once formatted
+        for new, old, diff in zip(new_rows, old_rows, diffs):
+            old = old or ('0',) * len(new)
+            assert [format_counter(d) for d in diff] == [ns_diff(n, o) for n, o in zip(new, old)]
+
+    def test_counters_diff_int_snapshot(self):
+        assert counters_diff([('1234567', '3')], [(1, STATUS_NA)]) == [[1234566, 3]]
+        assert format_counter(1234566) == '1,234,566'
+
+
+    def test_counters_rate(self):
+        diffs = counters_diff([('300000', STATUS_NA), ('30', '6')], [('0', '1'), None])
+
+        assert counters_rate(diffs, 3) == [[100000.0, STATUS_NA], [10.0, 2.0]]
+        assert ns_brate('300000', '0', 3) == '100.00 KB/s'
+        assert ns_prate('30', '0', 3) == '10.00/s'
+        assert ns_brate('30', STATUS_NA, 3) == STATUS_NA
+
+    def test_counters_util(self):
+        utils = counters_util([(250000000.0, STATUS_NA), (1.0, 2.0)], [10000, STATUS_NA])
+
+        assert utils == [[20.0, STATUS_NA], [STATUS_NA, STATUS_NA]]
+        assert [format_percent(util) for util in utils[0]] == ['20.00%', STATUS_NA]
+        assert format_util(250000000.0, '10000') == '20.00%'
+        # ns_util takes the port rate in Gb/s
+        assert ns_util('2500000000', '0', 2, port_rate=10) == '100.00%'
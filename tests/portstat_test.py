@@ -1,10 +1,14 @@
+import json
 import os
 import shutil
+from unittest import mock
 
 from click.testing import CliRunner
 
 import clear.main as clear
 import show.main as show
+from utilities_common.db import Db
+from utilities_common.general import load_module_from_source
 from .utils import get_result_and_return_code
 
 root_path = os.path.dirname(os.path.abspath(__file__))
@@ -317,6 +321,55 @@ class TestPortStat(object):
         assert return_code == 0
         verify_after_clear(result, intf_counter_after_clear)
 
+    def test_watch_intf_counters_json(self, capsys):
+        portstat = load_module_from_source('portstat', os.path.join(scripts_path, 'portstat'))
+        ticks = []
+
+        def sleep(interval):
+            ticks.append(interval)
+            if len(ticks) > 2:
+                raise KeyboardInterrupt
+
+        stat = portstat.Portstat(None, 'all')
+        with mock.patch.object(portstat.time, 'sleep', side_effect=sleep):
+            stat.watch(1, [], True, False, False, False)
+
+        assert ticks == [1, 1, 1]
+        # The port map is loaded once and reused by every interval
+        assert list(stat.port_maps.keys()) == ['']
+        assert [port for port, _ in stat.port_maps['']] == ['Ethernet0', 'Ethernet4', 'Ethernet8']
+
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 2
+        for line in lines:
+            output = json.loads(line)
+            assert sorted(output['interfaces'].keys()) == ['Ethernet0', 'Ethernet4', 'Ethernet8']
+            assert output['interfaces']['Ethernet0']['RX_OK'] == '0'
+            assert output['interfaces']['Ethernet0']['RX_BPS'] == '2000.00 MB/s'
+            # Speed and state of the ports come from the PORT_TABLE hashes read every interval
+            assert output['interfaces']['Ethernet0']['STATE'] == 'D'
+            assert output['interfaces']['Ethernet0']['RX_UTIL'] == '64.00%'
+            assert output['interfaces']['Ethernet4']['STATE'] == 'N/A'
+
+    def test_watch_port_map_refreshed(self):
+        portstat = load_module_from_source('portstat', os.path.join(scripts_path, 'portstat'))
+        stat = portstat.Portstat(None, 'all', Db())
+        stat.port_maps = {}
+        stat.port_name_maps = {}
+
+        stat.get_cnstat_dict()
+        ports = stat.port_maps['']
+        stat.get_cnstat_dict()
+        assert stat.port_maps[''] is ports
+
+        # A port is added, the port map is built again
+        db = stat.multi_asic.db.db
+        db.set(db.COUNTERS_DB, 'COUNTERS_PORT_NAME_MAP', 'Ethernet12', 'oid:0x1000000000fff')
+        cnstat_dict, _ = stat.get_cnstat_dict()
+        assert [port for port, _ in stat.port_maps['']] == ['Ethernet0', 'Ethernet4', 'Ethernet8', 'Ethernet12']
+        assert 'Ethernet12' in cnstat_dict
+        assert stat.portstatus_dict['Ethernet12'] == portstat.PortStatus('N/A', 'N/A')
+
     @classmethod
     def teardown_class(cls):
         print("TEARDOWN")
@@ -4,7 +4,7 @@ import os
 import sys
 
 from click.testing import CliRunner
-from unittest import TestCase
+from unittest import TestCase, mock
 from swsscommon.swsscommon import ConfigDBConnector
 
 from .mock_tables import dbconnector
@@ -913,6 +913,22 @@ class TestQueue(object):
         assert result.exit_code == 0
         assert result.output == show_queue_counters
 
+    def test_queue_counters_in_process(self):
+        runner = CliRunner()
+        db = Db()
+        # queuestat is run in the show process, with the connections of its Db
+        with mock.patch.dict(os.environ):
+            del os.environ['UTILITIES_UNIT_TESTING']
+            result = runner.invoke(
+                show.cli.commands["queue"].commands["counters"],
+                ["--verbose"],
+                obj=db
+            )
+        print(result.output)
+        assert result.exit_code == 0
+        assert result.output == "Command: queuestat\n" + show_queue_counters
+        assert db.opened_connections == [('', 'COUNTERS_DB')]
+
     def test_queue_counters_port(self):
         runner = CliRunner()
         result = runner.invoke(
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the ASIC-DB route key parsing of route_check.
+
+Builds synthetic SAI route entry keys and feeds them through the original
+list based parse and through the route_check generator pipeline, reporting
+throughput and peak memory of each.
+
+Not collected by pytest; run it directly:
+
+    python3 tests/route_check_bench.py --count 1000000
+"""
+import argparse
+import ipaddress
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+import route_check
+
+RT_ENTRY_KEY_PREFIX = 'SAI_OBJECT_TYPE_ROUTE_ENTRY:{\"dest":\"'
+RT_ENTRY_KEY_SUFFIX = '\",\"switch_id\":\"oid:0x21000000000000\",\"vr\":\"oid:0x3000000000023\"}'
+
+
+def build_keys(count):
+    """
+    Build 'count' route entry keys: mostly IPv4 /32 and IPv6 /128 routes,
+    with a few link local routes and non route objects mixed in.
+    """
+    keys = []
+    v4 = int(ipaddress.IPv4Address("10.0.0.0"))
+    v6 = int(ipaddress.IPv6Address("2603:10b0::"))
+    for i in range(count):
+        kind = i % 100
+        if kind == 0:
+            keys.append("SAI_OBJECT_TYPE_NEXT_HOP:oid:0x40000000{:05x}".format(i % 0x100000))
+        elif kind == 1:
+            keys.append(RT_ENTRY_KEY_PREFIX + "fe80::/64" + RT_ENTRY_KEY_SUFFIX)
+        elif kind % 2:
+            keys.append(RT_ENTRY_KEY_PREFIX + str(ipaddress.IPv4Address(v4 + i)) + "/32" + RT_ENTRY_KEY_SUFFIX)
+        else:
+            keys.append(RT_ENTRY_KEY_PREFIX + str(ipaddress.IPv6Address(v6 + i)).upper() + "/128" + RT_ENTRY_KEY_SUFFIX)
+    return keys
+
+
+class Subscriber:
+    """ Minimal stand in of SubscriberStateTable draining the given keys """
+    def __init__(self, keys):
+        self.it = iter(keys)
+
+    def pop(self):
+        k = next(self.it, None)
+        if k is None:
+            return "", "", None
+        return k, "SET", ()
+
+
+def legacy_parse(subs):
+    rt = []
+    while True:
+        k, _, _ = subs.pop()
+        if not k:
+            break
+        if k.startswith(route_check.ASIC_KEY_PREFIX):
+            e = k.lower().split("\"", -1)[3]
+            if not ipaddress.ip_address(e.split("/")[0]).is_link_local:
+                rt.append(e)
+    return sorted(rt)
+
+
+def pipeline_parse(subs):
+    return {e for e, _ in route_check.iter_rt_entries(route_check.pop_all(subs))}
+
+
+def run(name, func, keys):
+    subs = Subscriber(keys)
+    tracemalloc.start()
+    start = time.perf_counter()
+    routes = func(subs)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print("{:<10} {:>10} routes {:>12.0f} keys/s {:>10.1f} MiB peak".format(
+        name, len(routes), len(keys) / elapsed, peak / (1024 * 1024)))
+    return routes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark route_check ASIC-DB key parsing")
+    parser.add_argument('-c', '--count', type=int, default=1000000, help='Number of keys to generate')
+    args = parser.parse_args()
+
+    keys = build_keys(args.count)
+    legacy = run("legacy", legacy_parse, keys)
+    pipeline = run("pipeline", pipeline_parse, keys)
+    if set(legacy) != pipeline:
+        print("Parsed routes differ")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -295,6 +295,50 @@ test_data = {
     }
 }
 
+appl_db_update_data = {
+    DESCR: "APPL-DB routes added & deleted while the routes are kept in memory",
+    PRE: {
+        APPL_DB: {
+            ROUTE_TABLE: {
+                "0.0.0.0/0" : { "ifname": "portchannel0" },
+                "10.10.196.12/31" : { "ifname": "portchannel0" },
+                "10.10.196.20/31" : { "ifname": "portchannel0" }
+            },
+            INTF_TABLE: {
+                "PortChannel1024": {}
+            }
+        },
+        ASIC_DB: {
+            RT_ENTRY_TABLE: {
+                RT_ENTRY_KEY_PREFIX + "0.0.0.0/0" + RT_ENTRY_KEY_SUFFIX: {},
+                RT_ENTRY_KEY_PREFIX + "10.10.196.12/31" + RT_ENTRY_KEY_SUFFIX: {},
+                RT_ENTRY_KEY_PREFIX + "10.10.196.20/31" + RT_ENTRY_KEY_SUFFIX: {}
+            }
+        }
+    },
+    UPD: {
+        APPL_DB: {
+            ROUTE_TABLE: {
+                OP_SET: {
+                    "10.10.196.40/31" : { "ifname": "portchannel0" }
+                },
+                OP_DEL: {
+                    "10.10.196.20/31" : {}
+                }
+            }
+        }
+    },
+    RESULT: {
+        "missed_ROUTE_TABLE_routes": [
+            "10.10.196.40/31"
+        ],
+        "Unaccounted_ROUTE_ENTRY_TABLE_entries": [
+            "10.10.196.20/31"
+        ]
+    }
+}
+
+
 def do_start_test(tname, tno, ctdata):
     global current_test_name, current_test_no, current_test_data
     global tables_returned, selector_returned, subscribers_returned
@@ -395,12 +439,12 @@ class mock_selector:
     def __init__(self):
         self.select_state = 0
         self.select_cnt = 0
-        self.subs = None
+        self.subs = []
         # print("Mock Selector constructed")
 
 
     def addSelectable(self, subs):
-        self.subs = subs
+        self.subs.append(subs)
         return 0
 
 
@@ -408,7 +452,8 @@ class mock_selector:
         # Toggle between good & timeout
         #
         state = self.select_state
-        self.subs.update()
+        for subs in self.subs:
+            subs.update()
 
         if mock_selector.EMULATE_HANG:
             time.sleep(60)
@@ -515,6 +560,7 @@ class TestRouteCheck(object):
 
     def init(self):
         route_check.UNIT_TESTING = 1
+        mock_selector.EMULATE_HANG = False
 
 
     @patch("route_check.swsscommon.DBConnector")
@@ -541,6 +587,17 @@ class TestRouteCheck(object):
                 assert res == expect_res
 
 
+        # Same results with the routes kept in memory
+        for (i, ct_data) in test_data.items():
+            do_start_test("route_test_incremental", i, ct_data)
+
+            with patch('sys.argv', ct_data[ARGS].split() + ["--incremental"]):
+                ret, res = route_check.main()
+                expect_ret = ct_data[RET] if RET in ct_data else 0
+                expect_res = ct_data[RESULT] if RESULT in ct_data else None
+                assert ret == expect_ret
+                assert res == expect_res
+
         # Test timeout
         route_check.TIMEOUT_SECONDS = 5
         mock_selector.EMULATE_HANG = True
@@ -572,3 +629,82 @@ class TestRouteCheck(object):
 
 
 
+
+    @patch("route_check.swsscommon.DBConnector")
+    @patch("route_check.swsscommon.Table")
+    @patch("route_check.swsscommon.Select")
+    @patch("route_check.swsscommon.SubscriberStateTable")
+    def test_route_state_appl_db_updates(self, mock_subs, mock_sel, mock_table, mock_conn):
+        self.init()
+
+        set_mock(mock_table, mock_conn, mock_sel, mock_subs)
+        do_start_test("route_state_appl_db_updates", "0", appl_db_update_data)
+
+        route_state = route_check.RouteState()
+        assert route_state.check() == (0, None)
+
+        # The APPL-DB updates are received while waiting for the next check
+        route_state.wait_updates(1)
+        assert route_state.rt_appl == {"0.0.0.0/0", "10.10.196.12/31", "10.10.196.40/31"}
+
+        ret, res = route_state.check()
+        assert ret == -1
+        assert res == appl_db_update_data[RESULT]
+
+    def test_diff_sets(self):
+        assert route_check.diff_sets(["b", "a", "c"], {"c", "d"}) == (["a", "b"], ["d"])
+        assert route_check.diff_sets([], []) == ([], [])
+
+    def test_route_state_update(self):
+        state = route_check.RouteState.__new__(route_check.RouteState)
+        state.rt_appl, state.rt_asic = set(), set()
+        state.appl_only, state.asic_only = set(), set()
+
+        def appl(route, present):
+            state._update(route, present, state.rt_appl, state.rt_asic, state.appl_only, state.asic_only)
+
+        def asic(route, present):
+            state._update(route, present, state.rt_asic, state.rt_appl, state.asic_only, state.appl_only)
+
+        appl("10.0.0.0/24", True)
+        appl("10.0.1.0/24", True)
+        asic("10.0.0.0/24", True)
+        asic("10.0.2.0/24", True)
+        assert state.appl_only == {"10.0.1.0/24"}
+        assert state.asic_only == {"10.0.2.0/24"}
+
+        # Duplicated updates are ignored
+        asic("10.0.2.0/24", True)
+        appl("10.0.3.0/24", False)
+        assert state.asic_only == {"10.0.2.0/24"}
+
+        appl("10.0.0.0/24", False)
+        asic("10.0.1.0/24", True)
+        asic("10.0.2.0/24", False)
+        assert state.appl_only == set()
+        assert state.asic_only == {"10.0.0.0/24"}
+
+    def test_parse_rt_entry_key(self):
+        def split_parse(k):
+            # The original split based parse
+            return k.lower().split("\"", -1)[3]
+
+        keys = [
+            RT_ENTRY_KEY_PREFIX + "10.10.196.12/31" + RT_ENTRY_KEY_SUFFIX,
+            RT_ENTRY_KEY_PREFIX + "2603:10B0:503:DF4::5D/126" + RT_ENTRY_KEY_SUFFIX,
+            RT_ENTRY_KEY_PREFIX + "fe80::/64" + RT_ENTRY_KEY_SUFFIX,
+            # Not in the sairedis layout, falls back to the split based parse
+            'SAI_OBJECT_TYPE_ROUTE_ENTRY:{"switch_id":"oid:0x21000000000000","dest":"10.0.0.0/8"}',
+        ]
+        for k in keys:
+            assert route_check.parse_rt_entry_key(k) == split_parse(k)
+
+        assert route_check.parse_rt_entry_key("SAI_OBJECT_TYPE_NEXT_HOP:oid:0x40000000002e7") is None
+        assert route_check.checkout_rt_entry(keys[1]) == (True, "2603:10b0:503:df4::5d/126")
+        assert route_check.checkout_rt_entry(keys[2]) == (False, None)
+
+    def test_is_local(self):
+        for ip in ["169.254.0.1", "fe80::1", "FEBF::1/64"]:
+            assert route_check.is_local(ip)
+        for ip in ["10.0.0.1", "169.255.0.1", "fec0::1", "2603:10b0::1/64", "::ffff:169.254.0.1"]:
+            assert not route_check.is_local(ip)
@@ -0,0 +1,66 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+import pytest
+
+import utilities_common.cli as clicommon
+
+FAKE_SCRIPT = """#!/usr/bin/env python3
+import sys
+
+def main(argv=None, db=None):
+    print("argv={} db={}".format(argv, db))
+    if argv and argv[0] == '--fail':
+        sys.exit(2)
+    sys.exit(0)
+
+if __name__ == "__main__":
+    main()
+"""
+
+
+class TestRunScript(object):
+    def setup_method(self):
+        self.tmpdir = tempfile.mkdtemp()
+        with open(os.path.join(self.tmpdir, 'fake-stat'), 'w') as f:
+            f.write(FAKE_SCRIPT)
+        os.chmod(os.path.join(self.tmpdir, 'fake-stat'), 0o755)
+        env = {key: value for key, value in os.environ.items()
+               if key not in ('UTILITIES_UNIT_TESTING', 'SONIC_CLI_IFACE_MODE')}
+        env['PATH'] = self.tmpdir + os.pathsep + env.get('PATH', '')
+        self.env = mock.patch.dict(os.environ, env, clear=True)
+        self.env.start()
+
+    def teardown_method(self):
+        self.env.stop()
+        shutil.rmtree(self.tmpdir)
+
+    def test_run_in_process(self, capsys):
+        fallback = mock.Mock()
+        clicommon.run_script("fake-stat -s all -n asic0", db='shared-db', fallback=fallback)
+        assert capsys.readouterr().out == "argv=['-s', 'all', '-n', 'asic0'] db=shared-db\n"
+        assert not fallback.called
+
+    def test_display_cmd(self, capsys):
+        clicommon.run_script("fake-stat -s all", display_cmd=True, fallback=mock.Mock())
+        assert capsys.readouterr().out == "Command: fake-stat -s all\nargv=['-s', 'all'] db=None\n"
+
+        clicommon.run_script("fake-stat", display_cmd=True, fallback=mock.Mock(), display_prefix="Running command: ")
+        assert capsys.readouterr().out == "Running command: fake-stat\nargv=[] db=None\n"
+
+    def test_exit_code_of_failed_script(self, capsys):
+        with pytest.raises(SystemExit) as e:
+            clicommon.run_script("fake-stat --fail", fallback=mock.Mock())
+        assert e.value.code == 2
+
+    def test_fallback(self):
+        fallback = mock.Mock()
+        with mock.patch.dict(os.environ, {'SONIC_CLI_IFACE_MODE': 'alias'}):
+            clicommon.run_script("fake-stat -s all", db='shared-db', display_cmd=True, fallback=fallback)
+        fallback.assert_called_once_with("fake-stat -s all", display_cmd=True)
+
+        fallback = mock.Mock()
+        clicommon.run_script("missing-stat -s all", fallback=fallback)
+        fallback.assert_called_once_with("missing-stat -s all", display_cmd=False)
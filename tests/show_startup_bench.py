@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the startup of the 'show' CLI.
+
+For each command, a fresh interpreter imports show.main and resolves the
+command through the click groups, without running it. The import time,
+the resolution time and the peak RSS of the interpreter are reported,
+the median of the runs of each command.
+
+Not collected by pytest; run it directly on a device:
+
+    python3 tests/show_startup_bench.py --runs 10
+    python3 tests/show_startup_bench.py version "interfaces status"
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+COMMON_COMMANDS = [
+    "version",
+    "interfaces status",
+    "ip route",
+    "platform summary",
+    "vlan brief",
+    "feature status",
+]
+
+CHILD_CODE = """
+import json
+import resource
+import sys
+import time
+
+import click
+
+start = time.perf_counter()
+import show.main as show
+imported = time.perf_counter()
+
+ctx = click.Context(show.cli, info_name='show')
+command = show.cli
+for name in sys.argv[1:]:
+    command = command.get_command(ctx, name)
+    if command is None:
+        break
+    ctx = click.Context(command, info_name=name, parent=ctx)
+resolved = time.perf_counter()
+
+print(json.dumps({
+    "import": imported - start,
+    "resolve": resolved - imported,
+    "found": command is not None,
+    "rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "modules": len(sys.modules)
+}))
+"""
+
+
+def run(command, runs):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."),
+                                                       env.get("PYTHONPATH")]))
+    samples = []
+    for _ in range(runs):
+        out = subprocess.check_output([sys.executable, "-c", CHILD_CODE] + command.split(), env=env, text=True)
+        samples.append(json.loads(out.strip().splitlines()[-1]))
+
+    print("{:<20} {:>10.1f} ms import {:>8.1f} ms resolve {:>8.1f} MiB RSS {:>6} modules{}".format(
+        command,
+        statistics.median(s["import"] for s in samples) * 1000,
+        statistics.median(s["resolve"] for s in samples) * 1000,
+        statistics.median(s["rss"] for s in samples) / 1024,
+        samples[-1]["modules"],
+        "" if samples[-1]["found"] else " (not found)"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the startup of the show CLI")
+    parser.add_argument('commands', nargs='*', default=COMMON_COMMANDS, help='show commands to resolve')
+    parser.add_argument('-r', '--runs', type=int, default=5, help='Number of runs of each command')
+    args = parser.parse_args()
+
+    for command in args.commands:
+        run(command, args.runs)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
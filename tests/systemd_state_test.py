@@ -0,0 +1,81 @@
+from unittest import mock
+
+from utilities_common.systemd_state import SystemdState
+
+SHOW_OUTPUT = """\
+ActiveState=active
+LastTriggerUSecMonotonic=0
+
+ActiveState=inactive
+LastTriggerUSecMonotonic=12345
+"""
+
+SHOW_OUTPUT_EMPTY_PROPERTIES = """\
+ActiveEnterTimestampMonotonic=10
+ActiveState=active
+
+ActiveEnterTimestampMonotonic=
+ActiveState=
+
+ActiveEnterTimestampMonotonic=20
+ActiveState=failed
+"""
+
+
+class TestSystemdState(object):
+    def test_show_batches_units_and_caches(self):
+        with mock.patch("utilities_common.cli.run_command", return_value=SHOW_OUTPUT) as mock_run_command:
+            systemd = SystemdState()
+            properties = ["LastTriggerUSecMonotonic", "ActiveState"]
+
+            state = systemd.show(["snmp.timer", "swss.service"], properties)
+
+            mock_run_command.assert_called_once_with(
+                "systemctl show snmp.timer swss.service --all --property=ActiveState,LastTriggerUSecMonotonic",
+                return_cmd=True)
+            assert state == {
+                "snmp.timer": {"LastTriggerUSecMonotonic": "0", "ActiveState": "active"},
+                "swss.service": {"LastTriggerUSecMonotonic": "12345", "ActiveState": "inactive"},
+            }
+            # Served from the cache
+            assert systemd.get_property("swss.service", "ActiveState") == "inactive"
+            assert mock_run_command.call_count == 1
+
+    def test_show_unit_with_empty_properties(self):
+        with mock.patch("utilities_common.cli.run_command",
+                        return_value=SHOW_OUTPUT_EMPTY_PROPERTIES) as mock_run_command:
+            systemd = SystemdState()
+            properties = ["ActiveState", "ActiveEnterTimestampMonotonic"]
+
+            state = systemd.show(["swss", "missing", "bgp"], properties)
+
+            mock_run_command.assert_called_once_with(
+                "systemctl show swss missing bgp --all --property=ActiveEnterTimestampMonotonic,ActiveState",
+                return_cmd=True)
+            assert state == {
+                "swss": {"ActiveState": "active", "ActiveEnterTimestampMonotonic": "10"},
+                "missing": {"ActiveState": "", "ActiveEnterTimestampMonotonic": ""},
+                "bgp": {"ActiveState": "failed", "ActiveEnterTimestampMonotonic": "20"},
+            }
+
+    def test_jobs_drop_cached_properties(self):
+        with mock.patch("utilities_common.cli.run_command", return_value="ActiveState=failed\n") as mock_run_command:
+            systemd = SystemdState()
+            assert systemd.get_property("swss", "ActiveState") == "failed"
+
+            systemd.reset_failed(["swss", "snmp"])
+            mock_run_command.assert_called_with("systemctl reset-failed swss snmp")
+            systemd.restart(["sonic.target"], sudo=True)
+            mock_run_command.assert_called_with("sudo systemctl restart sonic.target")
+
+            systemd.get_property("swss", "ActiveState")
+            assert mock_run_command.call_count == 4
+
+    def test_list_dependencies(self):
+        with mock.patch("utilities_common.cli.run_command", return_value="swss.service\nsnmp.timer\n") as mock_run_command:
+            systemd = SystemdState()
+
+            assert systemd.list_dependencies("sonic.target") == ["swss.service", "snmp.timer"]
+            assert systemd.list_dependencies("sonic.target") == ["swss.service", "snmp.timer"]
+            mock_run_command.assert_called_once_with("systemctl list-dependencies --plain sonic.target | sed '1d'",
+                                                     return_cmd=True)
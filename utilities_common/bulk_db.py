@@ -0,0 +1,107 @@
+# Bulk read helpers for redis backed SONiC databases #
+
+import os
+
+from swsscommon.swsscommon import SonicDBConfig
+
+try:
+    import redis
+except ImportError: # pragma: no cover
+    redis = None
+
+# Number of commands queued in one pipeline before it is flushed
+BULK_BATCH_SIZE = 1000
+# Number of keys redis looks at in each SCAN call
+SCAN_COUNT = 1000
+
+# redis-py clients connected to the unix socket of a database, by (socket path, DB id)
+_socket_clients = {}
+
+
+def scan_keys(client, pattern, count=SCAN_COUNT):
+    """
+    Iterate over the keys of the redis 'client' matching 'pattern' with
+    SCAN, which does not block redis for the whole keyspace as KEYS does.
+    A key may be returned more than once if the keyspace changes meanwhile.
+
+    If 'client' does not support SCAN, the keys are read with KEYS.
+    """
+    if not hasattr(client, 'scan'):
+        yield from client.keys(pattern) or []
+        return
+
+    cursor = 0
+    while True:
+        cursor, keys = client.scan(cursor, pattern, count)
+        yield from keys
+        if int(cursor) == 0:
+            break
+
+
+def any_key_matches(client, pattern, count=SCAN_COUNT):
+    """
+    Return True if any key of the redis 'client' matches 'pattern',
+    stopping the SCAN at the first match.
+    """
+    return next(scan_keys(client, pattern, count), None) is not None
+
+
+def get_pipeline_client(db, db_name):
+    """
+    Return a redis client of 'db_name' which supports pipelines, or None.
+
+    The redis client of a swsscommon SonicV2Connector does not support
+    pipelines, so a redis-py client is connected to the unix socket of
+    the database instead, and shared by the next calls.
+    """
+    client = db.get_redis_client(db_name)
+    if hasattr(client, 'pipeline'):
+        return client
+    if redis is None:
+        return None
+
+    namespace = getattr(db, 'namespace', '') or ''
+    socket_path = SonicDBConfig.getDbSock(db_name, namespace)
+    if not socket_path or not os.path.exists(socket_path):
+        return None
+    db_id = SonicDBConfig.getDbId(db_name, namespace)
+
+    if (socket_path, db_id) not in _socket_clients:
+        _socket_clients[(socket_path, db_id)] = redis.Redis(unix_socket_path=socket_path, db=db_id,
+                                                            decode_responses=True)
+    return _socket_clients[(socket_path, db_id)]
+
+
+def get_all_bulk(db, db_name, keys, batch_size=BULK_BATCH_SIZE):
+    """
+    Fetch the hashes stored under 'keys' in 'db_name' with pipelined
+    HGETALL commands and return a dict of key -> {field: value}.
+    Keys which do not exist map to an empty dict.
+
+    'db' is a connected SonicV2Connector. If no redis client supporting
+    pipelines can be found for it, the hashes are read one key at a time.
+    Connectors which provide their own get_all_bulk (e.g. the DB broker
+    connector) are delegated to.
+    """
+    bulk_reader = getattr(db, 'get_all_bulk', None)
+    if bulk_reader is not None:
+        return bulk_reader(db_name, keys)
+
+    keys = list(keys)
+    result = {}
+    client = get_pipeline_client(db, db_name)
+
+    if client is None:
+        for key in keys:
+            result[key] = db.get_all(db_name, key) or {}
+        return result
+
+    for start in range(0, len(keys), batch_size):
+        batch = keys[start:start + batch_size]
+        pipe = client.pipeline(transaction=False)
+        for key in batch:
+            pipe.hgetall(key)
+        for key, values in zip(batch, pipe.execute()):
+            result[key] = values or {}
+
+    return result
@@ -1,7 +1,10 @@
 import configparser
 import datetime
+import importlib
 import os
 import re
+import shlex
+import shutil
 import subprocess
 import sys
 
@@ -9,10 +12,11 @@ import click
 import json
 import netaddr
 
+from collections.abc import MutableMapping
 from natsort import natsorted
 from sonic_py_common import multi_asic, device_info
 from utilities_common.db import Db
-from utilities_common.general import load_db_config
+from utilities_common.general import load_db_config, load_module_from_source
 
 VLAN_SUB_INTERFACE_SEPARATOR = '.'
 
@@ -115,6 +119,85 @@ class AliasedGroup(click.Group):
             return click.Group.get_command(self, ctx, matches[0])
         ctx.fail('Too many matches: %s' % ', '.join(sorted(matches)))
 
+class LazyCommands(MutableMapping):
+    """Subcommands of a LazyAliasedGroup. Commands registered with a loader
+       are only loaded when they are looked up.
+    """
+
+    def __init__(self, commands):
+        self.loaded = dict(commands)
+        self.loaders = {}
+
+    def add_loader(self, names, loader):
+        """Register 'loader' to add the commands 'names' to the group
+           the first time one of them is looked up
+        """
+        for name in names:
+            if name not in self.loaded:
+                self.loaders[name] = loader
+
+    def load(self, name):
+        loader = self.loaders.get(name)
+        if loader is None:
+            return
+        # A loader may add several commands, it is called only once
+        for loader_name in [n for n, l in self.loaders.items() if l is loader]:
+            del self.loaders[loader_name]
+        loader()
+
+    def __getitem__(self, name):
+        if name not in self.loaded:
+            self.load(name)
+        return self.loaded[name]
+
+    def __setitem__(self, name, command):
+        self.loaders.pop(name, None)
+        self.loaded[name] = command
+
+    def __delitem__(self, name):
+        if name in self.loaders:
+            del self.loaders[name]
+        else:
+            del self.loaded[name]
+
+    def __contains__(self, name):
+        return name in self.loaded or name in self.loaders
+
+    def __iter__(self):
+        yield from list(self.loaded)
+        yield from [name for name in self.loaders if name not in self.loaded]
+
+    def __len__(self):
+        return len(self.loaded) + len([name for name in self.loaders if name not in self.loaded])
+
+
+class LazyAliasedGroup(AliasedGroup):
+    """This subclass of AliasedGroup imports the module of a subcommand only
+       when the subcommand is resolved, so that running one command does not
+       pay for importing all the others.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(LazyAliasedGroup, self).__init__(*args, **kwargs)
+        self.commands = LazyCommands(self.commands)
+
+    def add_lazy_command(self, name, module_name, attr_name=None):
+        """Register command 'name' as the attribute 'attr_name' (by default
+           'name') of module 'module_name'
+        """
+        def load():
+            module = importlib.import_module(module_name)
+            self.add_command(getattr(module, attr_name or name.replace('-', '_')), name)
+
+        self.commands.add_loader([name], load)
+
+    def add_lazy_commands(self, names, loader):
+        """Register 'loader' to add all the commands 'names' the first time
+           one of them is resolved
+        """
+        self.commands.add_loader(names, loader)
+
+
 class InterfaceAliasConverter(object):
     """Class which handles conversion between interface name and alias"""
 
@@ -185,8 +268,24 @@ class InterfaceAliasConverter(object):
         # interface_alias not in port_dict. Just return interface_alias
         return interface_alias if sub_intf_sep_idx == -1 else interface_alias + VLAN_SUB_INTERFACE_SEPARATOR + vlan_id
 
+class LazyInterfaceAliasConverter(object):
+    """InterfaceAliasConverter which only reads the PORT table when it is first
+       used, so that importing a CLI module does not connect to the database
+    """
+
+    def __init__(self, db=None):
+        self._db = db
+        self._converter = None
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if self._converter is None:
+            self._converter = InterfaceAliasConverter(self._db)
+        return getattr(self._converter, name)
+
 # Global class instance for SONiC interface name to alias conversion
-iface_alias_converter = InterfaceAliasConverter()
+iface_alias_converter = LazyInterfaceAliasConverter()
 
 def get_interface_naming_mode():
     mode = os.getenv('SONIC_CLI_IFACE_MODE')
@@ -563,6 +662,35 @@ def run_command(command, display_cmd=False, ignore_error=False, return_cmd=False
         sys.exit(rc)
 
 
+def run_script(command, db=None, display_cmd=False, fallback=run_command, display_prefix="Command: "):
+    """
+    Run a script of sonic-utilities in this process by calling its main(argv, db), instead of
+    starting a new interpreter for it. The script uses the connections of 'db', the Db object
+    of the CLI. As with run_command, the function exits with the return code of the script if
+    it fails. 'display_prefix' is shown before the command if 'display_cmd' is set, it should
+    be the one of 'fallback' so that the output is the same whichever way the command is run.
+
+    The command is run with 'fallback' in alias mode, whose output conversion needs the
+    output of a process, when the script is not found in PATH, and under unit tests, where
+    the scripts mock the databases when they are started.
+    """
+    argv = shlex.split(command)
+    path = shutil.which(argv[0])
+    if path is None or get_interface_naming_mode() == "alias" or "UTILITIES_UNIT_TESTING" in os.environ:
+        fallback(command, display_cmd=display_cmd)
+        return
+
+    if display_cmd:
+        click.echo(click.style(display_prefix, fg='cyan') + click.style(command, fg='green'))
+
+    script = load_module_from_source(argv[0].replace('-', '_'), path)
+    try:
+        script.main(argv[1:], db=db)
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            raise
+
+
 def json_serial(obj):
     """JSON serializer for objects not serializable by default"""
 
@@ -0,0 +1,177 @@
+# Binary store for cleared counter baselines #
+#
+# The *stat tools save a snapshot of the counters when they are cleared
+# and print the difference against it later. A snapshot is an OrderedDict
+# holding the snapshot 'time' and one namedtuple of counter values per
+# port/queue. It is stored as:
+#
+#   header   magic, format version, number of rows and fields, length of
+#            the index
+#   index    JSON object with the snapshot time and the list of row keys,
+#            padded to a multiple of 8 bytes
+#   data     rows x fields native uint64 values, row major, 0 for the
+#            counters which were N/A
+#   N/A      one bitmask per row, in ceil(fields / 64) native uint64
+#            words: bit i is set if field i was N/A
+#
+# Loading memory-maps the file, so only the rows which are looked up are
+# ever converted back to Python values. counters_diff_from_baseline()
+# diffs the new counters against the raw values, without building the
+# namedtuples at all.
+
+import _pickle as pickle
+import datetime
+import json
+import mmap
+import struct
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from utilities_common.netstat import STATUS_NA, counters_diff
+
+MAGIC = b'SCB1'
+FORMAT_VERSION = 2
+HEADER = struct.Struct('=4sIIII')
+TIME_KEY = 'time'
+
+
+def _mask_words(num_fields):
+    return (num_fields + 63) // 64
+
+
+def _is_na(value):
+    return value == STATUS_NA or value is None
+
+
+def save_baseline(path, cnstat_dict):
+    """
+    Save the snapshot 'cnstat_dict' to 'path'
+    """
+    time = cnstat_dict.get(TIME_KEY)
+    keys = [key for key in cnstat_dict if key != TIME_KEY]
+    num_fields = len(cnstat_dict[keys[0]]) if keys else 0
+
+    data = array('Q')
+    masks = array('Q')
+    for key in keys:
+        na_mask = 0
+        for i, value in enumerate(cnstat_dict[key]):
+            if _is_na(value):
+                na_mask |= 1 << i
+                data.append(0)
+            else:
+                data.append(int(value))
+        masks.extend((na_mask >> (64 * word)) & 0xFFFFFFFFFFFFFFFF for word in range(_mask_words(num_fields)))
+
+    index = json.dumps({
+        'time': time.isoformat() if time is not None else None,
+        'keys': keys
+    }).encode('utf-8')
+    index += b' ' * (-(HEADER.size + len(index)) % 8)
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(keys), num_fields, len(index)))
+        f.write(index)
+        data.tofile(f)
+        masks.tofile(f)
+
+
+def load_baseline(path, stats_type):
+    """
+    Load the snapshot saved at 'path'. Rows are returned as 'stats_type'
+    namedtuples of ints, or STATUS_NA for counters which were not available.
+
+    Snapshots pickled by older versions of the tools are loaded as they are.
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            f.seek(0)
+            return pickle.load(f)
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    _, version, num_rows, num_fields, index_len = HEADER.unpack_from(buf)
+    if version != FORMAT_VERSION:
+        raise ValueError('Unsupported counter baseline version {}'.format(version))
+    index = json.loads(bytes(buf[HEADER.size:HEADER.size + index_len]).decode('utf-8'))
+    words = memoryview(buf)[HEADER.size + index_len:].cast('Q')
+    data = words[:num_rows * num_fields]
+    masks = words[num_rows * num_fields:]
+    time = index['time']
+    if time is not None:
+        time = datetime.datetime.fromisoformat(time)
+    return CounterBaseline(time, index['keys'], num_fields, data, masks, stats_type)
+
+
+def counters_diff_from_baseline(baseline, keys, new_rows):
+    """
+    Diff the counter rows 'new_rows' of 'keys' against 'baseline' as
+    netstat.counters_diff does. 'baseline' is what load_baseline returned,
+    or an empty dict if there is no saved snapshot.
+    """
+    if isinstance(baseline, CounterBaseline):
+        return [baseline.diff(key, new) for key, new in zip(keys, new_rows)]
+    return counters_diff(new_rows, [baseline.get(key) for key in keys])
+
+
+class CounterBaseline(Mapping):
+    """
+    Read-only view of a saved snapshot which behaves like the OrderedDict
+    it was saved from.
+    """
+    def __init__(self, time, keys, num_fields, data, masks, stats_type):
+        self.time = time
+        self.keys_index = OrderedDict((key, row) for row, key in enumerate(keys))
+        self.num_fields = num_fields
+        self.data = data
+        self.masks = masks
+        self.stats_type = stats_type
+
+    def row(self, key):
+        """
+        Return the raw uint64 values of 'key', 0 for N/A counters
+        """
+        start = self.keys_index[key] * self.num_fields
+        return self.data[start:start + self.num_fields]
+
+    def na_mask(self, key):
+        """
+        Return the bitmask of the N/A counters of 'key', bit i for field i
+        """
+        num_words = _mask_words(self.num_fields)
+        start = self.keys_index[key] * num_words
+        na_mask = 0
+        for word, value in enumerate(self.masks[start:start + num_words]):
+            na_mask |= value << (64 * word)
+        return na_mask
+
+    def diff(self, key, stats):
+        """
+        Return the difference between the counters 'stats' and the saved
+        counters of 'key' as a list of ints, STATUS_NA where the new value
+        is not available. Counters which are not available in the snapshot
+        count from 0, as in netstat.ns_diff.
+        """
+        if key not in self.keys_index:
+            return [STATUS_NA if new == STATUS_NA else int(new) for new in stats]
+        # N/A counters are saved as 0, which is what they count from
+        return [STATUS_NA if new == STATUS_NA else max(0, int(new) - prev)
+                for new, prev in zip(stats, self.row(key))]
+
+    def __getitem__(self, key):
+        if key == TIME_KEY:
+            return self.time
+        na_mask = self.na_mask(key)
+        return self.stats_type._make(STATUS_NA if na_mask >> i & 1 else value
+                                     for i, value in enumerate(self.row(key)))
+
+    def __contains__(self, key):
+        return key == TIME_KEY or key in self.keys_index
+
+    def __iter__(self):
+        yield TIME_KEY
+        for key in self.keys_index:
+            yield key
+
+    def __len__(self):
+        return len(self.keys_index) + 1
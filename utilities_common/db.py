@@ -1,39 +1,155 @@
-from sonic_py_common import multi_asic, device_info
+import atexit
+import os
+import sys
+import threading
+from collections.abc import Mapping
+
+from sonic_py_common import multi_asic
 from swsscommon.swsscommon import ConfigDBConnector, SonicV2Connector
 from utilities_common import constants
+from utilities_common import db_broker
 from utilities_common.multi_asic import multi_asic_ns_choices
 
+# When set, the DB connections opened by the command are reported on stderr when it exits
+DB_STATS_ENV = 'SONIC_CLI_DB_STATS'
+
+# SonicV2Connector methods taking a DB name which do not need a connection to it
+NO_CONNECTION_METHODS = ('get_db_separator', 'get_dbid', 'get_db_list')
+
+
+class LazyDbConnector(object):
+    """
+    Wrapper of a SonicV2Connector which connects to a database the first
+    time a method is called with its name.
+    """
+    def __init__(self, connector, on_connect=None):
+        self._connector = connector
+        self._on_connect = on_connect
+        self._db_names = None
+        self._connected = set()
+        # The namespaces of a multi-ASIC command may be run in threads
+        self._lock = threading.Lock()
+
+    def _ensure_connected(self, db_name):
+        if db_name in self._connected:
+            return
+        with self._lock:
+            if db_name in self._connected:
+                return
+            if self._db_names is None:
+                self._db_names = set(self._connector.get_db_list())
+            if db_name not in self._db_names:
+                return
+            self._connector.connect(db_name)
+            self._connected.add(db_name)
+            if self._on_connect is not None:
+                self._on_connect(db_name)
+
+    def connect(self, db_name, retry_on=True):
+        self._ensure_connected(db_name)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        attr = getattr(self._connector, name)
+        if not callable(attr) or name in NO_CONNECTION_METHODS:
+            return attr
+
+        def call(*args, **kwargs):
+            if args and isinstance(args[0], str):
+                self._ensure_connected(args[0])
+            return attr(*args, **kwargs)
+        return call
+
+
+class LazyConnections(Mapping):
+    """
+    Connections of every namespace, created by 'factory' the first time
+    the namespace is looked up.
+    """
+    def __init__(self, namespaces, factory):
+        self.namespaces = list(namespaces)
+        self.factory = factory
+        self.connections = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, ns):
+        if ns not in self.namespaces:
+            raise KeyError(ns)
+        if ns not in self.connections:
+            with self._lock:
+                if ns not in self.connections:
+                    self.connections[ns] = self.factory(ns)
+        return self.connections[ns]
+
+    def __contains__(self, ns):
+        return ns in self.namespaces
+
+    def __iter__(self):
+        return iter(self.namespaces)
+
+    def __len__(self):
+        return len(self.namespaces)
+
 
 class Db(object):
+    """
+    DB connections of a CLI command. Nothing is connected when the object
+    is created: CONFIG_DB of a namespace is connected the first time its
+    client is used, and every other database the first time it is accessed
+    through the client of its namespace.
+
+    'opened_connections' lists the (namespace, database) pairs connected so
+    far. If SONIC_CLI_DB_STATS is set in the environment, it is reported on
+    stderr when the command exits.
+    """
     def __init__(self):
-        self.cfgdb_clients = {}
-        self.db_clients = {}
-        self.cfgdb = ConfigDBConnector()
-        self.cfgdb.connect()
-        self.db = SonicV2Connector(host="127.0.0.1")
-
-        # Skip connecting to chassis databases in line cards
-        db_list = list(self.db.get_db_list())
-        if not device_info.is_supervisor():
-            try:
-                db_list.remove('CHASSIS_APP_DB')
-                db_list.remove('CHASSIS_STATE_DB')
-            except Exception:
-                pass
-
-        for db_id in db_list:
-            self.db.connect(db_id)
-
-        self.cfgdb_clients[constants.DEFAULT_NAMESPACE] = self.cfgdb
-        self.db_clients[constants.DEFAULT_NAMESPACE] = self.db
+        self.opened_connections = []
+        self.use_broker = db_broker.is_available()
 
+        namespaces = [constants.DEFAULT_NAMESPACE]
         if multi_asic.is_multi_asic():
             self.ns_list = multi_asic_ns_choices()
-            for ns in self.ns_list:
-                self.cfgdb_clients[ns] = (
-                    multi_asic.connect_config_db_for_ns(ns)
-                )
-                self.db_clients[ns] = multi_asic.connect_to_all_dbs_for_ns(ns)
+            namespaces.extend(self.ns_list)
+
+        self.cfgdb_clients = LazyConnections(namespaces, self._connect_config_db)
+        self.db_clients = LazyConnections(namespaces, self._connect_dbs)
+
+        if os.environ.get(DB_STATS_ENV):
+            atexit.register(self.report_connections)
+
+    @property
+    def cfgdb(self):
+        return self.cfgdb_clients[constants.DEFAULT_NAMESPACE]
+
+    @property
+    def db(self):
+        return self.db_clients[constants.DEFAULT_NAMESPACE]
+
+    def _connect_config_db(self, ns):
+        if ns == constants.DEFAULT_NAMESPACE:
+            config_db = ConfigDBConnector()
+        else:
+            config_db = ConfigDBConnector(use_unix_socket_path=True, namespace=ns)
+        config_db.connect()
+        self.opened_connections.append((ns, 'CONFIG_DB'))
+        return config_db
+
+    def _connect_dbs(self, ns):
+        if self.use_broker:
+            # Reads are served by the warm connections of the broker
+            return db_broker.BrokerConnector(ns)
+
+        if ns == constants.DEFAULT_NAMESPACE:
+            connector = SonicV2Connector(host="127.0.0.1")
+        else:
+            connector = SonicV2Connector(use_unix_socket_path=True, namespace=ns)
+        return LazyDbConnector(connector, lambda db_name: self.opened_connections.append((ns, db_name)))
+
+    def report_connections(self, file=None):
+        names = ["{}/{}".format(ns, db_name) if ns else db_name for ns, db_name in self.opened_connections]
+        print("DB connections opened: {}{}".format(len(names), " ({})".format(", ".join(names)) if names else ""),
+              file=file or sys.stderr)
 
     def get_data(self, table, key):
         data = self.cfgdb.get_table(table)
@@ -0,0 +1,275 @@
+"""
+Local DB connection broker.
+
+Every show/portstat/intfstat invocation is a new process which has to load
+the database config and connect to every redis database before it can read
+a single key. The broker is a small daemon which keeps warm SonicV2Connector
+sessions per namespace and serves read requests over a unix socket.
+
+CLI processes use BrokerConnector in place of SonicV2Connector when the
+broker socket exists. Reads are sent to the broker; anything else (writes,
+redis clients, ...) is forwarded to a regular connector which is only
+created when it is needed.
+
+CONFIG_DB is still read through a direct ConfigDBConnector, and the
+database config is still loaded by each process.
+
+The broker is run by the sonic-db-broker.service unit of
+sonic-utilities-data; CLI processes keep connecting directly until it is
+enabled.
+
+The wire protocol is one JSON object per line in both directions:
+    request:  {"namespace": "", "op": "get_all", "args": ["COUNTERS_DB", "COUNTERS:oid:0x1"]}
+    response: {"result": {...}} or {"error": "<message>"}
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+
+from sonic_py_common import multi_asic
+from utilities_common.bulk_db import get_all_bulk
+from utilities_common.general import load_db_config
+
+BROKER_SOCKET_PATH = '/var/run/sonic-db-broker.sock'
+BROKER_SOCKET_ENV = 'SONIC_DB_BROKER_SOCKET'
+BROKER_TIMEOUT_SEC = 5
+
+# Read only operations which are served by the broker
+BROKER_READ_OPS = ('get', 'get_all', 'keys', 'exists', 'get_all_bulk')
+
+
+def get_socket_path():
+    return os.environ.get(BROKER_SOCKET_ENV, BROKER_SOCKET_PATH)
+
+
+def is_available():
+    """
+    Return True if a broker socket is present on the system
+    """
+    return os.path.exists(get_socket_path())
+
+
+class BrokerError(Exception):
+    pass
+
+
+class BrokerClient(object):
+    """
+    Connections to the broker socket shared by all BrokerConnectors
+    of a process, one per thread so that the namespaces of a multi-ASIC
+    command can be read in parallel
+    """
+    def __init__(self, socket_path):
+        self.socket_path = socket_path
+        self.local = threading.local()
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(BROKER_TIMEOUT_SEC)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.local.sock = sock
+        self.local.rfile = sock.makefile('r', encoding='utf-8')
+
+    def close(self):
+        """Close the connection of the calling thread"""
+        rfile = getattr(self.local, 'rfile', None)
+        sock = getattr(self.local, 'sock', None)
+        if rfile is not None:
+            rfile.close()
+        if sock is not None:
+            sock.close()
+        self.local.sock = None
+        self.local.rfile = None
+
+    def call(self, namespace, op, args):
+        request = json.dumps({'namespace': namespace, 'op': op, 'args': args}) + '\n'
+        try:
+            if getattr(self.local, 'sock', None) is None:
+                self._connect()
+            self.local.sock.sendall(request.encode('utf-8'))
+            line = self.local.rfile.readline()
+        except (OSError, ValueError) as e:
+            self.close()
+            raise BrokerError(str(e))
+        if not line:
+            self.close()
+            raise BrokerError('Connection closed by broker')
+        response = json.loads(line)
+        if 'error' in response:
+            raise BrokerError(response['error'])
+        return response['result']
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = BrokerClient(get_socket_path())
+        return _client
+
+
+class BrokerConnector(object):
+    """
+    Drop-in replacement of a connected SonicV2Connector which serves reads
+    through the broker. If the broker can not be reached, the connector
+    falls back to a direct connection for the rest of its lifetime.
+    """
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self._direct = None
+        self._use_broker = True
+
+    def _direct_connector(self):
+        if self._direct is None:
+            self._direct = multi_asic.connect_to_all_dbs_for_ns(self.namespace)
+        return self._direct
+
+    def _call(self, op, *args):
+        if self._use_broker:
+            try:
+                return get_client().call(self.namespace, op, list(args))
+            except BrokerError:
+                self._use_broker = False
+        if op == 'get_all_bulk':
+            return get_all_bulk(self._direct_connector(), *args)
+        return getattr(self._direct_connector(), op)(*args)
+
+    def connect(self, db_name, retry_on=True):
+        pass
+
+    def get(self, db_name, _hash, key):
+        return self._call('get', db_name, _hash, key)
+
+    def get_all(self, db_name, _hash):
+        return self._call('get_all', db_name, _hash)
+
+    def keys(self, db_name, pattern='*'):
+        return self._call('keys', db_name, pattern)
+
+    def exists(self, db_name, key):
+        return self._call('exists', db_name, key)
+
+    def get_all_bulk(self, db_name, keys):
+        return self._call('get_all_bulk', db_name, list(keys))
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        # Database names (APPL_DB, COUNTERS_DB, ...) resolve to themselves
+        if name.endswith('_DB') and name.isupper():
+            return name
+        return getattr(self._direct_connector(), name)
+
+
+def connect_to_all_dbs_for_ns(namespace):
+    """
+    Return a connector to all the DBs of the namespace, going through
+    the broker when it is running
+    """
+    if is_available():
+        return BrokerConnector(namespace)
+    return multi_asic.connect_to_all_dbs_for_ns(namespace)
+
+
+class DbBroker(object):
+    """
+    Serves read requests from warm per-namespace connections.
+
+    A connection serves one request at a time: each request takes an idle
+    connection of its namespace, or opens a new one if all of them are busy,
+    and gives it back once it is answered.
+    """
+    def __init__(self):
+        self.idle_connectors = {}
+        self.lock = threading.Lock()
+
+    def acquire_connector(self, namespace):
+        with self.lock:
+            idle = self.idle_connectors.get(namespace)
+            if idle:
+                return idle.pop()
+        return multi_asic.connect_to_all_dbs_for_ns(namespace)
+
+    def release_connector(self, namespace, db):
+        with self.lock:
+            self.idle_connectors.setdefault(namespace, []).append(db)
+
+    def handle(self, request):
+        namespace = request.get('namespace', multi_asic.DEFAULT_NAMESPACE)
+        op = request.get('op')
+        args = request.get('args', [])
+        if op not in BROKER_READ_OPS:
+            return {'error': 'Unsupported operation {}'.format(op)}
+
+        for attempt in range(2):
+            try:
+                db = self.acquire_connector(namespace)
+                if op == 'get_all_bulk':
+                    result = get_all_bulk(db, *args)
+                else:
+                    result = getattr(db, op)(*args)
+                if op == 'keys' and result is not None:
+                    result = list(result)
+            except Exception as e:
+                # The connection may have gone stale (e.g. redis restarted),
+                # drop it and retry once on another one before giving up
+                error = str(e)
+                continue
+            self.release_connector(namespace, db)
+            return {'result': result}
+        return {'error': error}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                response = self.server.broker.handle(json.loads(line))
+            except ValueError as e:
+                response = {'error': str(e)}
+            self.wfile.write((json.dumps(response) + '\n').encode('utf-8'))
+
+
+class _BrokerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(socket_path):
+    load_db_config()
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    server = _BrokerServer(socket_path, _RequestHandler)
+    server.broker = DbBroker()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve SONiC DB reads from warm connections')
+    parser.add_argument('-s', '--socket', default=get_socket_path(), help='Unix socket path to listen on')
+    args = parser.parse_args()
+    try:
+        serve(args.socket)
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+# Bulk reader of the FDB entries of ASIC_DB #
+#
+# fdbshow and nbrshow used to run KEYS over all the FDB entries, HGETALL
+# every entry and look up the VLAN of each bvid with more round trips,
+# which takes tens of seconds on a switch with tens of thousands of MACs.
+# FdbReader SCANs the entries, reads them by batches with pipelined
+# HGETALLs, and resolves all the bvids with a single pass over the VLAN
+# objects. The entries are handled one batch at a time, so the raw hashes
+# are never all held in memory.
+
+import json
+from collections import namedtuple
+
+from swsssdk import port_util
+from tabulate import tabulate
+
+from utilities_common.bulk_db import BULK_BATCH_SIZE, get_all_bulk, get_pipeline_client, scan_keys
+
+FDB_ENTRY_PREFIX = "ASIC_STATE:SAI_OBJECT_TYPE_FDB_ENTRY:"
+VLAN_PREFIX = "ASIC_STATE:SAI_OBJECT_TYPE_VLAN:"
+OID_PREFIX = "oid:0x"
+
+FDB_TABLE_HEADER = ['No.', 'Vlan', 'MacAddress', 'Port', 'Type']
+
+FdbEntry = namedtuple("FdbEntry", "vlan, mac, port, type")
+
+
+class FdbReadError(Exception):
+    pass
+
+
+class FdbReader(object):
+    """
+    Reader of the FDB entries of ASIC_DB. 'db' is a SonicV2Connector
+    connected to ASIC_DB.
+    """
+    def __init__(self, db, batch_size=BULK_BATCH_SIZE):
+        self.db = db
+        self.batch_size = batch_size
+        self.bvid_vlan_map = None
+        self.if_oid_map = None
+        self.if_br_oid_map = None
+
+    def get_bvid_vlan_map(self):
+        """
+        Return a dict of bvid -> VLAN id of all the VLAN objects. The VLAN
+        id is None for VLAN objects which do not have one.
+        """
+        if self.bvid_vlan_map is None:
+            client = self._get_scan_client()
+            keys = set(scan_keys(client, VLAN_PREFIX + "*"))
+            vlans = get_all_bulk(self.db, self.db.ASIC_DB, keys, self.batch_size)
+            self.bvid_vlan_map = {key[len(VLAN_PREFIX):]: fvs.get("SAI_VLAN_ATTR_VLAN_ID")
+                                  for key, fvs in vlans.items()}
+        return self.bvid_vlan_map
+
+    def iter_entries(self):
+        """
+        Yield an FdbEntry for every FDB entry learnt on a known bridge port,
+        in no particular order. Raises FdbReadError if the VLAN of the bvid
+        of an entry does not exist.
+        """
+        if self.if_br_oid_map is None:
+            _, self.if_oid_map = port_util.get_interface_oid_map(self.db)
+            self.if_br_oid_map = port_util.get_bridge_port_map(self.db)
+        if not self.if_br_oid_map:
+            return
+
+        client = self._get_scan_client()
+        seen = set()
+        batch = []
+        for key in scan_keys(client, FDB_ENTRY_PREFIX + "*"):
+            # SCAN may return a key more than once
+            if key in seen:
+                continue
+            seen.add(key)
+            batch.append(key)
+            if len(batch) == self.batch_size:
+                yield from self._read_batch(batch)
+                batch = []
+        if batch:
+            yield from self._read_batch(batch)
+
+    def filter_entries(self, vlan=None, port=None):
+        """
+        Yield the entries of 'vlan' (an int) and 'port', if given. Once the
+        entries are exhausted, raises ValueError if no entry is in 'vlan',
+        or no entry of 'vlan' is on 'port'.
+        """
+        vlan_found = False
+        port_found = False
+        for entry in self.iter_entries():
+            if vlan is not None and entry.vlan != vlan:
+                continue
+            vlan_found = True
+            if port is not None and entry.port != port:
+                continue
+            port_found = True
+            yield entry
+
+        if vlan is not None and not vlan_found:
+            raise ValueError("{!r} is not in list".format(vlan))
+        if port is not None and not port_found:
+            raise ValueError("{!r} is not in list".format(port))
+
+    def get_entries(self, vlan=None, port=None):
+        """
+        Return the entries of 'vlan' and 'port' sorted by VLAN and MAC
+        """
+        return sorted(self.filter_entries(vlan, port), key=lambda entry: (entry.vlan, entry.mac))
+
+    def count_entries(self, vlan=None, port=None):
+        return sum(1 for _ in self.filter_entries(vlan, port))
+
+    def _get_scan_client(self):
+        # SCAN with the client of the pipelines, the redis client of swsscommon connectors may not support it
+        return get_pipeline_client(self.db, self.db.ASIC_DB) or self.db.get_redis_client(self.db.ASIC_DB)
+
+    def _read_batch(self, keys):
+        for key, fvs in get_all_bulk(self.db, self.db.ASIC_DB, keys, self.batch_size).items():
+            entry = self._make_entry(key, fvs)
+            if entry is not None:
+                yield entry
+
+    def _make_entry(self, key, fvs):
+        fdb = json.loads(key[len(FDB_ENTRY_PREFIX):])
+        # The entry may have been removed since it was scanned
+        if not fdb or not fvs:
+            return None
+
+        br_port_id = fvs.get("SAI_FDB_ENTRY_ATTR_BRIDGE_PORT_ID", "")[len(OID_PREFIX):]
+        if br_port_id not in self.if_br_oid_map:
+            return None
+        port_id = self.if_br_oid_map[br_port_id]
+        port = self.if_oid_map.get(port_id, port_id)
+
+        if 'vlan' in fdb:
+            vlan_id = fdb["vlan"]
+        elif 'bvid' in fdb:
+            bvid_vlan_map = self.get_bvid_vlan_map()
+            if fdb["bvid"] not in bvid_vlan_map:
+                raise FdbReadError("Failed to get Vlan id for bvid {}".format(fdb["bvid"]))
+            vlan_id = bvid_vlan_map[fdb["bvid"]]
+            if vlan_id is None:
+                # the situation could be faced if the system has an FDB entries,
+                # which are linked to default Vlan(caused by untagged traffic)
+                return None
+        else:
+            # no possibility to find the Vlan id. skip the FDB entry
+            return None
+
+        fdb_type = "Static" if fvs.get("SAI_FDB_ENTRY_ATTR_TYPE") == "SAI_FDB_ENTRY_TYPE_STATIC" else "Dynamic"
+        return FdbEntry(int(vlan_id), fdb["mac"], port, fdb_type)
+
+
+def format_fdb_table(entries):
+    """
+    Yield the lines of the numbered table of 'entries', laid out as
+    tabulate does, without building the table of all the rows first.
+    """
+    if not entries:
+        yield from tabulate([], FDB_TABLE_HEADER).splitlines()
+        return
+
+    # As with tabulate, the columns are at least 2 characters wider than
+    # their header; numbers are aligned right, strings left
+    widths = [len(header) + 2 for header in FDB_TABLE_HEADER]
+    widths[0] = max(widths[0], len(str(len(entries))))
+    for entry in entries:
+        widths[1] = max(widths[1], len(str(entry.vlan)))
+        widths[2] = max(widths[2], len(entry.mac))
+        widths[3] = max(widths[3], len(entry.port))
+        widths[4] = max(widths[4], len(entry.type))
+
+    row_format = "{:>%d}  {:>%d}  {:<%d}  {:<%d}  {:<%d}" % tuple(widths)
+    yield row_format.format(*FDB_TABLE_HEADER).rstrip()
+    yield "  ".join("-" * width for width in widths)
+    for index, entry in enumerate(entries, 1):
+        yield row_format.format(index, entry.vlan, entry.mac, entry.port, entry.type).rstrip()
@@ -1,5 +1,7 @@
 import argparse
+import copy
 import functools
+from concurrent.futures import ThreadPoolExecutor
 
 import click
 import netifaces
@@ -7,14 +9,18 @@ import pyroute2
 from natsort import natsorted
 from sonic_py_common import multi_asic, device_info
 from utilities_common import constants
+from utilities_common import db_broker
 from utilities_common.general import load_db_config
 
+# Upper bound of worker threads used by the concurrent run_on_multi_asic mode
+MAX_CONCURRENT_NAMESPACES = 16
+
 
 class MultiAsic(object):
 
     def __init__(
         self, display_option=constants.DISPLAY_ALL, namespace_option=None,
-        db=None
+        db=None, concurrent=False
     ):
         # Load database config files
         load_db_config()
@@ -23,6 +29,7 @@ class MultiAsic(object):
         self.current_namespace = None
         self.is_multi_asic = multi_asic.is_multi_asic()
         self.db = db
+        self.concurrent = concurrent
 
     def get_display_option(self):
         return self.display_option
@@ -123,6 +130,24 @@ def multi_asic_click_options(func):
     return func
 
 
+def _bind_namespace(obj, ns):
+    '''
+    Point the CLI object at namespace ns: set the current namespace
+    and the CONFIG_DB and all DBs handles of that namespace.
+    '''
+    obj.multi_asic.current_namespace = ns
+    # if object instance already has db connections, use them
+    if obj.multi_asic.db and obj.multi_asic.db.cfgdb_clients.get(ns):
+        obj.config_db = obj.multi_asic.db.cfgdb_clients[ns]
+    else:
+        obj.config_db = multi_asic.connect_config_db_for_ns(ns)
+
+    if obj.multi_asic.db and obj.multi_asic.db.db_clients.get(ns):
+        obj.db = obj.multi_asic.db.db_clients[ns]
+    else:
+        obj.db = db_broker.connect_to_all_dbs_for_ns(ns)
+
+
 def run_on_multi_asic(func):
     '''
     This decorator is used on the CLI functions which needs to be
@@ -130,25 +155,34 @@ def run_on_multi_asic(func):
     The decorator loops through all the required namespaces,
     for every iteration, it connects to all the DBs and provides an handle
     to the wrapped function.
-
+    The return values of the wrapped function are returned as a list,
+    in the order of the namespaces.
+
+    If the MultiAsic object was created with concurrent=True, the
+    namespaces are handled in a thread pool instead. Every namespace runs
+    on a shallow copy of the CLI object, so the wrapped function must not
+    modify shared state of the object; it should return its result and
+    let the caller merge the list.
     '''
     @functools.wraps(func)
     def wrapped_run_on_all_asics(self, *args, **kwargs):
         ns_list = self.multi_asic.get_ns_list_based_on_options()
-        for ns in ns_list:
-            self.multi_asic.current_namespace = ns
-            # if object instance already has db connections, use them
-            if self.multi_asic.db and self.multi_asic.db.cfgdb_clients.get(ns):
-                self.config_db = self.multi_asic.db.cfgdb_clients[ns]
-            else:
-                self.config_db = multi_asic.connect_config_db_for_ns(ns)
-
-            if self.multi_asic.db and self.multi_asic.db.db_clients.get(ns):
-                self.db = self.multi_asic.db.db_clients[ns]
-            else:
-                self.db = multi_asic.connect_to_all_dbs_for_ns(ns)
-
-            func(self,  *args, **kwargs)
+        if not self.multi_asic.concurrent or len(ns_list) < 2:
+            results = []
+            for ns in ns_list:
+                _bind_namespace(self, ns)
+                results.append(func(self,  *args, **kwargs))
+            return results
+
+        def run_on_ns(ns):
+            ns_obj = copy.copy(self)
+            ns_obj.multi_asic = copy.copy(self.multi_asic)
+            _bind_namespace(ns_obj, ns)
+            return func(ns_obj, *args, **kwargs)
+
+        max_workers = min(len(ns_list), MAX_CONCURRENT_NAMESPACES)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(run_on_ns, ns_list))
     return wrapped_run_on_all_asics
 
 
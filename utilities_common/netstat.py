@@ -26,14 +26,7 @@ def ns_brate(newstr, oldstr, delta):
     if newstr == STATUS_NA or oldstr == STATUS_NA:
         return STATUS_NA
     else:
-        rate = int(ns_diff(newstr, oldstr).replace(',',''))/delta
-        if rate > 1000*1000*10:
-            rate = "{:.2f}".format(rate/1000/1000)+' MB'
-        elif rate > 1000*10:
-            rate = "{:.2f}".format(rate/1000)+' KB'
-        else:
-            rate = "{:.2f}".format(rate)+' B'
-        return rate+'/s'
+        return format_brate(counters_rate(counters_diff([(newstr,)], [(oldstr,)]), delta)[0][0])
 
 def ns_prate(newstr, oldstr, delta):
     """
@@ -42,8 +35,7 @@ def ns_prate(newstr, oldstr, delta):
     if newstr == STATUS_NA or oldstr == STATUS_NA:
         return STATUS_NA
     else:
-        rate = int(ns_diff(newstr, oldstr).replace(',',''))/delta
-        return "{:.2f}".format(rate)+'/s'
+        return format_prate(counters_rate(counters_diff([(newstr,)], [(oldstr,)]), delta)[0][0])
 
 def ns_util(newstr, oldstr, delta, port_rate=PORT_RATE):
     """
@@ -52,13 +44,61 @@ def ns_util(newstr, oldstr, delta, port_rate=PORT_RATE):
     if newstr == STATUS_NA or oldstr == STATUS_NA:
         return STATUS_NA
     else:
-        rate = int(ns_diff(newstr, oldstr).replace(',',''))/delta
-        util = rate/(port_rate*1000*1000*1000/8.0)*100
-        return "{:.2f}%".format(util)
+        rates = counters_rate(counters_diff([(newstr,)], [(oldstr,)]), delta)
+        return format_percent(counters_util(rates, [port_rate * 1000])[0][0])
 
-def table_as_json(table, header):
+def counters_diff(new_rows, old_rows):
     """
-        Print table as json format.
+        Calculate the diff of whole counter matrices in one pass.
+        new_rows and old_rows are sequences of counter rows (int or decimal
+        string values, STATUS_NA if not available). A row of old_rows may be
+        None if there is no saved snapshot for it. Returns the rows of diffs
+        as lists of ints, with the same N/A rules as ns_diff.
+    """
+    diffs = []
+    for new, old in zip(new_rows, old_rows):
+        if old is None:
+            diffs.append([STATUS_NA if n == STATUS_NA else int(n) for n in new])
+        else:
+            diffs.append([STATUS_NA if n == STATUS_NA
+                          else max(0, int(n) - (0 if o == STATUS_NA else int(o)))
+                          for n, o in zip(new, old)])
+    return diffs
+
+def counters_rate(diffs, delta):
+    """
+        Calculate the per second rates of the counter diffs returned by
+        counters_diff over 'delta' seconds, as floats. N/A diffs stay N/A.
+    """
+    return [[STATUS_NA if d == STATUS_NA else d / delta for d in row] for row in diffs]
+
+def counters_util(byte_rates, port_speeds):
+    """
+        Calculate the utilization in percent of rows of byte rates, one row
+        per port. port_speeds holds the speed of every port in Mb/s, or
+        STATUS_NA if it is not known.
+    """
+    utils = []
+    for rates, speed in zip(byte_rates, port_speeds):
+        if speed == STATUS_NA:
+            utils.append([STATUS_NA] * len(rates))
+            continue
+        bytes_per_sec = float(speed) * 1000 * 1000 / 8.0
+        utils.append([STATUS_NA if rate == STATUS_NA else float(rate) / bytes_per_sec * 100
+                      for rate in rates])
+    return utils
+
+def format_counter(value):
+    """
+        Format a counter value computed by counters_diff.
+    """
+    if value == STATUS_NA:
+        return STATUS_NA
+    return '{:,}'.format(value)
+
+def table_as_dict(table, header):
+    """
+        Convert table to a dictionary keyed by the first column.
     """
     output = {}
 
@@ -67,8 +107,14 @@ def table_as_json(table, header):
     for line in table:
         if_name = line[0]
         output[if_name] = {header[i]: line[i] for i in range(1, len(header))}
-    
-    return json.dumps(output, indent=4, sort_keys=True)
+
+    return output
+
+def table_as_json(table, header):
+    """
+        Print table as json format.
+    """
+    return json.dumps(table_as_dict(table, header), indent=4, sort_keys=True)
 
 
 def format_number_with_comma(number_in_str):
@@ -108,13 +154,17 @@ def format_prate(rate):
         return "{:.2f}".format(float(rate))+'/s'
 
 
-def format_util(brate, port_rate):
+def format_percent(util):
     """
-        Calculate the util.
+        Show a utilization computed by counters_util.
     """
-    if brate == STATUS_NA or port_rate == STATUS_NA:
+    if util == STATUS_NA:
         return STATUS_NA
-    else:
-        util = brate/(float(port_rate)*1000*1000/8.0)*100
-        return "{:.2f}%".format(util)
+    return "{:.2f}%".format(util)
+
 
+def format_util(brate, port_rate):
+    """
+        Calculate the util.
+    """
+    return format_percent(counters_util([(brate,)], [port_rate])[0][0])
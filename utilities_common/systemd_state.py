@@ -0,0 +1,93 @@
+# Batched systemd queries for the config commands #
+#
+# 'config reload' and 'config load_minigraph' look at the state of many
+# units before and after they touch the configuration: the timers of
+# sonic-delayed.target, swss of every namespace, the services to reset.
+# Querying them one 'systemctl' call per unit and property forks dozens of
+# processes on a multi ASIC system. SystemdState reads the properties of
+# all the requested units with a single 'systemctl show' and keeps them
+# for the duration of the command, and issues reset-failed/restart for a
+# list of units as one job.
+
+import utilities_common.cli as clicommon
+
+
+class SystemdState(object):
+    """
+    Cached view of the systemd units used by a CLI command. The unit
+    properties are dropped whenever a job is issued through this object,
+    the dependencies of a target are kept.
+    """
+    def __init__(self):
+        self.dependencies = {}
+        self.properties = {}
+        self.system_state = None
+
+    def list_dependencies(self, target):
+        """
+        Return the units 'target' depends on
+        """
+        if target not in self.dependencies:
+            out = clicommon.run_command("systemctl list-dependencies --plain {} | sed '1d'".format(target),
+                                        return_cmd=True)
+            self.dependencies[target] = [unit.strip() for unit in out.splitlines() if unit.strip()]
+        return self.dependencies[target]
+
+    def show(self, units, properties):
+        """
+        Return a dict of unit -> {property: value} holding 'properties' of
+        all 'units'. Units or properties which are not cached yet are read
+        with one 'systemctl show' call.
+        """
+        units = list(units)
+        missing = [unit for unit in units
+                   if any(prop not in self.properties.get(unit, {}) for prop in properties)]
+        if missing:
+            wanted = set(properties)
+            for unit in missing:
+                wanted.update(self.properties.get(unit, {}))
+            wanted = sorted(wanted)
+            out = clicommon.run_command("systemctl show {} --all --property={}".format(" ".join(missing),
+                                                                                     ",".join(wanted)),
+                                        return_cmd=True)
+            # One block of 'Property=value' lines per unit, in the order
+            # of the units, separated by empty lines. With --all the empty
+            # properties are printed too, so even a unit which does not
+            # exist has its block
+            blocks = out.split("\n\n")
+            for index, unit in enumerate(missing):
+                values = dict.fromkeys(wanted, "")
+                if index < len(blocks):
+                    for line in blocks[index].splitlines():
+                        prop, sep, value = line.partition("=")
+                        if sep:
+                            values[prop] = value
+                self.properties[unit] = values
+
+        return {unit: {prop: self.properties[unit][prop] for prop in properties} for unit in units}
+
+    def get_property(self, unit, prop):
+        return self.show([unit], [prop])[unit][prop]
+
+    def is_system_starting(self):
+        if self.system_state is None:
+            self.system_state = clicommon.run_command("sudo systemctl is-system-running", return_cmd=True).strip()
+        return self.system_state == "starting"
+
+    def reset_failed(self, units):
+        """
+        Reset the failed state of all 'units' with one job
+        """
+        units = list(units)
+        if units:
+            self.properties.clear()
+            clicommon.run_command("systemctl reset-failed {}".format(" ".join(units)))
+
+    def restart(self, units, sudo=False):
+        """
+        Restart all 'units' with one job
+        """
+        units = list(units)
+        if units:
+            self.properties.clear()
+            clicommon.run_command("{}systemctl restart {}".format("sudo " if sudo else "", " ".join(units)))
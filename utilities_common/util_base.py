@@ -1,3 +1,5 @@
+import functools
+import json
 import os
 import pkgutil
 import importlib
@@ -6,6 +8,11 @@ from sonic_py_common import logger
 
 # Constants ====================================================================
 PDDF_SUPPORT_FILE = '/usr/share/sonic/platform/pddf_support'
+# Per user cache of the CLI, e.g. the plugins found in a plugins package and the commands they register
+CLI_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'sonic-utilities')
+PLUGIN_MANIFEST_DIR = CLI_CACHE_DIR
+BOOT_ID_FILE = '/proc/sys/kernel/random/boot_id'
+PLUGIN_MANIFEST_VERSION = 1
 
 # Helper classs
 
@@ -19,25 +26,35 @@ class UtilHelper(object):
     def load_plugins(self, plugins_namespace):
         """ Discover and load CLI plugins. Yield a plugin module. """
 
-        def iter_namespace(ns_pkg):
-            return pkgutil.iter_modules(ns_pkg.__path__, ns_pkg.__name__ + ".")
+        for module_name in self.discover_plugins(plugins_namespace):
+            module = self.import_plugin(module_name)
+            if module is not None:
+                yield module
 
-        for _, module_name, ispkg in iter_namespace(plugins_namespace):
-            if ispkg:
-                yield from self.load_plugins(importlib.import_module(module_name))
-                continue
-            log.log_debug('importing plugin: {}'.format(module_name))
-            try:
-                module = importlib.import_module(module_name)
-            except Exception as err:
-                log.log_error('failed to import plugin {}: {}'.format(module_name, err),
-                              also_print_to_console=True)
-                continue
+    def discover_plugins(self, plugins_namespace):
+        """ Return the names of the plugin modules of plugins_namespace, without importing them. """
 
-            yield module
+        def iter_namespace(paths, prefix):
+            for module_info in pkgutil.iter_modules(paths, prefix):
+                if module_info.ispkg:
+                    yield from iter_namespace([os.path.join(module_info.module_finder.path, module_info.name.split('.')[-1])],
+                                              module_info.name + ".")
+                    continue
+                yield module_info.name
+
+        return list(iter_namespace(plugins_namespace.__path__, plugins_namespace.__name__ + "."))
+
+    def import_plugin(self, module_name):
+        log.log_debug('importing plugin: {}'.format(module_name))
+        try:
+            return importlib.import_module(module_name)
+        except Exception as err:
+            log.log_error('failed to import plugin {}: {}'.format(module_name, err),
+                          also_print_to_console=True)
+            return None
 
     def register_plugin(self, plugin, root_command):
-        """ Register plugin in top-level command root_command. """
+        """ Register plugin in top-level command root_command. Return False if it failed. """
 
         name = plugin.__name__
         log.log_debug('registering plugin: {}'.format(name))
@@ -46,6 +63,51 @@ class UtilHelper(object):
         except Exception as err:
             log.log_error('failed to import plugin {}: {}'.format(name, err),
                           also_print_to_console=True)
+            return False
+        return True
+
+    def get_boot_id(self):
+        """ Return the id of the current boot, None if it is not known """
+
+        try:
+            with open(BOOT_ID_FILE) as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def read_boot_cache(self, name):
+        """ Return the value saved with write_boot_cache during the current boot, None if there is none """
+
+        boot_id = self.get_boot_id()
+        if boot_id is None:
+            return None
+        try:
+            with open(os.path.join(CLI_CACHE_DIR, '{}.json'.format(name))) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(cache, dict) or cache.get('boot_id') != boot_id:
+            return None
+        return cache.get('value')
+
+    def write_boot_cache(self, name, value):
+        """ Save the JSON serializable value, until the next boot """
+
+        boot_id = self.get_boot_id()
+        if boot_id is None:
+            return
+        path = os.path.join(CLI_CACHE_DIR, '{}.json'.format(name))
+        tmp_path = '{}.{}'.format(path, os.getpid())
+        try:
+            os.makedirs(CLI_CACHE_DIR, exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump({'boot_id': boot_id, 'value': value}, f)
+            os.replace(tmp_path, path)
+        except OSError as err:
+            log.log_debug('failed to save {}: {}'.format(path, err))
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
 
     # try get information from platform API and return a default value if caught NotImplementedError
     def try_get(self, callback, default=None):
@@ -85,7 +147,105 @@ class UtilHelper(object):
             return False
 
     def load_and_register_plugins(self, plugins, cli):
-        """ Load plugins and register them """
+        """ Load plugins and register them.
 
-        for plugin in self.load_plugins(plugins):
-            self.register_plugin(plugin, cli)
\ No newline at end of file
+        If 'cli' loads its commands lazily, the plugins which only add new top-level commands are
+        imported when one of their commands is used. Which commands a plugin adds is learnt by
+        registering all the plugins once, and kept in a manifest which is rebuilt whenever the
+        plugin files change.
+        """
+
+        if not hasattr(cli, 'add_lazy_commands'):
+            for plugin in self.load_plugins(plugins):
+                self.register_plugin(plugin, cli)
+            return
+
+        signature = self.get_plugins_signature(plugins)
+        manifest = self.read_plugin_manifest(plugins, signature)
+        if manifest is None:
+            manifest = {}
+            complete = True
+            for module_name in self.discover_plugins(plugins):
+                plugin = self.import_plugin(module_name)
+                if plugin is None:
+                    complete = False
+                    continue
+                manifest[module_name], registered = self.register_plugin_and_get_commands(plugin, cli)
+                complete = complete and registered
+            # Do not keep what was learnt from plugins which failed, they may behave differently next time
+            if complete:
+                self.write_plugin_manifest(plugins, signature, manifest)
+            return
+
+        for module_name, commands in manifest.items():
+            if commands:
+                cli.add_lazy_commands(commands, functools.partial(self.load_and_register_plugin, module_name, cli))
+            else:
+                self.load_and_register_plugin(module_name, cli)
+
+    def load_and_register_plugin(self, module_name, cli):
+        plugin = self.import_plugin(module_name)
+        if plugin is not None:
+            self.register_plugin(plugin, cli)
+
+    def register_plugin_and_get_commands(self, plugin, cli):
+        """ Register plugin in the lazy command cli.
+
+        Return the names of the top-level commands the plugin added, or None if it also changed
+        existing commands, in which case it always has to be registered, and whether it registered.
+        """
+
+        existing = set(cli.commands)
+        loaded = {name: self.get_subcommand_names(command) for name, command in cli.commands.loaded.items()}
+
+        registered = self.register_plugin(plugin, cli)
+
+        added = sorted(name for name in cli.commands.loaded if name not in existing)
+        changed = [name for name, command in cli.commands.loaded.items()
+                   if name in existing and (name not in loaded or self.get_subcommand_names(command) != loaded[name])]
+        if not added or changed:
+            return None, registered
+        return added, registered
+
+    def get_subcommand_names(self, command):
+        return set(getattr(command, 'commands', {}))
+
+    def get_plugins_signature(self, plugins):
+        """ Name, size and modification time of all the files of the plugins package """
+
+        signature = []
+        for path in plugins.__path__:
+            for root, dirs, files in os.walk(path):
+                dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+                for file_name in sorted(files):
+                    stat = os.stat(os.path.join(root, file_name))
+                    signature.append([os.path.relpath(os.path.join(root, file_name), path), stat.st_size, stat.st_mtime_ns])
+        return signature
+
+    def get_plugin_manifest_path(self, plugins):
+        return os.path.join(PLUGIN_MANIFEST_DIR, '{}.json'.format(plugins.__name__))
+
+    def read_plugin_manifest(self, plugins, signature):
+        try:
+            with open(self.get_plugin_manifest_path(plugins)) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if manifest.get('version') != PLUGIN_MANIFEST_VERSION or manifest.get('signature') != signature:
+            return None
+        return manifest['plugins']
+
+    def write_plugin_manifest(self, plugins, signature, manifest):
+        path = self.get_plugin_manifest_path(plugins)
+        tmp_path = '{}.{}'.format(path, os.getpid())
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': PLUGIN_MANIFEST_VERSION, 'signature': signature, 'plugins': manifest}, f)
+            os.replace(tmp_path, path)
+        except OSError as err:
+            # The manifest is only a cache, the plugins are discovered again next time
+            log.log_debug('failed to save plugin manifest {}: {}'.format(path, err))
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
\ No newline at end of file